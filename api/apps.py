@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+
+
+class ApiConfig(AppConfig):
+    name = 'api'
+
+    def ready(self):
+        from django.core import checks
+        from django.db.backends.signals import connection_created
+
+        from .db_routers import check_replica_pin_cache
+        from .metrics import instrument_connection
+
+        checks.register(check_replica_pin_cache, checks.Tags.caches)
+
+        # Every connection, on every alias and in every thread, reports its
+        # queries to the request being measured.
+        connection_created.connect(instrument_connection, dispatch_uid="instrument_connection")
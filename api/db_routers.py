@@ -0,0 +1,156 @@
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.utils.functional import LazyObject, empty
+
+# Reads go to a replica only inside a request handled by
+# ReplicaPinningMiddleware; management commands, shells and background jobs
+# read their own writes from the primary. See README, "Read replicas".
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Caches that keep their entries to one process, or drop them.
+UNSHARED_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+_routing: ContextVar["RequestRouting | None"] = ContextVar("db_request_routing", default=None)
+
+
+def pin_key(user_id) -> str:
+    return f"db-replica-pin:{user_id}"
+
+
+class RequestRouting:
+    # One request's routing state. The replica is picked once, so all the
+    # reads of a request (count, page, ETag version) see the same snapshot.
+
+    def __init__(self, request):
+        self.request = request
+        self.safe = request.method in SAFE_METHODS
+        self.replica = random.choice(settings.DATABASE_REPLICAS) if settings.DATABASE_REPLICAS else None
+        self.wrote = False
+        self.pinned = None
+
+    @property
+    def user_id(self):
+        # DRF sets the authenticated user on the Django request as well. A
+        # session user that has not been loaded yet is left alone: loading it
+        # would query the database from inside the router.
+        user = self.request.__dict__.get("user")
+        if isinstance(user, LazyObject):
+            user = user._wrapped
+            if user is empty:
+                return None
+        if user is None or not user.is_authenticated:
+            return None
+        return user.pk
+
+    def read_from(self):
+        if self.replica is None or not self.safe or self.wrote:
+            return "default"
+
+        if self.pinned is None:
+            user_id = self.user_id
+            if user_id is None:
+                # Not authenticated (yet): nothing of its own to read back.
+                return self.replica
+            self.pinned = caches[settings.DB_REPLICA_PIN_CACHE].get(pin_key(user_id)) is not None
+
+        return "default" if self.pinned else self.replica
+
+
+class PrimaryReplicaRouter:
+    # Writes (and select_for_update()) go to the primary; safe requests read
+    # from a replica unless their user wrote within DB_REPLICA_PIN_SECONDS.
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None:
+            return "default"
+        return routing.read_from()
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication.
+        return db == "default"
+
+
+class ReplicaPinningMiddleware:
+    # Installs the request's routing state and, after a request that wrote,
+    # pins its user to the primary long enough for the replicas to catch up.
+    # Streaming responses (the export) read from the primary while they are
+    # being sent.
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        routing = RequestRouting(request)
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+
+        if (user_id := self.pinned_user(routing)) is not None:
+            caches[settings.DB_REPLICA_PIN_CACHE].set(pin_key(user_id), True, timeout=settings.DB_REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        routing = RequestRouting(request)
+        token = _routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+
+        if (user_id := self.pinned_user(routing)) is not None:
+            await caches[settings.DB_REPLICA_PIN_CACHE].aset(pin_key(user_id), True, timeout=settings.DB_REPLICA_PIN_SECONDS)
+        return response
+
+    def pinned_user(self, routing: RequestRouting):
+        return routing.user_id if routing.wrote else None
+
+
+def check_replica_pin_cache(app_configs, **kwargs):
+    # Registered in ApiConfig.ready. A pin the other workers cannot see only
+    # holds when the user's next request lands on the same worker.
+    if not settings.DATABASE_REPLICAS:
+        return []
+
+    alias = settings.DB_REPLICA_PIN_CACHE
+    if alias not in settings.CACHES:
+        return [checks.Error(f"DB_REPLICA_PIN_CACHE names an unknown cache, {alias!r}.", id="api.E001")]
+
+    backend = settings.CACHES[alias]["BACKEND"]
+    if backend in UNSHARED_CACHES:
+        return [checks.Error(
+            f"The replica pin cache {alias!r} ({backend}) is not shared by the workers, so users may not read their own writes.",
+            hint="Point DB_REPLICA_PIN_CACHE at a shared cache, e.g. Redis, or FileBasedCache for the workers of one host.",
+            id="api.E002",
+        )]
+    return []
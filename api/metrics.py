@@ -0,0 +1,169 @@
+import os
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest, multiprocess
+
+# With PROMETHEUS_MULTIPROC_DIR set (before start-up), every worker writes
+# its samples there and /metrics merges them; see README, "Metrics".
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by view.", ["view", "method", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries per request.", ["view", "method"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+DB_TIME = Histogram(
+    "http_request_db_duration_seconds", "Time spent in database queries per request.", ["view", "method"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+RENDER_TIME = Histogram(
+    "http_response_render_duration_seconds", "Time spent rendering (serializing) the response body.", ["view", "method"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size.", ["view", "method"],
+    buckets=(100, 1000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+
+
+class RequestMetrics:
+    # Collects one request's numbers; count_queries() hands it the queries
+    # run while it is the current_metrics.
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_started = None
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        began = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - began
+
+    def rendered(self, response):
+        self.render_time = time.perf_counter() - self.render_started
+
+
+# The metrics of the request being served. A context variable, so queries
+# run for the request in another thread (sync_to_async(), the async ORM) are
+# counted too.
+current_metrics: ContextVar[RequestMetrics | None] = ContextVar("current_metrics", default=None)
+
+
+def count_queries(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def instrument_connection(sender, connection, **kwargs):
+    # connection_created receiver (see ApiConfig.ready). Goes first, so
+    # wrappers pushed and popped by connection.execute_wrapper() stay on top.
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_queries)
+
+
+class MetricsMiddleware:
+    # Records per-view latency, query count and time, render time and
+    # response size, and reports them back in a Server-Timing header.
+    # Queries run while a streaming response is being sent are not counted.
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        request.metrics = RequestMetrics()
+        token = current_metrics.set(request.metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        request.metrics = RequestMetrics()
+        token = current_metrics.set(request.metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns.
+        request.metrics.render_started = time.perf_counter()
+        response.add_post_render_callback(request.metrics.rendered)
+        return response
+
+    def finish(self, request, response):
+        metrics: RequestMetrics = request.metrics
+        total = time.perf_counter() - metrics.started
+
+        match = request.resolver_match
+        if match is not None and match.url_name == "metrics":
+            return response
+
+        view = match.route if match is not None else "<unresolved>"
+        labels = {"view": view, "method": request.method}
+
+        REQUEST_LATENCY.labels(status=str(response.status_code), **labels).observe(total)
+        DB_QUERIES.labels(**labels).observe(metrics.queries)
+        DB_TIME.labels(**labels).observe(metrics.db_time)
+        if metrics.render_started is not None:
+            RENDER_TIME.labels(**labels).observe(metrics.render_time)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(**labels).observe(len(response.content))
+
+        if settings.METRICS_SERVER_TIMING:
+            response["Server-Timing"] = (
+                f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries", '
+                f'render;dur={metrics.render_time * 1000:.2f}, '
+                f'total;dur={total * 1000:.2f}'
+            )
+        return response
+
+
+def metrics_view(request):
+    # Per-route traffic and query counts are not for the public; see
+    # METRICS_TOKEN and METRICS_ALLOWED_IPS.
+    token = settings.METRICS_TOKEN
+    if not token and not settings.METRICS_ALLOWED_IPS:
+        raise Http404()
+
+    allowed = request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS or (
+        token and constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}")
+    )
+    if not allowed:
+        if token:
+            return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+        return HttpResponse(status=403)
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
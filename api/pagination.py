@@ -1,5 +1,33 @@
+import base64
+import binascii
+import json
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import BooleanField, F, Field, Func, IntegerField, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class RowValue(Func):
+    # Renders "(a, b, c)" so the seek predicate is a single row comparison
+    # that both PostgreSQL and SQLite can turn into an index range.
+    function = ''
+    template = '(%(expressions)s)'
+    output_field = Field()
+
+
+class CountedPaginator(DjangoPaginator):
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            # Overrides the cached_property, so no COUNT(*) is issued.
+            self.count = count
 
 
 class CustomPagination(PageNumberPagination):
@@ -9,8 +37,166 @@ class CustomPagination(PageNumberPagination):
 
     max_page_size = 50
 
+    # Opt-in keyset mode: "?cursor=" (empty) starts at the first page, the
+    # next/previous links carry an opaque position to seek from.
+    cursor_query_param = 'cursor'
+
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_ordering = self.get_cursor_ordering(request, view)
+
+        if self.cursor_ordering is None:
+            count = self.get_known_count(view)
+            self.django_paginator_class = partial(CountedPaginator, count=count)
+            return super().paginate_queryset(queryset, request, view)
+
+        return self.paginate_queryset_by_cursor(queryset, request)
+
     def get_paginated_response(self, data):
+        if self.cursor_ordering is not None:
+            return Response({
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            })
+
         return Response({
             "count": self.page.paginator.count,
             "results": data,
         })
+
+    def get_known_count(self, view):
+        # Views that maintain their own counts expose get_paginated_count();
+        # returning None falls back to COUNT(*).
+        get_count = getattr(view, 'get_paginated_count', None)
+        return get_count() if get_count is not None else None
+
+    def get_cursor_ordering(self, request, view):
+        # Views can make keyset mode the only one (cursor_only), e.g. for
+        # tables too large to count.
+        if self.cursor_query_param not in request.query_params and not getattr(view, 'cursor_only', False):
+            return None
+
+        return getattr(view, 'cursor_ordering', None)
+
+    def paginate_queryset_by_cursor(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.cursor_ordering
+        if reverse:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_lookup(ordering, position))
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+
+        if reverse:
+            results.reverse()
+            has_next, has_previous = position is not None, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        self.next_position = self.previous_position = None
+
+        if results:
+            if has_next:
+                self.next_position = self.get_position(results[-1])
+            if has_previous:
+                self.previous_position = self.get_position(results[0])
+        elif position is not None:
+            # Everything past the cursor is gone; point back at where we were.
+            self.next_position = self.previous_position = position
+
+        return results
+
+    def get_seek_lookup(self, ordering, position):
+        # Cursor orderings run every column in the same direction, which is
+        # what lets a single row comparison express "after this position".
+        columns = RowValue(*[F(field.lstrip('-')) for field in ordering])
+        values = RowValue(*[Value(value) for value in position])
+
+        if ordering[0].startswith('-'):
+            return LessThan(columns, values)
+        return GreaterThan(columns, values)
+
+    def get_position(self, item):
+        fields = [field.lstrip('-') for field in self.cursor_ordering]
+
+        if isinstance(item, dict):
+            return [item[field] for field in fields]
+        return [getattr(item, field) for field in fields]
+
+    def encode_cursor(self, position, reverse):
+        payload = {
+            "p": [value.isoformat() if hasattr(value, 'isoformat') else value for value in position],
+        }
+        if reverse:
+            payload["r"] = 1
+
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode())
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded.decode())
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = payload["p"]
+            if not isinstance(values, list) or len(values) != len(self.cursor_ordering):
+                raise ValueError
+            fields = [model._meta.get_field(field.lstrip('-')) for field in self.cursor_ordering]
+            if any(type(value) is not self.get_cursor_type(field) for field, value in zip(fields, values)):
+                raise ValueError
+            position = [field.to_python(value) for field, value in zip(fields, values)]
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, bool(payload.get("r"))
+
+    def get_cursor_type(self, field):
+        # The JSON type encode_cursor() writes for a column; dates and
+        # datetimes travel as ISO strings.
+        if isinstance(field, BooleanField):
+            return bool
+        if isinstance(field, IntegerField):
+            return int
+        return str
+
+    def get_next_link(self):
+        if self.cursor_ordering is None:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.cursor_ordering is None:
+            return super().get_previous_link()
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+
+        if getattr(view, 'cursor_ordering', None) is not None:
+            parameters.append({
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque keyset cursor. Send it empty to start cursor pagination, '
+                               'then follow the returned next/previous links.',
+                'schema': {'type': 'string'},
+            })
+
+        return parameters
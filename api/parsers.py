@@ -0,0 +1,94 @@
+import codecs
+import csv
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+
+class ORJSONParser(JSONParser):
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            data = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class LineTooLong(ValueError):
+    pass
+
+
+class StreamingParser(BaseParser):
+    # Parses the body lazily: request.data is an iterator of
+    # (line_number, row) read from the stream as it is consumed. A row that
+    # cannot be decoded is yielded as a ParseError so one bad line does not
+    # abort the rest; a line longer than TASKS_IMPORT_MAX_LINE_BYTES ends the
+    # stream with one.
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if codecs.lookup(encoding).name == 'utf-8':
+            # Drops the byte order mark Excel puts at the start of CSV files.
+            encoding = 'utf-8-sig'
+        return self.rows(codecs.iterdecode(self.lines(stream), encoding))
+
+    def lines(self, stream):
+        # Reads one bounded line at a time, so a body without line breaks is
+        # never held in memory whole.
+        limit = settings.TASKS_IMPORT_MAX_LINE_BYTES
+        while line := stream.readline(limit + 1):
+            if len(line) > limit and not line.endswith(b'\n'):
+                raise LineTooLong(f'Line too long - more than {limit} bytes')
+            yield line
+
+    def rows(self, lines):
+        raise NotImplementedError('StreamingParser.rows() must be implemented.')
+
+
+class NDJSONParser(StreamingParser):
+
+    media_type = 'application/x-ndjson'
+
+    def rows(self, lines):
+        line_number = 0
+        try:
+            for line_number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, orjson.loads(line)
+                except ValueError as exc:
+                    yield line_number, ParseError(f'JSON parse error - {exc}')
+        except UnicodeDecodeError as exc:
+            yield line_number + 1, ParseError(f'Encoding error - {exc}')
+        except LineTooLong as exc:
+            yield line_number + 1, ParseError(str(exc))
+
+
+class CSVParser(StreamingParser):
+    # The first line is the header; empty cells are left out of the row so
+    # field defaults apply.
+
+    media_type = 'text/csv'
+
+    def rows(self, lines):
+        reader = csv.DictReader(lines)
+        try:
+            for row in reader:
+                if None in row:
+                    yield reader.line_num, ParseError('CSV parse error - more values than header columns')
+                    continue
+                yield reader.line_num, {key: value for key, value in row.items() if value not in ('', None)}
+        except (csv.Error, UnicodeDecodeError) as exc:
+            yield reader.line_num + 1, ParseError(f'CSV parse error - {exc}')
+        except LineTooLong as exc:
+            yield reader.line_num + 1, ParseError(str(exc))
@@ -0,0 +1,80 @@
+import csv
+
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    # Same output as JSONRenderer with the default compact/unicode settings;
+    # anything orjson does not handle natively (lazy strings, Decimal, and
+    # datetimes, to keep DRF's format) goes through DRF's encoder.
+
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(data, default=self.encoder.default, option=option)
+
+
+class StreamingRenderer(BaseRenderer):
+    # Renders a list of rows. Views streaming a large result feed rows to
+    # stream() one at a time instead; render() covers regular responses,
+    # such as errors, in the same format.
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0]) if rows and isinstance(rows[0], dict) else []
+        return b''.join(self.stream(rows, fields))
+
+    def stream(self, rows, fields):
+        raise NotImplementedError('StreamingRenderer.stream() must be implemented.')
+
+
+class NDJSONRenderer(StreamingRenderer):
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def stream(self, rows, fields):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        default = ORJSONRenderer.encoder.default
+
+        for row in rows:
+            yield orjson.dumps(row, default=default, option=option)
+
+
+class CSVRenderer(StreamingRenderer):
+
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    class Line:
+        # csv.writer target that hands back each written line.
+
+        def write(self, value):
+            return value
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            # Error bodies map fields to lists of messages.
+            data = {key: '; '.join(map(str, value)) if isinstance(value, list) else value for key, value in data.items()}
+        return super().render(data, accepted_media_type, renderer_context)
+
+    def stream(self, rows, fields):
+        writer = csv.DictWriter(self.Line(), fieldnames=fields, extrasaction='ignore')
+
+        yield writer.writeheader().encode()
+        for row in rows:
+            yield writer.writerow(row).encode()
@@ -1,5 +1,5 @@
 from datetime import timedelta
-from decouple import config # pyright: ignore[reportMissingTypeStubs]
+from decouple import Csv, config # pyright: ignore[reportMissingTypeStubs]
 from typing import List, Dict, Any
 from pathlib import Path
 import sys
@@ -15,22 +15,123 @@ ALLOWED_HOSTS = [config("ALLOWED_HOST_1", default=""),config("ALLOWED_HOST_2", d
 
 REST_FRAMEWORK: Dict[str, Any] = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.backends.ClaimsJWTAuthentication',
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'api.pagination.CustomPagination',
+    'EXCEPTION_HANDLER': 'authentication.exceptions.exception_handler',
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.UserTokenBucketThrottle',
+        'api.throttling.IPTokenBucketThrottle',
+        'api.throttling.ScopedIPTokenBucketThrottle',
+    ],
+    # Proxies in front of the app that append to X-Forwarded-For; 0 takes
+    # the client IP from the connection, so a forged header cannot dodge the
+    # per-IP throttles.
+    'NUM_PROXIES': config("NUM_PROXIES", default=0, cast=int),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Serve the task list/detail endpoints with native async views; only useful
+# under an ASGI server (see README, "Run with uvicorn").
+TASKS_ASYNC_VIEWS = config("TASKS_ASYNC_VIEWS", default=False, cast=bool)
+
+TASKS_BULK_MAX_BATCH_SIZE = config("TASKS_BULK_MAX_BATCH_SIZE", default=200, cast=int)
+
+# Most sub-requests one POST /api/batch/ may carry.
+TASKS_BATCH_MAX_REQUESTS = config("TASKS_BATCH_MAX_REQUESTS", default=20, cast=int)
+
+TASKS_EXPORT_CHUNK_SIZE = config("TASKS_EXPORT_CHUNK_SIZE", default=2000, cast=int)
+
+# Imports insert valid rows per batch, through COPY on PostgreSQL unless
+# TASKS_IMPORT_USE_COPY is off, and report at most this many rejected rows.
+TASKS_IMPORT_BATCH_SIZE = config("TASKS_IMPORT_BATCH_SIZE", default=1000, cast=int)
+
+TASKS_IMPORT_USE_COPY = config("TASKS_IMPORT_USE_COPY", default=True, cast=bool)
+
+TASKS_IMPORT_MAX_REPORTED_ERRORS = config("TASKS_IMPORT_MAX_REPORTED_ERRORS", default=100, cast=int)
+
+# Longest line an import reads; a longer one ends the import there.
+TASKS_IMPORT_MAX_LINE_BYTES = config("TASKS_IMPORT_MAX_LINE_BYTES", default=65536, cast=int)
+
+# Most days of created/completed counts /api/tasks/stats/ returns at once.
+TASKS_STATS_MAX_DAYS = config("TASKS_STATS_MAX_DAYS", default=366, cast=int)
+
+# Delta sync (/api/tasks/changes/): deleted task ids are kept this long, and
+# older tokens must resync from scratch. New tokens trail the clock by the
+# overlap, so writes still committing (or from a host whose clock is a bit
+# behind) are picked up by the next sync.
+TASKS_SYNC_RETENTION_DAYS = config("TASKS_SYNC_RETENTION_DAYS", default=30, cast=int)
+
+TASKS_SYNC_OVERLAP_SECONDS = config("TASKS_SYNC_OVERLAP_SECONDS", default=5, cast=int)
+
+TASKS_SYNC_MAX_CHANGES = config("TASKS_SYNC_MAX_CHANGES", default=500, cast=int)
+
+TASKS_SYNC_MAX_DELETED = config("TASKS_SYNC_MAX_DELETED", default=1000, cast=int)
+
+# archive_tasks moves completed tasks not updated for this many days into
+# tasks_archive, TASKS_ARCHIVE_BATCH_SIZE per transaction.
+TASKS_ARCHIVE_AFTER_DAYS = config("TASKS_ARCHIVE_AFTER_DAYS", default=90, cast=int)
+
+TASKS_ARCHIVE_BATCH_SIZE = config("TASKS_ARCHIVE_BATCH_SIZE", default=500, cast=int)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
 
+# Requests are authenticated from token claims alone. Turn this on to also
+# reject deactivated users (and revoked tokens, with CHECK_REVOKE_TOKEN),
+# resolving users through a per-process LRU cache.
+AUTH_CHECK_USER_ACTIVE = config("AUTH_CHECK_USER_ACTIVE", default=False, cast=bool)
+
+AUTH_USER_CACHE_SIZE = config("AUTH_USER_CACHE_SIZE", default=1024, cast=int)
+
+AUTH_USER_CACHE_TTL = config("AUTH_USER_CACHE_TTL", default=60, cast=int)
+
+# Request metrics are served on /metrics (Prometheus format) to requests
+# with "Authorization: Bearer <METRICS_TOKEN>" or from METRICS_ALLOWED_IPS
+# (the connection's address). With neither set the route is off.
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+METRICS_ALLOWED_IPS = config("METRICS_ALLOWED_IPS", default="", cast=Csv())
+
+METRICS_SERVER_TIMING = config("METRICS_SERVER_TIMING", default=True, cast=bool)
+
+# Token-bucket throttles ("<requests>/<period>") per authenticated user, per
+# client IP, and per IP on login/ and register/; an empty rate turns one off.
+# The buckets live in a memory-mapped file shared by all workers on the host
+# (see README, "Throttling"). Off while running tests.
+THROTTLE_ENABLED = config("THROTTLE_ENABLED", default=True, cast=bool) and 'test' not in sys.argv
+
+THROTTLE_RATES = {
+    'user': config("THROTTLE_USER_RATE", default="600/min"),
+    'ip': config("THROTTLE_IP_RATE", default="1200/min"),
+    'login': config("THROTTLE_LOGIN_RATE", default="10/min"),
+    'register': config("THROTTLE_REGISTER_RATE", default="5/hour"),
+}
+
+# Empty: a throttle file in a directory of the current user's own, see
+# api.throttling.default_store_path().
+THROTTLE_STORE_PATH = config("THROTTLE_STORE_PATH", default="")
+
+# Buckets kept at once; 24 bytes each.
+THROTTLE_STORE_SLOTS = config("THROTTLE_STORE_SLOTS", default=65536, cast=int)
+
 INSTALLED_APPS = [
+    'api.apps.ApiConfig',
     'todo.apps.TodoConfig',
     'authentication.apps.AuthenticationConfig',
     'drf_spectacular',
@@ -42,6 +143,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,24 +173,128 @@ TEMPLATES: List[Dict[str, Any]] = [
 
 WSGI_APPLICATION = 'api.wsgi.application'
 
-if not 'test' in sys.argv:
+DB_ENGINE = config('DB_ENGINE', default='django.db.backends.postgresql')
+
+# TESTS_USE_DB=True runs the tests against the database configured below
+# instead of in-memory SQLite (for the PostgreSQL-only tests).
+if 'test' in sys.argv and not config('TESTS_USE_DB', default=False, cast=bool):
+    DATABASES: Dict[str, Any] = {    
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": ":memory:",
+        },
+        # A database of its own, only set up for the tests that route reads
+        # to it (api/tests/test_db_routers.py).
+        "replica1": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": ":memory:",
+        },
+    }
+elif DB_ENGINE == 'django.db.backends.sqlite3':
+    # Local runs and benchmarks without a PostgreSQL server.
     DATABASES: Dict[str, Any] = {
         'default': {
-            'ENGINE': 'django.db.backends.postgresql',
+            'ENGINE': DB_ENGINE,
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            # Concurrent writers wait for the lock instead of failing on a
+            # read-to-write upgrade; WAL keeps readers off the writers' way.
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            },
+        }
+    }
+else:
+    DATABASES: Dict[str, Any] = {
+        'default': {
+            'ENGINE': DB_ENGINE,
             'NAME': config('DB_NAME'),
             'USER': config('DB_USER'),
             'PASSWORD': config('DB_PASSWORD'),
             'HOST': config('DB_HOST'),
             'PORT': config('DB_PORT', '5432'),
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=int),
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            'OPTIONS': {},
         }
     }
-else:
-    DATABASES: Dict[str, Any] = {    
-        "default": {
-            "ENGINE": "django.db.backends.sqlite3",
-            "NAME": ":memory:",
+
+    # Per-process psycopg 3 connection pool; replaces persistent connections
+    # (CONN_MAX_AGE). Size max_size to at least the worker's thread count.
+    if config('DB_POOL', default=False, cast=bool):
+        from psycopg_pool import ConnectionPool
+
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            'max_idle': config('DB_POOL_MAX_IDLE', default=600, cast=float),
         }
-    }
+        if config('DB_POOL_CHECK', default=True, cast=bool):
+            DATABASES['default']['OPTIONS']['pool']['check'] = ConnectionPool.check_connection
+
+    # Server-side prepared statements (psycopg 3): a query is prepared once it
+    # has run DB_PREPARE_THRESHOLD times on a connection, which the task
+    # list/detail/count queries reach quickly. They live as long as the
+    # connection, so combine with DB_POOL or DB_CONN_MAX_AGE, and keep them off
+    # behind transaction-mode PgBouncer.
+    if config('DB_PREPARED_STATEMENTS', default=False, cast=bool):
+        DATABASES['default']['OPTIONS']['server_side_binding'] = True
+        DATABASES['default']['OPTIONS']['prepare_threshold'] = config('DB_PREPARE_THRESHOLD', default=5, cast=int)
+
+# Read replicas: safe requests read from one of DB_REPLICAS (hosts for
+# PostgreSQL, database files for SQLite; "host:port" for another port), and a
+# user who wrote reads from the primary for the next DB_REPLICA_PIN_SECONDS.
+# The pins live in the DB_REPLICA_PIN_CACHE cache, which has to be shared by
+# all workers (see README, "Read replicas").
+DATABASE_REPLICAS: List[str] = []
+
+if 'test' not in sys.argv:
+    for index, replica in enumerate(config('DB_REPLICAS', default='', cast=Csv()), start=1):
+        alias = f'replica{index}'
+        if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+            DATABASES[alias] = {**DATABASES['default'], 'NAME': replica}
+        else:
+            host, _, port = replica.partition(':')
+            DATABASES[alias] = {**DATABASES['default'], 'HOST': host, 'PORT': port or DATABASES['default']['PORT']}
+        DATABASE_REPLICAS.append(alias)
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['api.db_routers.PrimaryReplicaRouter']
+    MIDDLEWARE.insert(1, 'api.db_routers.ReplicaPinningMiddleware')
+
+DB_REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=5, cast=int)
+
+DB_REPLICA_PIN_CACHE = config('DB_REPLICA_PIN_CACHE', default='default')
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    },
+}
+
+# PBKDF2 runs in a bounded per-process pool of hashing processes (see
+# README, "Password hashing"). PASSWORD_HASHING_POOL_SIZE=0 hashes inline.
+PASSWORD_HASHERS = [
+    'authentication.hashers.PooledPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+PASSWORD_HASHING_POOL_SIZE = config("PASSWORD_HASHING_POOL_SIZE", default=2, cast=int)
+
+# Keep pool + queue size below the worker's thread count, so hashing can
+# never hold every request thread.
+PASSWORD_HASHING_QUEUE_SIZE = config("PASSWORD_HASHING_QUEUE_SIZE", default=2, cast=int)
+
+PASSWORD_HASHING_NICE = config("PASSWORD_HASHING_NICE", default=10, cast=int)
+
+# 0 keeps Django's default PBKDF2 iteration count.
+PASSWORD_HASH_ITERATIONS = config("PASSWORD_HASH_ITERATIONS", default=0, cast=int)
 
 AUTH_PASSWORD_VALIDATORS = [
     {
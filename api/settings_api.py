@@ -0,0 +1,35 @@
+"""
+API-only settings profile.
+
+The base settings without the session, CSRF, messages, clickjacking,
+template and static files machinery, none of which a JWT-only API uses.
+Select it with DJANGO_SETTINGS_MODULE=api.settings_api. The browsable API
+and the Swagger UI need templates, so they are not available here; the
+OpenAPI schema still is (with DEBUG).
+"""
+
+from api.settings import *  # noqa: F401,F403
+from api.settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in ('django.contrib.sessions', 'django.contrib.messages', 'django.contrib.staticfiles')
+]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in (
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    )
+]
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['api.renderers.ORJSONRenderer'],
+}
@@ -0,0 +1,158 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.db_routers import PrimaryReplicaRouter, ReplicaPinningMiddleware, check_replica_pin_cache
+from todo.models import Task, TaskCounter, TaskVersion
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"], DB_REPLICA_PIN_SECONDS=60)
+class PrimaryReplicaRouterTest(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        self.user = User(pk=1, username="test-user")
+
+    def request(self, method="get", user=None, write=False):
+        # Runs a request through the middleware; the view reports where a
+        # read would go after authentication (and an optional write).
+        request = getattr(self.factory, method)("/api/tasks/")
+
+        def view(request):
+            if user is not None:
+                request.user = user
+            if write:
+                self.router.db_for_write(Task)
+            return HttpResponse(self.router.db_for_read(Task))
+
+        return ReplicaPinningMiddleware(view)(request).content.decode()
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Task), "default")
+        self.assertEqual(self.router.db_for_write(Task), "default")
+
+    def test_safe_reads_use_replica(self):
+        self.assertEqual(self.request(user=self.user), "replica1")
+        self.assertEqual(self.request(), "replica1")
+
+    def test_unsafe_requests_read_from_primary(self):
+        self.assertEqual(self.request("post", user=self.user), "default")
+
+    def test_reads_after_a_write_in_the_same_request_use_primary(self):
+        self.assertEqual(self.request(user=self.user, write=True), "default")
+
+    def test_user_is_pinned_after_a_write(self):
+        self.request("post", user=self.user, write=True)
+
+        self.assertEqual(self.request(user=self.user), "default")
+        self.assertEqual(self.request(user=User(pk=2, username="other-user")), "replica1")
+
+    def test_request_without_a_write_does_not_pin(self):
+        self.request("post", user=self.user)
+
+        self.assertEqual(self.request(user=self.user), "replica1")
+
+    @override_settings(DB_REPLICA_PIN_SECONDS=0)
+    def test_pin_expires(self):
+        self.request("post", user=self.user, write=True)
+
+        self.assertEqual(self.request(user=self.user), "replica1")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertEqual(self.request(user=self.user), "default")
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate("default", "todo"))
+        self.assertFalse(self.router.allow_migrate("replica1", "todo"))
+
+
+class ReplicaPinCacheCheckTest(SimpleTestCase):
+
+    def check(self, backend, **overrides):
+        caches = {"default": {"BACKEND": f"django.core.cache.backends.{backend}"}}
+        options = {"DATABASE_REPLICAS": ["replica1"], "DB_REPLICA_PIN_CACHE": "default", "CACHES": caches, **overrides}
+        with override_settings(**options):
+            return [error.id for error in check_replica_pin_cache(None)]
+
+    def test_unshared_cache(self):
+        self.assertEqual(self.check("locmem.LocMemCache"), ["api.E002"])
+        self.assertEqual(self.check("dummy.DummyCache"), ["api.E002"])
+
+    def test_shared_cache(self):
+        self.assertEqual(self.check("filebased.FileBasedCache"), [])
+        self.assertEqual(self.check("redis.RedisCache"), [])
+
+    def test_unknown_cache(self):
+        self.assertEqual(self.check("redis.RedisCache", DB_REPLICA_PIN_CACHE="pins"), ["api.E001"])
+
+    def test_no_replicas(self):
+        self.assertEqual(self.check("locmem.LocMemCache", DATABASE_REPLICAS=[]), [])
+
+
+@override_settings(
+    DATABASE_REPLICAS=["replica1"],
+    DATABASE_ROUTERS=["api.db_routers.PrimaryReplicaRouter"],
+    MIDDLEWARE=[settings.MIDDLEWARE[0], "api.db_routers.ReplicaPinningMiddleware", *settings.MIDDLEWARE[1:]],
+    DB_REPLICA_PIN_SECONDS=60,
+)
+class ReplicaRoutingAPITest(APITestCase):
+    # The replica is a separate database holding a snapshot of the primary
+    # taken in setUp(), like a replica that lags behind.
+
+    databases = {"default", "replica1"}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+        self.outher_user = User.objects.create_user(username="test-outher-user", password="test-pwd")
+        self.outher_user_token = str(RefreshToken.for_user(self.outher_user).access_token)
+        Task.objects.create(owner=self.user, title="Replicated Task")
+
+        for model in (User, Task, TaskCounter, TaskVersion):
+            model._base_manager.using("replica1").bulk_create(model._base_manager.using("default"))
+
+        self.lagging = Task.objects.create(owner=self.user, title="Lagging Task")
+        self.url = reverse('list create tasks')
+
+    def titles(self, token):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        return [task["title"] for task in response.json()["results"]]
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.titles(self.user_token), ["Replicated Task"])
+
+        response = self.client.get(reverse('detail update delete tasks', kwargs={"pk": self.lagging.pk}), HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_404_NOT_FOUND)
+
+    def test_writes_go_to_primary(self):
+        response = self.client.patch(
+            reverse('detail update delete tasks', kwargs={"pk": self.lagging.pk}),
+            {"title": "Renamed"},
+            HTTP_AUTHORIZATION=f"Bearer {self.user_token}",
+        )
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(Task.objects.using("default").get(pk=self.lagging.pk).title, "Renamed")
+        self.assertFalse(Task.objects.using("replica1").filter(pk=self.lagging.pk).exists())
+
+    def test_user_reads_own_writes_after_a_write(self):
+        response = self.client.post(self.url, {"title": "New Task"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_201_CREATED)
+        self.assertCountEqual(self.titles(self.user_token), ["Replicated Task", "Lagging Task", "New Task"])
+
+        Task.objects.create(owner=self.outher_user, title="Outher Task")
+
+        self.assertEqual(self.titles(self.outher_user_token), [])
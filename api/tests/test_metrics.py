@@ -0,0 +1,76 @@
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from todo.models import Task
+
+
+class MetricsMiddlewareTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+        Task.objects.create(owner=self.user, title="Task Test")
+
+        self.url = reverse('list create tasks')
+        self.labels = {"view": "api/tasks/", "method": "GET"}
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, {**self.labels, **labels}) or 0
+
+    def test_request_is_recorded(self):
+        requests = self.sample("http_request_duration_seconds_count", status="200")
+        queries = self.sample("http_request_db_queries_sum")
+        renders = self.sample("http_response_render_duration_seconds_count")
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertEqual(self.sample("http_request_duration_seconds_count", status="200"), requests + 1)
+        self.assertEqual(self.sample("http_request_db_queries_sum"), queries + 3)
+        self.assertEqual(self.sample("http_response_render_duration_seconds_count"), renders + 1)
+        self.assertIn('db;dur=', response["Server-Timing"])
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+
+    @override_settings(ROOT_URLCONF="todo.async_urls")
+    async def test_async_view_queries_are_recorded(self):
+        labels = {"view": ""}
+        queries = self.sample("http_request_db_queries_sum", **labels)
+
+        response = await self.async_client.get(reverse('list create tasks'), headers={"Authorization": f"Bearer {self.user_token}"})
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertTrue(self.sample("http_request_db_queries_sum", **labels) > queries)
+        self.assertNotIn('desc="0 queries"', response["Server-Timing"])
+
+    @override_settings(METRICS_SERVER_TIMING=False)
+    def test_server_timing_disabled(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(METRICS_ALLOWED_IPS=["127.0.0.1"])
+    def test_metrics_endpoint(self):
+        self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        response = self.client.get(reverse('metrics'))
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn('http_request_duration_seconds_count{method="GET",status="200",view="api/tasks/"}', response.content.decode())
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint_token(self):
+        self.assertTrue(self.client.get(reverse('metrics')).status_code == status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION="Bearer secret").status_code == status.HTTP_200_OK)
+
+    @override_settings(METRICS_ALLOWED_IPS=["10.0.0.1"])
+    def test_metrics_endpoint_allowed_ips(self):
+        self.assertTrue(self.client.get(reverse('metrics')).status_code == status.HTTP_403_FORBIDDEN)
+        self.assertTrue(self.client.get(reverse('metrics'), REMOTE_ADDR="10.0.0.1").status_code == status.HTTP_200_OK)
+
+    def test_metrics_endpoint_off_by_default(self):
+        self.assertTrue(self.client.get(reverse('metrics')).status_code == status.HTTP_404_NOT_FOUND)
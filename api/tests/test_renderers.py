@@ -0,0 +1,95 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import BytesIO
+
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from ..parsers import CSVParser, NDJSONParser, ORJSONParser
+from ..renderers import CSVRenderer, NDJSONRenderer, ORJSONRenderer
+
+
+class ORJSONRendererUnitTest(SimpleTestCase):
+
+    def test_render_matches_json_renderer(self):
+        data = {
+            "count": 1,
+            "results": [{"title": "Tarefa ✓", "created_at": datetime(2025, 1, 2, 3, 4, 5, 6, tzinfo=timezone.utc)}],
+            "errors": {0: [ErrorDetail("Not found.", code="not_found")]},
+            "detail": gettext_lazy("Invalid page."),
+            "amount": Decimal("1.50"),
+        }
+
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_render_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_render_indent(self):
+        rendered = ORJSONRenderer().render({"id": 1}, "application/json; indent=4")
+
+        self.assertIn(b'\n', rendered)
+
+
+class ORJSONParserUnitTest(SimpleTestCase):
+
+    def test_parse_matches_json_parser(self):
+        body = '{"title": "Tarefa ✓", "priority": 2, "tags": [null, true]}'.encode()
+
+        self.assertEqual(ORJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+
+    def test_parse_invalid(self):
+        for body in (b'{"title": ', b'{"priority": NaN}'):
+            with self.assertRaises(ParseError):
+                ORJSONParser().parse(BytesIO(body))
+
+
+class StreamingParserUnitTest(SimpleTestCase):
+
+    def test_csv_with_byte_order_mark(self):
+        body = "\ufefftitle,priority\r\nBuy milk,2\r\n".encode()
+
+        self.assertEqual(list(CSVParser().parse(BytesIO(body))), [(2, {"title": "Buy milk", "priority": "2"})])
+
+    def test_ndjson_with_byte_order_mark(self):
+        body = '\ufeff{"title": "Buy milk"}\n'.encode()
+
+        self.assertEqual(list(NDJSONParser().parse(BytesIO(body))), [(1, {"title": "Buy milk"})])
+
+    @override_settings(TASKS_IMPORT_MAX_LINE_BYTES=32)
+    def test_line_too_long(self):
+        body = b'{"title": "a"}\n{"title": "' + b"a" * 100 + b'"}\n{"title": "b"}\n'
+
+        rows = list(NDJSONParser().parse(BytesIO(body)))
+
+        self.assertEqual(rows[0], (1, {"title": "a"}))
+        self.assertEqual(rows[1][0], 2)
+        self.assertIsInstance(rows[1][1], ParseError)
+        self.assertEqual(len(rows), 2)
+
+        rows = list(CSVParser().parse(BytesIO(b"title\n" + b"a" * 100)))
+
+        self.assertEqual(rows[0][0], 2)
+        self.assertIsInstance(rows[0][1], ParseError)
+
+
+class StreamingRendererUnitTest(SimpleTestCase):
+
+    def test_ndjson_stream(self):
+        rows = iter([{"id": 1, "title": "a"}, {"id": 2, "title": "b"}])
+
+        self.assertEqual(b"".join(NDJSONRenderer().stream(rows, ["id", "title"])), b'{"id":1,"title":"a"}\n{"id":2,"title":"b"}\n')
+
+    def test_csv_stream(self):
+        rows = iter([{"id": 1, "title": "a, b"}, {"id": 2, "title": None}])
+
+        self.assertEqual(b"".join(CSVRenderer().stream(rows, ["id", "title"])), b'id,title\r\n1,"a, b"\r\n2,\r\n')
+
+    def test_csv_render_error(self):
+        data = {"priority": [ErrorDetail("Select a valid choice.", code="invalid"), ErrorDetail("Too high.", code="max_value")]}
+
+        self.assertEqual(CSVRenderer().render(data), b'priority\r\nSelect a valid choice.; Too high.\r\n')
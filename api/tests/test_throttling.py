@@ -0,0 +1,171 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.throttling import GROUP_SLOTS, TokenBucketStore, default_store_path, parse_rate
+
+
+class TokenBucketStoreTest(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(Path(directory.name) / "throttle")
+        self.store = TokenBucketStore(self.path, slots=64)
+
+    def take(self, key="ip:127.0.0.1", now=1000.0, store=None):
+        with mock.patch("api.throttling.time.time", return_value=now):
+            return (store or self.store).take(key, capacity=3, per_second=0.5)
+
+    def test_burst_up_to_capacity(self):
+        self.assertEqual([self.take() for _ in range(3)], [0, 0, 0])
+        self.assertEqual(self.take(), 2.0)
+
+    def test_tokens_refill_over_time(self):
+        for _ in range(3):
+            self.take()
+
+        self.assertEqual(self.take(now=1002.0), 0)
+        self.assertEqual(self.take(now=1002.0), 2.0)
+
+    def test_refill_is_capped_at_capacity(self):
+        self.take()
+
+        self.assertEqual([self.take(now=2000.0) for _ in range(3)], [0, 0, 0])
+        self.assertEqual(self.take(now=2000.0), 2.0)
+
+    def test_keys_have_their_own_buckets(self):
+        for _ in range(3):
+            self.take()
+
+        self.assertEqual(self.take("ip:10.0.0.1"), 0)
+
+    def test_processes_share_buckets_through_the_file(self):
+        other = TokenBucketStore(self.path, slots=64)
+        for _ in range(3):
+            self.take(store=other)
+
+        self.assertEqual(self.take(), 2.0)
+
+    def test_full_group_reuses_the_stalest_bucket(self):
+        store = TokenBucketStore(str(Path(self.path).with_name("small")), slots=GROUP_SLOTS)
+        for _ in range(3):
+            self.take("ip:stale", now=1000.0, store=store)
+        for index in range(GROUP_SLOTS):
+            self.take(f"ip:{index}", now=1001.0, store=store)
+
+        self.assertEqual(self.take("ip:stale", now=1001.0, store=store), 0)
+
+    def test_symlink_is_refused(self):
+        link = Path(self.path).with_name("link")
+        link.symlink_to(self.path)
+
+        with self.assertRaises(OSError):
+            TokenBucketStore(str(link), slots=64)
+
+    def test_file_of_another_user_is_refused(self):
+        with mock.patch("api.throttling.os.getuid", return_value=os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                TokenBucketStore(self.path, slots=64)
+
+    def test_default_path_is_in_a_private_directory(self):
+        runtime = Path(self.path).parent
+        with mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": str(runtime)}):
+            path = Path(default_store_path())
+
+            self.assertEqual(path.parent, runtime / f"todo_py_api-{os.getuid()}")
+            self.assertEqual(path.parent.stat().st_mode & 0o777, 0o700)
+
+            path.parent.chmod(0o777)
+            with self.assertRaises(PermissionError):
+                default_store_path()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("10/min"), (10, 60))
+        self.assertEqual(parse_rate("5/hour"), (5, 3600))
+        self.assertEqual(parse_rate("100/s"), (100, 1))
+
+
+class ThrottleAPITest(APITestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        throttling = override_settings(
+            THROTTLE_ENABLED=True,
+            THROTTLE_STORE_PATH=str(Path(directory.name) / "throttle"),
+            THROTTLE_RATES={"user": "2/min", "ip": "3/min", "login": "1/min", "register": "1/hour"},
+        )
+        throttling.enable()
+        self.addCleanup(throttling.disable)
+
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.user_token = RefreshToken.for_user(self.user).access_token
+        self.outher_user = User.objects.create_user(username="test-outher-user", password="test-pwd")
+        self.outher_user_token = RefreshToken.for_user(self.outher_user).access_token
+        self.url = reverse('list create tasks')
+
+    def test_tasks_throttled_per_user(self):
+        for _ in range(2):
+            response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+            self.assertTrue(response.status_code == status.HTTP_200_OK)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "30")
+
+        response = self.client.get(self.url, REMOTE_ADDR="10.0.0.1", HTTP_AUTHORIZATION=f"Bearer {self.outher_user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+
+    def test_tasks_throttled_per_ip(self):
+        for _ in range(2):
+            self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.outher_user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.outher_user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_login_throttled_per_ip(self):
+        data = {"username": "test-user", "password": "test-pwd"}
+
+        response = self.client.post(reverse('login'), data)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+
+        response = self.client.post(reverse('login'), data)
+
+        self.assertTrue(response.status_code == status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("detail", response.json())
+
+        response = self.client.post(reverse('login'), data, REMOTE_ADDR="10.0.0.1")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+
+    def test_register_throttled_per_ip(self):
+        response = self.client.post(reverse('register'), {"username": "new-user", "password": "new-pwd"})
+
+        self.assertTrue(response.status_code == status.HTTP_201_CREATED)
+
+        response = self.client.post(reverse('register'), {"username": "other-new-user", "password": "new-pwd"})
+
+        self.assertTrue(response.status_code == status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertFalse(User.objects.filter(username="other-new-user").exists())
+
+    @override_settings(THROTTLE_ENABLED=False)
+    def test_disabled(self):
+        for _ in range(3):
+            response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+            self.assertTrue(response.status_code == status.HTTP_200_OK)
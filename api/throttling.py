@@ -0,0 +1,170 @@
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import stat
+import struct
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+# Token buckets shared by all the worker processes of a host through a
+# memory-mapped file (THROTTLE_STORE_PATH). A check is a hash, a byte-range
+# lock and a few bytes read and written: no cache or database round trip.
+# See README, "Throttling".
+
+# Key hash, tokens left, time of the last refill.
+SLOT = struct.Struct("=Qdd")
+
+# A key hashes to a group of slots, locked as one byte range.
+GROUP_SLOTS = 8
+GROUP_BYTES = GROUP_SLOTS * SLOT.size
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+@lru_cache
+def parse_rate(rate: str) -> tuple[int, int]:
+    # DRF's format: "<requests>/<period>", with a period of s, m, h or d
+    # ("sec", "min", "hour" and "day" work too).
+    requests, period = rate.split("/")
+    return int(requests), PERIODS[period[0]]
+
+
+class TokenBucketStore:
+    # A fixed-size hash table of buckets. When a key's group is full, the
+    # bucket refilled longest ago is reused, so the file never grows; a
+    # bucket left alone that long would be full again anyway.
+
+    def __init__(self, path: str, slots: int):
+        # The file is shared memory for whoever can write it: a symlink or a
+        # file planted by another user is refused.
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        info = os.fstat(self.fd)
+        if info.st_uid != os.getuid():
+            os.close(self.fd)
+            raise PermissionError(f"{path} belongs to another user")
+        size = max(info.st_size, math.ceil(slots / GROUP_SLOTS) * GROUP_BYTES)
+        os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size)
+        self.groups = size // GROUP_BYTES
+        # Record locks belong to the process, so threads take this first.
+        self.lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, per_second: float) -> float:
+        # Takes a token from the key's bucket. Returns 0 when there was one,
+        # otherwise the seconds until the next one.
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        start = digest % self.groups * GROUP_BYTES
+
+        with self.lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, GROUP_BYTES, start)
+            try:
+                now = time.time()
+                offset = self.find(start, digest)
+                stored, tokens, refilled = SLOT.unpack_from(self.map, offset)
+                if stored != digest:
+                    tokens, refilled = capacity, now
+
+                tokens = min(capacity, tokens + max(now - refilled, 0) * per_second)
+                wait = 0.0 if tokens >= 1 else (1 - tokens) / per_second
+                if not wait:
+                    tokens -= 1
+
+                SLOT.pack_into(self.map, offset, digest, tokens, now)
+                return wait
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, GROUP_BYTES, start)
+
+    def find(self, start: int, digest: int) -> int:
+        oldest, oldest_refill = start, None
+        for offset in range(start, start + GROUP_BYTES, SLOT.size):
+            stored, _, refilled = SLOT.unpack_from(self.map, offset)
+            if stored == digest or stored == 0:
+                return offset
+            if oldest_refill is None or refilled < oldest_refill:
+                oldest, oldest_refill = offset, refilled
+        return oldest
+
+
+def default_store_path() -> str:
+    # <XDG_RUNTIME_DIR or tmp>/todo_py_api-<uid>/throttle, in a directory
+    # that only the current user can open.
+    directory = Path(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()) / f"todo_py_api-{os.getuid()}"
+    try:
+        directory.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+
+    info = directory.lstat()
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{directory} must be a directory that only the current user can open")
+    return str(directory / "throttle")
+
+
+@lru_cache
+def get_store(path: str, slots: int) -> TokenBucketStore:
+    return TokenBucketStore(path or default_store_path(), slots)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    # Allows bursts of up to the rate's request count, refilled evenly over
+    # its period. Subclasses name the bucket; a throttle without a rate
+    # (THROTTLE_RATES) or a key lets the request through.
+
+    scope = None
+
+    def get_scope(self, view):
+        return self.scope
+
+    def get_key(self, request, view, scope: str):
+        raise NotImplementedError(".get_key() must be overridden")
+
+    def allow_request(self, request, view):
+        self.delay = 0.0
+        scope = self.get_scope(view)
+        rate = settings.THROTTLE_RATES.get(scope) if settings.THROTTLE_ENABLED and scope else None
+        if not rate:
+            return True
+
+        key = self.get_key(request, view, scope)
+        if key is None:
+            return True
+
+        requests, period = parse_rate(rate)
+        store = get_store(settings.THROTTLE_STORE_PATH, settings.THROTTLE_STORE_SLOTS)
+        self.delay = store.take(key, requests, requests / period)
+        return not self.delay
+
+    def wait(self):
+        return self.delay
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    scope = "user"
+
+    def get_key(self, request, view, scope):
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            return None
+        return f"{scope}:{user.pk}"
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    scope = "ip"
+
+    def get_key(self, request, view, scope):
+        return f"{scope}:{self.get_ident(request)}"
+
+
+class ScopedIPTokenBucketThrottle(IPTokenBucketThrottle):
+    # Per-IP buckets for views that set a throttle_scope (login/, register/).
+
+    def get_scope(self, view):
+        return getattr(view, "throttle_scope", None)
@@ -1,14 +1,24 @@
-from api.settings import DEBUG
+from django.conf import settings
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from api.metrics import metrics_view
+from todo.views import TaskBatchApiView
+
 urlpatterns = [
     path('api/auth/', include("authentication.urls")),
-    path('api/tasks/', include("todo.urls")),
+    path('api/tasks/', include("todo.async_urls" if settings.TASKS_ASYNC_VIEWS else "todo.urls")),
+    path('api/batch/', TaskBatchApiView.as_view(), name='batch'),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
-if DEBUG:
+if settings.DEBUG:
     urlpatterns += [
         path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-        path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     ]
+
+    # The Swagger UI is a template; the API-only profile has none.
+    if settings.TEMPLATES:
+        urlpatterns += [
+            path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+        ]
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from django.db.models.signals import post_delete, post_save
+
+        # Registers the OpenAPI extension for ClaimsJWTAuthentication.
+        from . import schema  # noqa: F401
+        from .backends import invalidate_cached_user
+
+        # Deactivation and password changes both save the user.
+        post_save.connect(invalidate_cached_user, sender=User, dispatch_uid="invalidate_cached_user_on_save")
+        post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid="invalidate_cached_user_on_delete")
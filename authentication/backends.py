@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    # Bounded, per-process LRU of User rows with a TTL. Entries are dropped
+    # through invalidate() when a user is saved or deleted in this process;
+    # other workers see the change once the TTL runs out.
+
+    def __init__(self):
+        self.entries: OrderedDict[int, tuple[float, User | None]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id: int) -> User | None:
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(user_id)
+                return entry[1]
+
+        user = User.objects.filter(pk=user_id).first()
+
+        with self.lock:
+            self.entries[user_id] = (now + settings.AUTH_USER_CACHE_TTL, user)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > settings.AUTH_USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+        return user
+
+    def invalidate(self, user_id: int):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+class ClaimsUser(TokenUser):
+    # request.user built only from the validated token. Views that need the
+    # real row go through .user, which is served from user_cache.
+
+    @cached_property
+    def id(self) -> int: # type: ignore[override]
+        return User._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM]) # type: ignore
+
+    @cached_property
+    def pk(self) -> int: # type: ignore[override]
+        return self.id
+
+    @cached_property
+    def user(self) -> User | None:
+        return user_cache.get(self.id)
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+
+    async def aauthenticate(self, request):
+        # Only the optional user check touches the database; plain claims
+        # authentication stays on the event loop.
+        if settings.AUTH_CHECK_USER_ACTIVE:
+            return await sync_to_async(self.authenticate)(request)
+        return self.authenticate(request)
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        claims_user = ClaimsUser(validated_token)
+
+        try:
+            claims_user.id
+        except ValidationError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        if settings.AUTH_CHECK_USER_ACTIVE:
+            self.check_user(claims_user.user, validated_token)
+
+        return claims_user
+
+    def check_user(self, user: User | None, validated_token):
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+
+def invalidate_cached_user(sender, instance: User, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+def deleted_user_error(request) -> AuthenticationFailed | None:
+    # Without AUTH_CHECK_USER_ACTIVE, a deleted user's token stays valid
+    # until it expires, and a write that references the user breaks a
+    # foreign key. Called on an IntegrityError: returns the 401 to report
+    # instead when the user is gone.
+    user_id = getattr(request.user, "pk", None)
+    if user_id is None or User.objects.filter(pk=user_id).exists():
+        return None
+    user_cache.invalidate(user_id)
+    return AuthenticationFailed(_("User not found"), code="user_not_found")
@@ -0,0 +1,13 @@
+from django.db import IntegrityError
+from rest_framework.views import exception_handler as default_exception_handler
+
+from .backends import deleted_user_error
+
+
+def exception_handler(exc, context):
+    # DRF's handler, plus the 401 for writes by a deleted user.
+    request = context["request"]
+    if isinstance(exc, IntegrityError) and (error := deleted_user_error(request)) is not None:
+        error.auth_header = context["view"].get_authenticate_header(request)
+        exc = error
+    return default_exception_handler(exc, context)
@@ -0,0 +1,107 @@
+import base64
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.utils.encoding import force_bytes
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many password checks in progress, try again shortly.")
+    default_code = "password_hashing_busy"
+    wait = 1
+
+
+def lower_priority(niceness: int):
+    os.nice(niceness)
+
+
+class HashingPool:
+    # Per-process pool of hashing processes. At most pool size + queue size
+    # hashes are in flight; callers beyond that are rejected at once, so a
+    # login storm can neither tie up every request thread nor take every
+    # CPU from the request workers.
+
+    def __init__(self):
+        self.executor: ProcessPoolExecutor | None = None
+        self.slots: threading.BoundedSemaphore | None = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.executor is None:
+                # Forking a threaded server is unsafe; the workers only need hashlib.
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+                self.executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHING_POOL_SIZE,
+                    mp_context=context,
+                    initializer=lower_priority,
+                    initargs=(settings.PASSWORD_HASHING_NICE,),
+                )
+            if self.slots is None:
+                self.slots = threading.BoundedSemaphore(settings.PASSWORD_HASHING_POOL_SIZE + settings.PASSWORD_HASHING_QUEUE_SIZE)
+        return self.executor, self.slots
+
+    def restart(self, broken: ProcessPoolExecutor):
+        # Drops a pool a hashing process died in; the next start() builds a
+        # new one. Callers that hit the same broken pool drop it only once,
+        # and the slots (with their holders) carry over.
+        with self.lock:
+            if self.executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown()
+            self.executor = self.slots = None
+
+    def pbkdf2(self, digest: str, password: bytes, salt: bytes, iterations: int) -> bytes:
+        if settings.PASSWORD_HASHING_POOL_SIZE <= 0:
+            return hashlib.pbkdf2_hmac(digest, password, salt, iterations)
+
+        executor, slots = self.start()
+        if not slots.acquire(blocking=False):
+            raise PasswordHashingBusy()
+        try:
+            return executor.submit(hashlib.pbkdf2_hmac, digest, password, salt, iterations).result()
+        except BrokenProcessPool:
+            # A hashing process was killed (e.g. by the OOM killer). This
+            # hash runs here; later ones get a fresh pool.
+            self.restart(executor)
+            return hashlib.pbkdf2_hmac(digest, password, salt, iterations)
+        finally:
+            slots.release()
+
+
+hashing_pool = HashingPool()
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    # Same algorithm name and hash format as Django's PBKDF2 hasher, so
+    # stored hashes keep working; only the key derivation moves to
+    # hashing_pool. Both set_password() and check_password() go through
+    # encode().
+
+    @property
+    def iterations(self) -> int: # type: ignore[override]
+        return settings.PASSWORD_HASH_ITERATIONS or PBKDF2PasswordHasher.iterations
+
+    def encode(self, password, salt, iterations=None):
+        self._check_encode_args(password, salt)
+        iterations = iterations or self.iterations
+        hash = hashing_pool.pbkdf2(self.digest().name, force_bytes(password), force_bytes(salt), iterations)
+        hash = base64.b64encode(hash).decode("ascii").strip()
+        return "%s$%d$%s$%s" % (self.algorithm, iterations, salt, hash)
@@ -0,0 +1,6 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    # Bearer JWT in the OpenAPI schema, like the simplejwt backends.
+    target_class = "authentication.backends.ClaimsJWTAuthentication"
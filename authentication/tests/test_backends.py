@@ -0,0 +1,90 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..backends import ClaimsJWTAuthentication, ClaimsUser, user_cache
+
+
+class ClaimsJWTAuthenticationUnitTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        self.request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        user_cache.clear()
+
+    def test_authenticate_without_querying_users(self):
+        with self.assertNumQueries(0):
+            request_user, _ = ClaimsJWTAuthentication().authenticate(self.request) # type: ignore
+
+        self.assertIsInstance(request_user, ClaimsUser)
+        self.assertEqual(request_user.pk, self.user.pk)
+        self.assertTrue(request_user.is_authenticated)
+
+    def test_real_user_is_cached(self):
+        request_user, _ = ClaimsJWTAuthentication().authenticate(self.request) # type: ignore
+
+        self.assertEqual(request_user.user, self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(user_cache.get(self.user.pk), self.user)
+
+    @override_settings(AUTH_CHECK_USER_ACTIVE=True)
+    def test_deactivated_user_is_rejected(self):
+        ClaimsJWTAuthentication().authenticate(self.request)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            ClaimsJWTAuthentication().authenticate(self.request)
+
+    @override_settings(AUTH_CHECK_USER_ACTIVE=True)
+    def test_deleted_user_is_rejected(self):
+        ClaimsJWTAuthentication().authenticate(self.request)
+
+        self.user.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            ClaimsJWTAuthentication().authenticate(self.request)
+
+
+class UserCacheUnitTest(TestCase):
+
+    def setUp(self):
+        self.users = [User.objects.create(username=f"test-user-{index}") for index in range(3)]
+        user_cache.clear()
+
+    @override_settings(AUTH_USER_CACHE_SIZE=2)
+    def test_least_recently_used_is_evicted(self):
+        for user in self.users:
+            user_cache.get(user.pk)
+
+        self.assertEqual(list(user_cache.entries), [self.users[1].pk, self.users[2].pk])
+
+    @override_settings(AUTH_USER_CACHE_TTL=0)
+    def test_expired_entries_are_reloaded(self):
+        user_cache.get(self.users[0].pk)
+
+        with self.assertNumQueries(1):
+            user_cache.get(self.users[0].pk)
+
+    def test_password_change_invalidates(self):
+        user_cache.get(self.users[0].pk)
+
+        self.users[0].set_password("new-pwd")
+        self.users[0].save()
+
+        self.assertNotIn(self.users[0].pk, user_cache.entries)
+
+
+class ClaimsJWTSchemeUnitTest(SimpleTestCase):
+
+    def test_bearer_auth_in_schema(self):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+
+        self.assertEqual(schema["components"]["securitySchemes"]["jwtAuth"]["scheme"], "bearer")
+        self.assertIn({"jwtAuth": []}, schema["paths"]["/api/tasks/"]["get"]["security"])
@@ -0,0 +1,82 @@
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, make_password
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..hashers import PasswordHashingBusy, hashing_pool
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class PooledPBKDF2PasswordHasherUnitTest(TestCase):
+
+    def setUp(self):
+        hashing_pool.shutdown()
+
+    def tearDown(self):
+        hashing_pool.shutdown()
+
+    def test_hashes_are_compatible_with_pbkdf2(self):
+        encoded = make_password("test-pwd")
+
+        self.assertTrue(encoded.startswith("pbkdf2_sha256$1000$"))
+        self.assertTrue(PBKDF2PasswordHasher().verify("test-pwd", encoded))
+        self.assertTrue(check_password("test-pwd", PBKDF2PasswordHasher().encode("test-pwd", "somesalt", 1000)))
+        self.assertFalse(check_password("wrong-pwd", encoded))
+
+    @override_settings(PASSWORD_HASHING_POOL_SIZE=0)
+    def test_inline_hashing(self):
+        self.assertTrue(check_password("test-pwd", make_password("test-pwd")))
+        self.assertIsNone(hashing_pool.executor)
+
+    @override_settings(PASSWORD_HASHING_POOL_SIZE=1)
+    def test_pool_recovers_from_a_killed_worker(self):
+        encoded = make_password("test-pwd")
+        executor = hashing_pool.executor
+        for process in list(executor._processes.values()):
+            process.kill()
+            process.join()
+
+        self.assertTrue(check_password("test-pwd", encoded))
+        self.assertIsNot(hashing_pool.executor, executor)
+        self.assertTrue(check_password("test-pwd", make_password("test-pwd")))
+        self.assertIsNotNone(hashing_pool.executor)
+
+    @override_settings(PASSWORD_HASHING_POOL_SIZE=1, PASSWORD_HASHING_QUEUE_SIZE=0)
+    def test_full_pool_rejects(self):
+        _, slots = hashing_pool.start()
+        slots.acquire()
+
+        with self.assertRaises(PasswordHashingBusy):
+            make_password("test-pwd")
+
+        slots.release()
+        self.assertTrue(check_password("test-pwd", make_password("test-pwd")))
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000, PASSWORD_HASHING_POOL_SIZE=1, PASSWORD_HASHING_QUEUE_SIZE=0)
+class PasswordHashingBusyAPITest(APITestCase):
+
+    def setUp(self):
+        hashing_pool.shutdown()
+        User.objects.create_user(username="test-user", password="test-pwd")
+
+        _, self.slots = hashing_pool.start()
+        self.slots.acquire()
+
+    def tearDown(self):
+        self.slots.release()
+        hashing_pool.shutdown()
+
+    def test_login_rejected_while_pool_is_full(self):
+        response = self.client.post(reverse('login'), {"username": "test-user", "password": "test-pwd"})
+
+        self.assertTrue(response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_register_rejected_while_pool_is_full(self):
+        response = self.client.post(reverse('register'), {"username": "new-user", "password": "new-pwd"})
+
+        self.assertTrue(response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(User.objects.filter(username="new-user").exists())
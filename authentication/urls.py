@@ -1,10 +1,10 @@
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
-from .views import CreateUserView
+from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
+from .views import CreateUserView, LoginView
 from django.urls import path
 
 urlpatterns = [
     path('register/', CreateUserView.as_view(), name="register"),
-    path('login/', TokenObtainPairView.as_view(), name="login"),
+    path('login/', LoginView.as_view(), name="login"),
     path('token/verify/', TokenVerifyView.as_view(), name="verify_token"),
     path('token/refresh/', TokenRefreshView.as_view(), name="refresh"),
 ]
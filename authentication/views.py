@@ -2,6 +2,7 @@ from django.contrib.auth.models import User
 from .serializers import UserSerializer
 from rest_framework import generics
 from rest_framework.permissions import AllowAny
+from rest_framework_simplejwt.views import TokenObtainPairView
 from drf_spectacular.utils import extend_schema_view, extend_schema
 
 # Create your views here.
@@ -13,4 +14,9 @@ from drf_spectacular.utils import extend_schema_view, extend_schema
 class CreateUserView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
-    permission_classes = [AllowAny]
\ No newline at end of file
+    permission_classes = [AllowAny]
+    throttle_scope = "register"
+
+
+class LoginView(TokenObtainPairView):
+    throttle_scope = "login"
@@ -0,0 +1,44 @@
+"""Compare the sync DRF views under gunicorn (WSGI) with the native async
+views under uvicorn (ASGI, TASKS_ASYNC_VIEWS=True).
+
+    python -m benchmarks.asgi_vs_wsgi --concurrency 64 --duration 15 --workers 4
+"""
+import argparse
+
+from .common import HEADER, benchmark_env, free_port, gunicorn, run_load, seed, setup_django, uvicorn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks seeded for the benchmark user.")
+    parser.add_argument("--workers", type=int, default=2, help="Server worker processes.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 64], help="Concurrent connections (one run per value).")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds measured per run.")
+    args = parser.parse_args()
+
+    env = benchmark_env()
+    setup_django(env)
+    token = seed(tasks=args.tasks)
+
+    from todo.models import Task
+
+    task_ids = list(Task.objects.filter(owner__username="benchmark").values_list("pk", flat=True)[:100])
+    requests = [("GET", "/api/tasks/?page=1", None), ("GET", "/api/tasks/?is_done=false&page=3", None)]
+    requests += [("GET", f"/api/tasks/{pk}/", None) for pk in task_ids[:20]]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    servers = {
+        "gunicorn/wsgi": lambda port: gunicorn(port, args.workers, env),
+        "uvicorn/asgi (async views)": lambda port: uvicorn(port, args.workers, dict(env, TASKS_ASYNC_VIEWS="True")),
+    }
+
+    print(HEADER)
+    for concurrency in args.concurrency:
+        for name, server in servers.items():
+            port = free_port()
+            with server(port):
+                print(run_load(f"{name} c={concurrency}", port, requests, headers, concurrency, args.duration).row(), flush=True)
+
+
+if __name__ == "__main__":
+    main()
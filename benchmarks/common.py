@@ -0,0 +1,209 @@
+"""Shared helpers for the benchmark scripts.
+
+Each benchmark runs against a throwaway SQLite database (or the database
+described by the DB_* environment variables when DB_ENGINE is set), starts
+real server processes and drives them with a small thread-based HTTP load
+generator, so no extra load-testing tools are required.
+"""
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def benchmark_env(**overrides) -> dict[str, str]:
+    env = dict(os.environ, **overrides)
+    env.setdefault("SECRET_KEY", "benchmark")
+    env.setdefault("DB_ENGINE", "django.db.backends.sqlite3")
+    if env["DB_ENGINE"] == "django.db.backends.sqlite3":
+        env.setdefault("DB_NAME", str(Path(tempfile.gettempdir()) / "todo_py_api_benchmark.sqlite3"))
+    env["DEBUG"] = "False"
+    # One client sends all the load; throttling would cut it off.
+    env.setdefault("THROTTLE_ENABLED", "False")
+    env["DJANGO_SETTINGS_MODULE"] = "api.settings"
+    return env
+
+
+def setup_django(env: dict[str, str]):
+    os.environ.update(env)
+    sys.path.insert(0, str(BASE_DIR))
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command("migrate", verbosity=0)
+
+
+def seed(username: str = "benchmark", tasks: int = 1000) -> str:
+    """Create (or reset) a user with `tasks` tasks; returns an access token."""
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from todo.models import Task
+
+    user, _ = User.objects.get_or_create(username=username)
+    Task.objects.filter(owner=user).delete()
+    Task.objects.bulk_create(
+        [Task(owner=user, title=f"Task {index}", priority=index % 3 + 1, is_done=index % 4 == 0) for index in range(tasks)],
+        batch_size=500,
+    )
+    return str(RefreshToken.for_user(user).access_token)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """A server subprocess that is stopped on exit from the `with` block."""
+
+    def __init__(self, command: list[str], port: int, env: dict[str, str]):
+        self.command = command
+        self.port = port
+        self.env = env
+
+    def __enter__(self):
+        self.process = subprocess.Popen(self.command, cwd=BASE_DIR, env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.5).close()
+                return self
+            except OSError:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"{self.command[0]} exited with {self.process.returncode}")
+                time.sleep(0.1)
+        self.process.kill()
+        raise RuntimeError(f"{self.command[0]} did not start listening on port {self.port}")
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def gunicorn(port: int, workers: int, env: dict[str, str], threads: int = 1) -> Server:
+    return Server(
+        [sys.executable, "-m", "gunicorn", "api.wsgi:application", "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--threads", str(threads)],
+        port, env,
+    )
+
+
+def uvicorn(port: int, workers: int, env: dict[str, str]) -> Server:
+    return Server(
+        [sys.executable, "-m", "uvicorn", "api.asgi:application", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--no-access-log"],
+        port, env,
+    )
+
+
+@dataclass
+class Result:
+    name: str
+    duration: float
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def rps(self) -> float:
+        return len(self.latencies) / self.duration
+
+    def percentile(self, value: float) -> float:
+        if not self.latencies:
+            return float("nan")
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * value / 100))]
+
+    def summary(self) -> dict:
+        return {
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "rps": round(self.rps, 2),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+        }
+
+    def row(self) -> str:
+        return (
+            f"{self.name:<32} {self.rps:>9.1f} {self.percentile(50) * 1000:>9.2f} "
+            f"{self.percentile(95) * 1000:>9.2f} {self.percentile(99) * 1000:>9.2f} {self.errors:>7}"
+        )
+
+
+HEADER = f"{'scenario':<32} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+
+# (method, path, body) or (method, path, body, extra headers)
+Request = tuple
+
+
+def run_load(
+    name: str,
+    port: int,
+    requests: list[Request] | Callable[[], Request],
+    headers: dict[str, str],
+    concurrency: int,
+    duration: float,
+    warmup: float = 1.0,
+) -> Result:
+    """Send requests from `concurrency` keep-alive connections for `duration`
+    seconds after a warmup. `requests` is either a list replayed round-robin
+    or a callable returning the next request (e.g. to use a fresh id)."""
+    if callable(requests):
+        next_request = lambda index: requests()
+    else:
+        next_request = lambda index: requests[index % len(requests)]
+
+    result = Result(name, duration)
+    lock = threading.Lock()
+    start = time.monotonic() + warmup
+    stop = start + duration
+
+    def worker(offset: int):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        latencies, errors = [], 0
+        index = offset
+        while True:
+            method, path, body, *extra = next_request(index)
+            index += 1
+            began = time.monotonic()
+            if began >= stop:
+                break
+            try:
+                connection.request(method, path, body=body, headers=dict(headers, **extra[0]) if extra else headers)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                ok = False
+            if began >= start:
+                if ok:
+                    latencies.append(time.monotonic() - began)
+                else:
+                    errors += 1
+        connection.close()
+        with lock:
+            result.latencies += latencies
+            result.errors += errors
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return result
@@ -0,0 +1,71 @@
+"""Measure what connection reuse and prepared statements save per request
+on PostgreSQL: gunicorn with a new connection per request (the default),
+with the psycopg 3 pool (DB_POOL) and with the pool plus server-side
+prepared statements (DB_PREPARED_STATEMENTS).
+
+Needs a PostgreSQL server described by DB_NAME/DB_USER/DB_PASSWORD/DB_HOST
+(see compose.yml):
+
+    python -m benchmarks.db_connections --workers 2 --threads 4 --concurrency 16
+"""
+import argparse
+import os
+import statistics
+import time
+
+from .common import HEADER, benchmark_env, free_port, gunicorn, run_load, seed, setup_django
+
+
+def connection_setup_time(samples: int) -> float:
+    from django.db import connection
+
+    timings = []
+    for _ in range(samples):
+        connection.close()
+        began = time.monotonic()
+        connection.ensure_connection()
+        timings.append(time.monotonic() - began)
+    connection.close()
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks seeded for the benchmark user.")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes.")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent connections.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds measured per run.")
+    args = parser.parse_args()
+
+    env = benchmark_env(DB_ENGINE=os.environ.get("DB_ENGINE", "django.db.backends.postgresql"))
+    if env["DB_ENGINE"] != "django.db.backends.postgresql":
+        parser.error("this benchmark needs PostgreSQL (DB_ENGINE=django.db.backends.postgresql)")
+
+    setup_django(env)
+    token = seed(tasks=args.tasks)
+    print(f"median connection setup: {connection_setup_time(20) * 1000:.2f} ms\n")
+
+    from todo.models import Task
+
+    task_ids = list(Task.objects.filter(owner__username="benchmark").values_list("pk", flat=True)[:20])
+    requests = [("GET", "/api/tasks/?page=1", None), ("GET", "/api/tasks/?is_done=false&page=3", None)]
+    requests += [("GET", f"/api/tasks/{pk}/", None) for pk in task_ids]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    pool = {"DB_POOL": "True", "DB_POOL_MIN_SIZE": str(args.threads), "DB_POOL_MAX_SIZE": str(args.threads)}
+    scenarios = {
+        "connection per request": {"DB_CONN_MAX_AGE": "0"},
+        "pool": pool,
+        "pool + prepared statements": dict(pool, DB_PREPARED_STATEMENTS="True"),
+    }
+
+    print(HEADER)
+    for name, overrides in scenarios.items():
+        port = free_port()
+        with gunicorn(port, args.workers, dict(env, **overrides), threads=args.threads):
+            print(run_load(name, port, requests, headers, args.concurrency, args.duration).row(), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Time one task list page end to end inside the process (query, serialize,
+render), comparing model instances + TaskListSerializer + JSONRenderer with
+the .values() fast path + ORJSONRenderer.
+
+    python -m benchmarks.list_serialization --page-size 50
+"""
+import argparse
+import timeit
+
+from .common import benchmark_env, seed, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=50, help="Tasks per page.")
+    parser.add_argument("--repeat", type=int, default=2000, help="Pages timed per variant.")
+    args = parser.parse_args()
+
+    setup_django(benchmark_env())
+    seed(tasks=args.page_size * 4)
+
+    from rest_framework.renderers import JSONRenderer
+
+    from api.renderers import ORJSONRenderer
+    from todo.models import Task
+    from todo.serializers import TaskListSerializer, TaskListValuesSerializer
+
+    tasks = Task.objects.filter(owner__username="benchmark")
+    size = args.page_size
+
+    def model_serializer():
+        return JSONRenderer().render(TaskListSerializer(list(tasks[:size]), many=True).data)
+
+    def values_fast_path():
+        return ORJSONRenderer().render(TaskListValuesSerializer(list(tasks.values(*TaskListValuesSerializer.fields)[:size])).data)
+
+    rows = list(tasks[:size])
+
+    def model_serializer_no_db():
+        return JSONRenderer().render(TaskListSerializer(rows, many=True).data)
+
+    values = list(tasks.values(*TaskListValuesSerializer.fields)[:size])
+
+    def values_fast_path_no_db():
+        return ORJSONRenderer().render(TaskListValuesSerializer([dict(row) for row in values]).data)
+
+    results = {}
+    for name, function in [
+        ("ModelSerializer + JSONRenderer", model_serializer),
+        ("values() + ORJSONRenderer", values_fast_path),
+        ("  serialize+render only (model)", model_serializer_no_db),
+        ("  serialize+render only (values)", values_fast_path_no_db),
+    ]:
+        function()
+        results[name] = min(timeit.repeat(function, number=args.repeat // 10, repeat=10)) / (args.repeat // 10)
+
+    print(f"{'variant':<34} {'us/page':>10}")
+    for name, seconds in results.items():
+        print(f"{name:<34} {seconds * 1e6:>10.1f}")
+
+    print(f"\nspeedup for a {size}-item page: {results['ModelSerializer + JSONRenderer'] / results['values() + ORJSONRenderer']:.1f}x end to end, "
+          f"{results['  serialize+render only (model)'] / results['  serialize+render only (values)']:.1f}x without the query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Task endpoint latency during a login storm, with password hashing inline
+in the request workers (PASSWORD_HASHING_POOL_SIZE=0) versus in the bounded
+hashing pool. Uses threaded gunicorn workers, where inline hashing competes
+with task requests for the worker's CPU.
+
+    python -m benchmarks.login_storm --workers 2 --threads 8 --login-concurrency 32
+"""
+import argparse
+import json
+import threading
+
+from .common import HEADER, benchmark_env, free_port, gunicorn, run_load, seed, setup_django
+
+PASSWORD = "Benchmark-pwd-2025"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes.")
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads per worker.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent task requests.")
+    parser.add_argument("--login-concurrency", type=int, default=32, help="Concurrent logins during the storm.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds measured per scenario.")
+    args = parser.parse_args()
+
+    env = benchmark_env()
+    setup_django(env)
+    token = seed(tasks=100)
+
+    from django.contrib.auth.models import User
+
+    from todo.models import Task
+
+    user = User.objects.get(username="benchmark")
+    user.set_password(PASSWORD)
+    user.save()
+
+    pk = Task.objects.filter(owner=user).values_list("pk", flat=True).first()
+    tasks = [("GET", f"/api/tasks/{pk}/", None), ("GET", "/api/tasks/?page=2", None)]
+    logins = [("POST", "/api/auth/login/", json.dumps({"username": "benchmark", "password": PASSWORD}))]
+
+    scenarios = [
+        ("no storm", {}, False),
+        ("storm, inline hashing", {"PASSWORD_HASHING_POOL_SIZE": "0"}, True),
+        ("storm, hashing pool", {}, True),
+    ]
+
+    print(HEADER)
+    for name, overrides, storm in scenarios:
+        port = free_port()
+        with gunicorn(port, args.workers, dict(env, **overrides), threads=args.threads):
+            login_result = []
+            if storm:
+                storming = threading.Thread(target=lambda: login_result.append(run_load(
+                    f"  login ({name})", port, logins, {"Content-Type": "application/json"}, args.login_concurrency, args.duration,
+                )))
+                storming.start()
+
+            result = run_load(f"tasks ({name})", port, tasks, {"Authorization": f"Bearer {token}"}, args.concurrency, args.duration)
+
+            if storm:
+                storming.join()
+
+        print(result.row(), flush=True)
+        for login in login_result:
+            # Rejected logins (503) are counted as errors.
+            print(login.row(), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Compare the unpartitioned tasks table with the same rows hash-partitioned
+by owner (manage.py partition_tasks): list, detail and update latency
+through the views, and the time VACUUM (ANALYZE) takes after some churn.
+
+Needs a PostgreSQL server described by DB_NAME/DB_USER/DB_PASSWORD/DB_HOST
+(see compose.yml), in a database the benchmark may convert:
+
+    python -m benchmarks.partitioning --tasks 10000000 --owners 10000 --partitions 16
+
+The rows are seeded inside the database and reused by later runs while the
+table is still unpartitioned. The benchmark leaves tasks partitioned and
+drops tasks_unpartitioned; point DB_NAME at a fresh database to run again.
+"""
+import argparse
+import io
+import os
+import random
+import statistics
+import time
+
+from .common import benchmark_env, setup_django
+
+CHURN_EVERY = 50
+
+
+def seed_tasks(tasks: int, owners: int):
+    from django.core.management import call_command
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM tasks")
+        if cursor.fetchone()[0] == tasks:
+            return
+
+        print(f"seeding {tasks} tasks for {owners} owners...", flush=True)
+        cursor.execute("TRUNCATE tasks, task_counters, task_versions, task_daily_stats, task_tombstones")
+        cursor.execute(
+            """
+            INSERT INTO auth_user (username, password, is_superuser, first_name, last_name, email, is_staff, is_active, date_joined)
+            SELECT 'partition-' || n, '!', false, '', '', '', false, true, now() FROM generate_series(0, %s - 1) n
+            ON CONFLICT (username) DO NOTHING
+            """,
+            [owners],
+        )
+        cursor.execute(
+            """
+            WITH owners AS (SELECT array_agg(id ORDER BY id) AS ids FROM auth_user WHERE username LIKE 'partition-%%')
+            INSERT INTO tasks (owner_id, title, description, priority, is_done, created_at, updated_at)
+            SELECT ids[n %% %s + 1], 'Task ' || n, 'Description of task ' || n, n %% 3 + 1, n %% 4 = 0,
+                   now() - n * interval '1 second', now() - n * interval '1 second'
+            FROM owners, generate_series(0, %s - 1) n
+            """,
+            [owners, tasks],
+        )
+    call_command("rebuild_task_counters", verbosity=0)
+
+
+def measure_requests(owners: list, repeat: int) -> dict[str, list[float]]:
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from todo.models import Task
+
+    samples = {"list": [], "detail": [], "update": []}
+    for user in owners[:repeat]:
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}", HTTP_HOST="127.0.0.1")
+        task_id = Task.objects.filter(owner=user).values_list("pk", flat=True).first()
+
+        requests = {
+            "list": lambda: client.get("/api/tasks/", {"page": 2}),
+            "detail": lambda: client.get(f"/api/tasks/{task_id}/"),
+            "update": lambda: client.patch(f"/api/tasks/{task_id}/", {"priority": 2}, content_type="application/json"),
+        }
+        for name, request in requests.items():
+            started = time.perf_counter()
+            response = request()
+            samples[name].append(time.perf_counter() - started)
+            assert response.status_code == 200, response.content
+    return samples
+
+
+def vacuum_time(table: str) -> float:
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"UPDATE {table} SET updated_at = updated_at WHERE id %% %s = 0", [CHURN_EVERY])
+        started = time.perf_counter()
+        cursor.execute(f"VACUUM (ANALYZE) {table}")
+        return time.perf_counter() - started
+
+
+def run(label: str, owners: list, repeat: int, partitions: int | None) -> dict[str, float]:
+    # Warm the caches the same way for both layouts.
+    measure_requests(owners, min(repeat, 20))
+    samples = measure_requests(owners, repeat)
+
+    result = {f"{name} p50 ms": statistics.median(values) * 1000 for name, values in samples.items()}
+    result.update({f"{name} p95 ms": statistics.quantiles(values, n=20)[-1] * 1000 for name, values in samples.items()})
+    result["VACUUM tasks s"] = vacuum_time("tasks")
+    if partitions:
+        result["VACUUM one partition s"] = vacuum_time("tasks_p0")
+    print(f"measured {label}", flush=True)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10_000_000, help="Tasks in the table.")
+    parser.add_argument("--owners", type=int, default=10_000, help="Users the tasks are spread over.")
+    parser.add_argument("--partitions", type=int, default=16, help="Hash partitions.")
+    parser.add_argument("--repeat", type=int, default=200, help="Owners (requests per kind) measured.")
+    args = parser.parse_args()
+
+    env = benchmark_env(DB_ENGINE=os.environ.get("DB_ENGINE", "django.db.backends.postgresql"))
+    if env["DB_ENGINE"] != "django.db.backends.postgresql":
+        parser.error("this benchmark needs PostgreSQL (DB_ENGINE=django.db.backends.postgresql)")
+
+    setup_django(env)
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db import connection
+
+    from todo.utils.partitioning import OLD_TABLE, is_partitioned
+
+    if is_partitioned():
+        parser.error("tasks is already partitioned; point DB_NAME at a fresh database")
+
+    seed_tasks(args.tasks, args.owners)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE tasks")
+
+    owners = list(User.objects.filter(username__startswith="partition-"))
+    random.Random(0).shuffle(owners)
+
+    results = {"unpartitioned": run("unpartitioned", owners, args.repeat, None)}
+
+    started = time.perf_counter()
+    call_command("partition_tasks", "--partitions", str(args.partitions), verbosity=0, stdout=io.StringIO())
+    migration = time.perf_counter() - started
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {OLD_TABLE}")
+
+    results["partitioned"] = run("partitioned", owners, args.repeat, args.partitions)
+
+    print(f"\n{args.tasks} tasks, {args.owners} owners, {args.partitions} partitions; partition_tasks took {migration:.0f}s\n")
+    print(f"{'':<24} {'unpartitioned':>14} {'partitioned':>12}")
+    for key in results["partitioned"]:
+        before = results["unpartitioned"].get(key)
+        print(f"{key:<24} {before if before is not None else float('nan'):>14.2f} {results['partitioned'][key]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
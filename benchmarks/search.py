@@ -0,0 +1,112 @@
+"""Time ?search= (ranked full-text index) against a naive icontains filter
+over title and description, at 1M tasks spread over --owners users. Each
+query reads the first page and its count, as the list endpoint does.
+
+    python -m benchmarks.search --tasks 1000000 --owners 100
+
+Seeding 1M tasks takes a few minutes; the data is kept and reused by later
+runs with the same --tasks and --owners.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from .common import benchmark_env, setup_django
+
+VOCABULARY = [f"w{index:04d}" for index in range(5000)]
+
+# Zipf-like frequencies: w0000 is in a large share of the tasks, w3000 in
+# a handful per owner. Fixed-width words keep icontains from matching
+# other words.
+TERMS = ["w0000", "w0040", "w3000", "w0000 w0001"]
+
+
+def seed_tasks(tasks: int, owners: int, batch_size: int = 5000):
+    from django.contrib.auth.models import User
+    from django.db import transaction
+
+    from todo.models import Task
+
+    users = [User.objects.get_or_create(username=f"search-{index}")[0] for index in range(owners)]
+    existing = Task.objects.filter(owner__username__startswith="search-")
+    if existing.count() == tasks:
+        return users
+
+    existing.delete()
+
+    rng = random.Random(0)
+    weights = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+    insert = Task.objects.copy_create if Task.objects.supports_copy() else Task.objects.bulk_create
+
+    started = time.perf_counter()
+    for offset in range(0, tasks, batch_size):
+        batch = [
+            Task(
+                owner=users[index % owners],
+                title=" ".join(rng.choices(VOCABULARY, weights, k=3)),
+                description=" ".join(rng.choices(VOCABULARY, weights, k=8)),
+                priority=index % 3 + 1,
+                is_done=index % 4 == 0,
+            )
+            for index in range(offset, min(offset + batch_size, tasks))
+        ]
+        with transaction.atomic():
+            insert(batch)
+        print(f"\rseeded {offset + len(batch)}/{tasks} tasks ({time.perf_counter() - started:.0f}s)", end="", flush=True)
+    print()
+    return users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1_000_000, help="Tasks in the table.")
+    parser.add_argument("--owners", type=int, default=100, help="Users the tasks are spread over.")
+    parser.add_argument("--page-size", type=int, default=10, help="Tasks per page.")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs timed per query.")
+    args = parser.parse_args()
+
+    env = benchmark_env()
+    setup_django(env)
+    users = seed_tasks(args.tasks, args.owners)
+
+    from django.db import connection
+    from django.db.models import Q
+
+    from todo.models import Task
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE tasks")
+
+    tasks = Task.objects.filter(owner=users[0])
+
+    def naive(terms: str):
+        queryset = tasks
+        for word in terms.split():
+            queryset = queryset.filter(Q(title__icontains=word) | Q(description__icontains=word))
+        return queryset
+
+    def indexed(terms: str):
+        return tasks.search(terms, owner_id=users[0].pk)
+
+    print(f"{connection.vendor}, {args.tasks} tasks, {args.tasks // args.owners} per owner\n")
+    print(f"{'query':<14} {'matches':>8} {'icontains ms':>13} {'search ms':>10} {'speedup':>8}")
+
+    for terms in TERMS:
+        timings = {}
+        for name, build in [("naive", naive), ("indexed", indexed)]:
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                queryset = build(terms)
+                list(queryset[:args.page_size])
+                count = queryset.count()
+                samples.append(time.perf_counter() - started)
+            timings[name] = statistics.median(samples)
+
+        print(f"{terms:<14} {count:>8} {timings['naive'] * 1e3:>13.1f} {timings['indexed'] * 1e3:>10.1f} {timings['naive'] / timings['indexed']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
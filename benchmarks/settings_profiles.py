@@ -0,0 +1,60 @@
+"""Compare the default settings with the API-only profile (api.settings_api):
+per-request latency under gunicorn and the resident memory of its workers.
+
+    python -m benchmarks.settings_profiles --workers 2 --concurrency 8
+"""
+import argparse
+from pathlib import Path
+
+from .common import HEADER, benchmark_env, free_port, gunicorn, run_load, seed, setup_django
+
+PROFILES = {
+    "default (api.settings)": "api.settings",
+    "API-only (api.settings_api)": "api.settings_api",
+}
+
+
+def worker_rss_kb(master_pid: int) -> list[int]:
+    """Resident memory of each gunicorn worker (Linux /proc)."""
+    sizes = []
+    for status in Path("/proc").glob("[0-9]*/status"):
+        try:
+            fields = dict(line.split(":", 1) for line in status.read_text().splitlines() if ":" in line)
+        except OSError:
+            continue
+        if int(fields.get("PPid", "0")) == master_pid:
+            sizes.append(int(fields["VmRSS"].split()[0]))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent connections.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds measured per profile.")
+    args = parser.parse_args()
+
+    env = benchmark_env()
+    setup_django(env)
+    token = seed(tasks=100)
+
+    from todo.models import Task
+
+    pk = Task.objects.filter(owner__username="benchmark").values_list("pk", flat=True).first()
+    # Cheap endpoints, so the per-request overhead of the stack dominates.
+    requests = [("GET", f"/api/tasks/{pk}/", None), ("GET", "/api/tasks/?size=1", None)]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    print(f"{HEADER} {'worker RSS MiB':>15}")
+    for name, module in PROFILES.items():
+        port = free_port()
+        with gunicorn(port, args.workers, dict(env, DJANGO_SETTINGS_MODULE=module)) as server:
+            result = run_load(name, port, requests, headers, args.concurrency, args.duration)
+            sizes = worker_rss_kb(server.process.pid)
+
+        rss = f"{sum(sizes) / len(sizes) / 1024:.1f}" if sizes else "n/a"
+        print(f"{result.row()} {rss:>15}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Load-test every main API endpoint and save the results as JSON.
+
+Seeds users and tasks, starts the app under gunicorn (or uvicorn with the
+async views), then loads each endpoint in turn and reports throughput,
+p50/p95/p99 latency and database queries per request (measured in-process
+with the test client). Runs offline against file-backed SQLite, or against
+PostgreSQL when DB_ENGINE/DB_* are set.
+
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --baseline before.json --threshold 0.1   # exits 1 on regression
+"""
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .common import BASE_DIR, HEADER, benchmark_env, free_port, gunicorn, run_load, setup_django, uvicorn
+
+PASSWORD = "Benchmark-pwd-2025"
+
+
+def seed_users(users: int, tasks: int, prefix: str = "bench-") -> list[dict]:
+    """Create `users` users with `tasks` tasks each; returns one dict per user."""
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from todo.models import Task
+
+    seeded = []
+    for index in range(users):
+        user = User.objects.create_user(username=f"{prefix}{index}", password=PASSWORD)
+        Task.objects.bulk_create(
+            [Task(owner=user, title=f"Task {number}", priority=number % 3 + 1, is_done=number % 4 == 0) for number in range(tasks)],
+            batch_size=500,
+        )
+        seeded.append({
+            "username": user.username,
+            "token": str(RefreshToken.for_user(user).access_token),
+            "task_ids": list(Task.objects.filter(owner=user).values_list("pk", flat=True)),
+        })
+    return seeded
+
+
+def scenarios(users: list[dict], delete_pool: list[tuple[dict, int]]) -> dict:
+    """Endpoint name -> callable returning the next request."""
+    counter = itertools.count()
+    run = int(time.time())
+
+    def auth(user):
+        return {"Authorization": f"Bearer {user['token']}"}
+
+    def pick():
+        number = next(counter)
+        user = users[number % len(users)]
+        return number, user, user["task_ids"][number % len(user["task_ids"])]
+
+    def register():
+        number = next(counter)
+        return "POST", "/api/auth/register/", json.dumps({"username": f"bench-new-{run}-{number}", "password": PASSWORD})
+
+    def login():
+        user = pick()[1]
+        return "POST", "/api/auth/login/", json.dumps({"username": user["username"], "password": PASSWORD})
+
+    def task_list():
+        number, user, _ = pick()
+        return "GET", f"/api/tasks/?page={number % 5 + 1}", None, auth(user)
+
+    def filtered_list():
+        number, user, _ = pick()
+        return "GET", f"/api/tasks/?is_done=false&priority={number % 3 + 1}", None, auth(user)
+
+    def create():
+        number, user, _ = pick()
+        return "POST", "/api/tasks/", json.dumps({"title": f"Created {number}", "priority": number % 3 + 1}), auth(user)
+
+    def detail():
+        _, user, pk = pick()
+        return "GET", f"/api/tasks/{pk}/", None, auth(user)
+
+    def update():
+        number, user, pk = pick()
+        return "PATCH", f"/api/tasks/{pk}/", json.dumps({"title": f"Updated {number}"}), auth(user)
+
+    pool = iter(delete_pool)
+
+    def delete():
+        # Once the pool runs out the ids repeat and show up as errors.
+        user, pk = next(pool, delete_pool[-1])
+        return "DELETE", f"/api/tasks/{pk}/", None, auth(user)
+
+    return {
+        "register": register,
+        "login": login,
+        "list": task_list,
+        "filtered list": filtered_list,
+        "create": create,
+        "detail": detail,
+        "update": update,
+        "delete": delete,
+    }
+
+
+def queries_per_request(next_request, samples: int = 5) -> float:
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    client = Client(SERVER_NAME="127.0.0.1")
+    total = 0
+    for _ in range(samples):
+        method, path, body, *extra = next_request()
+        with CaptureQueriesContext(connection) as queries:
+            client.generic(method, path, body or "", content_type="application/json", headers=extra[0] if extra else None)
+        total += len(queries)
+    return total / samples
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, current in results["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if previous is None:
+            continue
+        if current["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(f"{name}: req/s {previous['rps']} -> {current['rps']}")
+        for key in ("p95_ms", "p99_ms"):
+            if current[key] > previous[key] * (1 + threshold):
+                regressions.append(f"{name}: {key} {previous[key]} -> {current[key]}")
+        if current["queries"] > previous["queries"]:
+            regressions.append(f"{name}: queries/request {previous['queries']} -> {current['queries']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="Seeded users.")
+    parser.add_argument("--tasks", type=int, default=500, help="Tasks seeded per user.")
+    parser.add_argument("--delete-pool", type=int, default=5000, help="Tasks seeded for the delete scenario.")
+    parser.add_argument("--server", choices=["gunicorn", "uvicorn"], default="gunicorn", help="uvicorn also turns on TASKS_ASYNC_VIEWS.")
+    parser.add_argument("--workers", type=int, default=2, help="Server worker processes.")
+    parser.add_argument("--threads", type=int, default=1, help="gunicorn threads per worker.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent connections.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds measured per endpoint.")
+    parser.add_argument("--min-samples", type=int, default=50, help="Fewest requests an endpoint must complete for its percentiles to count.")
+    parser.add_argument("--endpoint", action="append", dest="endpoints", help="Only run this endpoint (repeatable).")
+    parser.add_argument("--output", type=Path, help="Where to save the results (default: benchmarks/results/<timestamp>.json).")
+    parser.add_argument("--baseline", type=Path, help="Earlier results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown before a change counts as a regression.")
+    args = parser.parse_args()
+
+    env = benchmark_env()
+    setup_django(env)
+
+    from django.contrib.auth.models import User
+    User.objects.filter(username__startswith="bench-").delete()
+
+    users = seed_users(args.users, args.tasks)
+    # The delete scenario needs ids that nothing else touches, so it gets a
+    # user of its own.
+    deleter = seed_users(1, args.delete_pool, prefix="bench-delete-")[0]
+    delete_pool = [(deleter, pk) for pk in deleter["task_ids"]]
+
+    selected = {name: make for name, make in scenarios(users, delete_pool).items() if not args.endpoints or name in args.endpoints}
+
+    import django
+    from django.conf import settings
+
+    results = {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": settings.DATABASES["default"]["ENGINE"],
+            **{key: getattr(args, key) for key in ("server", "workers", "threads", "concurrency", "duration", "users", "tasks")},
+        },
+        "endpoints": {},
+    }
+
+    print(f"{HEADER} {'queries':>8}")
+    for name, next_request in selected.items():
+        queries = queries_per_request(next_request)
+
+        port = free_port()
+        if args.server == "uvicorn":
+            server = uvicorn(port, args.workers, dict(env, TASKS_ASYNC_VIEWS="True"))
+        else:
+            server = gunicorn(port, args.workers, env, threads=args.threads)
+
+        with server:
+            result = run_load(name, port, next_request, {"Content-Type": "application/json"}, args.concurrency, args.duration)
+
+        # Too few latencies make meaningless (or NaN) percentiles.
+        if len(result.latencies) < args.min_samples:
+            sys.exit(
+                f"{name}: {len(result.latencies)} requests completed in {args.duration:g}s, fewer than "
+                f"--min-samples {args.min_samples}; raise --duration. Nothing was saved."
+            )
+
+        results["endpoints"][name] = dict(result.summary(), queries=queries)
+        print(f"{result.row()} {queries:>8.1f}", flush=True)
+
+    output = args.output or BASE_DIR / "benchmarks" / "results" / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nsaved {output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
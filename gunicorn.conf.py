@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # Drop the live-process samples of workers that exited (metrics
+    # multiprocess mode, see README).
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def when_ready(server):
+    # Opt-in archival job (TASKS_ARCHIVE_EVERY seconds, see README,
+    # "Archive"): one process next to the arbiter, not one per worker.
+    # Imported here: gunicorn reads "config" at module level as a setting.
+    from decouple import config
+
+    every = config("TASKS_ARCHIVE_EVERY", default=0, cast=int)
+    if every:
+        manage = Path(__file__).resolve().parent / "manage.py"
+        server.archiver = subprocess.Popen([sys.executable, str(manage), "archive_tasks", "--every", str(every)])
+
+
+def on_exit(server):
+    archiver = getattr(server, "archiver", None)
+    if archiver is not None:
+        archiver.terminate()
+        archiver.wait(timeout=10)
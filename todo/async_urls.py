@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import async_views
+from .urls import urlpatterns as sync_urlpatterns
+
+# Async list/detail routes shadow their DRF counterparts; every other task
+# route is still served by the sync views.
+urlpatterns = [
+    path('', async_views.AsyncTaskListCreateView.as_view(), name="list create tasks"),
+    path('<int:pk>/', async_views.AsyncTaskDetailUpdateDeleteView.as_view(), name="detail update delete tasks"),
+] + sync_urlpatterns
@@ -0,0 +1,239 @@
+import json
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse, QueryDict
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound, ParseError, Throttled, ValidationError
+from rest_framework.settings import api_settings
+
+from api.pagination import CountedPaginator, CustomPagination
+from authentication.backends import ClaimsJWTAuthentication, deleted_user_error
+
+from .filters import TaskFilterSet
+from .models import Task, TaskCounter, TaskVersion
+from .serializers import TaskCreateSerializer, TaskDetailAndUpdateSerializer, TaskFieldsQuerySerializer, TaskListQuerySerializer, TaskListValuesSerializer
+from .utils.etags import PreconditionFailed, etag_matches, make_task_etag
+from .views import TaskListCreateApiView
+
+
+class AsyncTaskView(View):
+    # Native async counterparts of the DRF task views for ASGI deployments
+    # (TASKS_ASYNC_VIEWS=True). Responses and error bodies match the DRF views.
+
+    authentication = ClaimsJWTAuthentication()
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token-authenticated like the DRF views, so no CSRF cookie applies.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.user = await self.authenticate(request)
+            self.check_throttles(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            return self.exception_response(exc)
+        except IntegrityError:
+            # A deleted user's token; see deleted_user_error().
+            error = await sync_to_async(deleted_user_error)(request)
+            if error is None:
+                raise
+            return self.exception_response(error)
+
+    async def authenticate(self, request):
+        result = await self.authentication.aauthenticate(request)
+        if result is None:
+            raise NotAuthenticated()
+        return result[0]
+
+    def check_throttles(self, request):
+        # The shared-memory buckets take no I/O worth leaving the event loop for.
+        waits = []
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not throttle.allow_request(request, self):
+                waits.append(throttle.wait())
+        if waits:
+            raise Throttled(max(waits))
+
+    def exception_response(self, exc: APIException):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        response = JsonResponse(data, status=exc.status_code, safe=False)
+
+        if isinstance(exc, NotAuthenticated) or exc.status_code == status.HTTP_401_UNAUTHORIZED:
+            response["WWW-Authenticate"] = self.authentication.authenticate_header(self.request)
+        if isinstance(exc, Throttled) and exc.wait:
+            response["Retry-After"] = "%d" % exc.wait
+        return response
+
+    def parse_body(self, request):
+        if request.content_type == "application/json":
+            try:
+                return json.loads(request.body or b"{}")
+            except ValueError as exc:
+                raise ParseError(f"JSON parse error - {exc}")
+        if request.method == "POST":
+            return request.POST
+        # Django only parses form bodies for POST.
+        if request.content_type == "multipart/form-data":
+            return request.parse_file_upload(request.META, BytesIO(request.body))[0]
+        return QueryDict(request.body, encoding=request.encoding)
+
+    def validate_query(self, serializer_class, **kwargs) -> dict:
+        query = serializer_class(data=self.request.GET, **kwargs)
+        if not query.is_valid():
+            raise ValidationError(query.errors)
+        return query.validated_data
+
+    def get_queryset(self):
+        return Task.objects.filter(owner_id=self.request.user.pk)
+
+    async def get_etag(self, resource: str, variant: str = "") -> str:
+        return make_task_etag(await TaskVersion.objects.acurrent(self.request.user.pk), resource, variant)
+
+    def check_if_match(self):
+        # Sync on purpose: called inside the write transaction so the version
+        # row stays locked until commit.
+        header = self.request.headers.get("If-Match")
+        if header is None:
+            return
+
+        version = TaskVersion.objects.current(self.request.user.pk, lock=True)
+        if not etag_matches(header, make_task_etag(version, self.request.path), any_variant=True):
+            raise PreconditionFailed()
+
+    def json(self, data, status=status.HTTP_200_OK, etag=None):
+        response = JsonResponse(data, status=status, safe=False)
+        if etag is not None:
+            response["ETag"] = etag
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+    def not_modified(self, etag):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        response["ETag"] = etag
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+
+class AsyncTaskListCreateView(AsyncTaskView):
+
+    pagination_class = CustomPagination
+
+    def get_page_size(self, request) -> int:
+        pagination = self.pagination_class
+        try:
+            size = int(request.GET[pagination.page_size_query_param])
+        except (KeyError, ValueError):
+            return pagination.page_size
+        if size <= 0:
+            return pagination.page_size
+        return min(size, pagination.max_page_size)
+
+    async def get(self, request):
+        # The archive (?archived=) and keyset pages (?cursor=) are only served
+        # by the sync view; the request has been throttled already.
+        if "archived" in request.GET or "cursor" in request.GET:
+            return await sync_to_async(TaskListCreateApiView.as_view(throttle_classes=()))(request)
+
+        etag = await self.get_etag(request.get_full_path())
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return self.not_modified(etag)
+
+        filterset = TaskFilterSet(request.GET, queryset=self.get_queryset(), request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        filters = filterset.form.cleaned_data
+        fields = self.validate_query(TaskListQuerySerializer)["fields"] or TaskListValuesSerializer.fields
+
+        if filters.get("search"):
+            count = await filterset.qs.acount()
+        else:
+            count = await TaskCounter.objects.acount_for(request.user.pk, is_done=filters.get("is_done"), priority=filters.get("priority"))
+
+        size = self.get_page_size(request)
+        paginator = CountedPaginator(filterset.qs, size, count=count)
+        page = request.GET.get(self.pagination_class.page_query_param, 1)
+        try:
+            number = paginator.validate_number(paginator.num_pages if page in self.pagination_class.last_page_strings else page)
+        except InvalidPage:
+            raise NotFound("Invalid page.")
+
+        bottom = (number - 1) * size
+        rows = [row async for row in filterset.qs.values(*fields)[bottom:bottom + size]]
+
+        return self.json({"count": count, "results": TaskListValuesSerializer(rows, fields).data}, etag=etag)
+
+    async def post(self, request):
+        serializer = TaskCreateSerializer(data=self.parse_body(request))
+        if not serializer.is_valid():
+            raise ValidationError(serializer.errors)
+
+        task = await Task.objects.acreate(owner_id=request.user.pk, **serializer.validated_data)
+
+        return self.json(TaskCreateSerializer(task).data, status=status.HTTP_201_CREATED)
+
+
+class AsyncTaskDetailUpdateDeleteView(AsyncTaskView):
+
+    async def aget_task(self, pk, fields=None):
+        queryset = self.get_queryset() if fields is None else self.get_queryset().only(*fields)
+        try:
+            return await queryset.aget(pk=pk)
+        except Task.DoesNotExist:
+            raise NotFound("No Task matches the given query.")
+
+    def get_task(self, pk):
+        try:
+            return self.get_queryset().get(pk=pk)
+        except Task.DoesNotExist:
+            raise NotFound("No Task matches the given query.")
+
+    async def get(self, request, pk):
+        fields = self.validate_query(TaskFieldsQuerySerializer, context={"fields": TaskDetailAndUpdateSerializer.Meta.fields})["fields"]
+
+        etag = await self.get_etag(request.path, ",".join(fields or []))
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return self.not_modified(etag)
+
+        task = await self.aget_task(pk, fields)
+
+        return self.json(TaskDetailAndUpdateSerializer(task, fields=fields).data, etag=etag)
+
+    async def put(self, request, pk):
+        return await sync_to_async(self.perform_update)(pk, self.parse_body(request), partial=False)
+
+    async def patch(self, request, pk):
+        return await sync_to_async(self.perform_update)(pk, self.parse_body(request), partial=True)
+
+    async def delete(self, request, pk):
+        await sync_to_async(self.perform_destroy)(pk)
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+    # Writes need a transaction around the If-Match check, which Django only
+    # offers synchronously, so each one runs in a single thread hop.
+
+    def perform_update(self, pk, data, partial):
+        with transaction.atomic():
+            self.check_if_match()
+
+            serializer = TaskDetailAndUpdateSerializer(self.get_task(pk), data=data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+            etag = make_task_etag(TaskVersion.objects.current(self.request.user.pk), self.request.path)
+
+        return self.json(serializer.data, etag=etag)
+
+    def perform_destroy(self, pk):
+        with transaction.atomic():
+            self.check_if_match()
+            self.get_task(pk).delete()
@@ -0,0 +1,59 @@
+from django_filters import rest_framework as filters
+from django_filters.rest_framework import DjangoFilterBackend
+
+from .models import ArchivedTask, Task
+
+# Allowed ?ordering= values. Each one ends on the primary key so pages and
+# cursors are stable, runs every column in one direction (cursor seeks need
+# that) and is served by one of the owner indexes, read backwards for the
+# opposite direction.
+TASK_ORDERINGS = {
+    'priority': ['priority', 'created_at', 'id'],
+    '-priority': Task._meta.ordering,
+    'created_at': ['created_at', 'id'],
+    '-created_at': ['-created_at', '-id'],
+    'updated_at': ['updated_at', 'id'],
+    '-updated_at': ['-updated_at', '-id'],
+    'title': ['title', 'id'],
+    '-title': ['-title', '-id'],
+}
+
+
+class TaskFilterSet(filters.FilterSet):
+
+    search = filters.CharFilter(method='filter_search', max_length=200, help_text='Full-text search over title and description, best match first.')
+    # Filters run in declaration order, so this replaces the search ranking.
+    ordering = filters.ChoiceFilter(
+        choices=[(ordering, ordering) for ordering in TASK_ORDERINGS],
+        method='filter_ordering',
+        help_text='Sort order; prefix with "-" for descending. Overrides search ranking.',
+    )
+
+    class Meta:
+        model = Task
+        fields = ['is_done', 'priority']
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value, owner_id=self.request.user.pk)
+
+    def filter_ordering(self, queryset, name, value):
+        return queryset.order_by(*TASK_ORDERINGS[value])
+
+
+class ArchivedTaskFilterSet(filters.FilterSet):
+    # ?archived=true; served by the archive's owner/priority indexes in its
+    # fixed order.
+
+    class Meta:
+        model = ArchivedTask
+        fields = ['priority']
+
+
+class TaskFilterBackend(DjangoFilterBackend):
+
+    def get_filterset(self, request, queryset, view):
+        # Keep the bound filterset around so the view can read the validated
+        # filter values (e.g. to look up maintained counts).
+        filterset = super().get_filterset(request, queryset, view)
+        view.filterset = filterset
+        return filterset
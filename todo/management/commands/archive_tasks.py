@@ -0,0 +1,37 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from todo.models import ArchivedTask
+
+
+class Command(BaseCommand):
+    help = "Moves completed tasks not updated for --days into tasks_archive, one short transaction per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.TASKS_ARCHIVE_AFTER_DAYS, help="Archive completed tasks not updated for this many days.")
+        parser.add_argument("--batch-size", type=int, default=settings.TASKS_ARCHIVE_BATCH_SIZE, help="Tasks moved per transaction.")
+        parser.add_argument("--every", type=int, default=0, help="Keep running and archive every this many seconds.")
+
+    def handle(self, *args, days: int, batch_size: int, every: int, **options):
+        if days < 1 or batch_size < 1:
+            raise CommandError("--days and --batch-size must be positive.")
+
+        while True:
+            archived = self.archive(timezone.now() - timedelta(days=days), batch_size)
+            self.stdout.write(self.style.SUCCESS(f"Archived {archived} task(s) completed more than {days} day(s) ago."))
+            if not every:
+                return
+
+            close_old_connections()
+            time.sleep(every)
+
+    def archive(self, before, batch_size: int) -> int:
+        archived = 0
+        while moved := ArchivedTask.objects.archive_batch(before, batch_size):
+            archived += moved
+        return archived
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from todo.utils.partitioning import OLD_TABLE, PartitioningError, partition_tasks
+
+
+class Command(BaseCommand):
+    help = "Converts the tasks table into one hash-partitioned by owner_id (PostgreSQL only), copying the rows while the API keeps running."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--partitions", type=int, default=16, help="Hash partitions to create.")
+        parser.add_argument("--batch-size", type=int, default=50_000, help="Rows copied per transaction.")
+
+    def handle(self, *args, partitions: int, batch_size: int, **options):
+        if partitions < 2:
+            raise CommandError("--partitions must be at least 2.")
+
+        try:
+            partition_tasks(partitions, batch_size, log=self.stdout.write)
+        except PartitioningError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(f"Partitioned tasks into {partitions} partitions; the old table is kept as {OLD_TABLE}."))
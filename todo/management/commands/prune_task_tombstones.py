@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from todo.models import TaskTombstone
+
+
+class Command(BaseCommand):
+    help = "Deletes sync tombstones older than the retention window; sync tokens older than that get 410 Gone."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.TASKS_SYNC_RETENTION_DAYS, help="Keep tombstones for this many days; never less than TASKS_SYNC_RETENTION_DAYS.")
+
+    def handle(self, *args, days: int, **options):
+        # Tokens are rejected by the same cutoff, so a shorter window here
+        # than in the settings would let clients miss deletions.
+        days = max(days, settings.TASKS_SYNC_RETENTION_DAYS)
+        pruned = TaskTombstone.objects.prune(timezone.now() - timedelta(days=days))
+
+        self.stdout.write(self.style.SUCCESS(f"Pruned {pruned} task tombstone(s) older than {days} day(s)."))
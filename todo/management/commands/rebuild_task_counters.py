@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from todo.models import TaskCounter
+
+
+class Command(BaseCommand):
+    help = "Recounts the per-owner task counters used for list counts, or only reports drift with --check."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Only report owners whose counters drifted; exit with an error if any did.")
+        parser.add_argument("--owner", type=int, action="append", dest="owners", help="Limit to this owner id (repeatable).")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Owners compared per query.")
+
+    def handle(self, *args, check: bool, owners: list[int] | None, chunk_size: int, **options):
+        owner_ids = owners or User.objects.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=chunk_size)
+
+        drifted: list[int] = []
+        chunk: list[int] = []
+
+        for owner_id in owner_ids:
+            chunk.append(owner_id)
+            if len(chunk) == chunk_size:
+                drifted += TaskCounter.objects.drifted_owners(chunk)
+                chunk = []
+        if chunk:
+            drifted += TaskCounter.objects.drifted_owners(chunk)
+
+        if check:
+            if drifted:
+                raise CommandError(f"Task counters drifted for {len(drifted)} owner(s): {', '.join(map(str, drifted))}")
+            self.stdout.write(self.style.SUCCESS("Task counters are consistent."))
+            return
+
+        rebuilt = [owner_id for owner_id in drifted if TaskCounter.objects.rebuild_for(owner_id)]
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt task counters for {len(rebuilt)} owner(s)."))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0002_alter_task_options_rename_completed_task_is_done'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', '-priority', '-created_at'], name='tasks_owner_prio_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_done', False)), fields=['owner', '-priority', '-created_at'], name='tasks_owner_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_done', True)), fields=['owner', '-priority', '-created_at'], name='tasks_owner_done_idx'),
+        ),
+        # Dropped last so owner lookups are always covered by one of the indexes.
+        migrations.AlterField(
+            model_name='task',
+            name='owner',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
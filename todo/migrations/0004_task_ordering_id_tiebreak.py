@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0003_task_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['-priority', '-created_at', '-id']},
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_owner_prio_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_owner_open_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_owner_done_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', '-priority', '-created_at', '-id'], name='tasks_owner_prio_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_done', False)), fields=['owner', '-priority', '-created_at', '-id'], name='tasks_owner_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_done', True)), fields=['owner', '-priority', '-created_at', '-id'], name='tasks_owner_done_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_task_counters(apps, schema_editor):
+    Task = apps.get_model('todo', 'Task')
+    TaskCounter = apps.get_model('todo', 'TaskCounter')
+
+    rows = Task.objects.values('owner_id', 'is_done', 'priority').annotate(total=Count('id')).order_by()
+
+    TaskCounter.objects.bulk_create(
+        (TaskCounter(owner_id=row['owner_id'], is_done=row['is_done'], priority=row['priority'], count=row['total']) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0004_task_ordering_id_tiebreak'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_done', models.BooleanField()),
+                ('priority', models.PositiveSmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('owner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'task_counters',
+                'constraints': [models.UniqueConstraint(fields=('owner', 'is_done', 'priority'), name='task_counters_owner_key')],
+            },
+        ),
+        migrations.RunPython(backfill_task_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('todo', '0005_task_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskVersion',
+            fields=[
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_version', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'task_versions',
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+from django.db import migrations
+
+# The search index lives outside the model: a generated tsvector column with
+# a GIN index on PostgreSQL, an external-content FTS5 table kept in step by
+# triggers on SQLite. Both are maintained by the database on every write,
+# including bulk_create() and COPY.
+
+POSTGRESQL_FORWARDS = [
+    # btree_gin lets owner_id share the GIN index with the vector.
+    "CREATE EXTENSION IF NOT EXISTS btree_gin",
+    """
+    ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX tasks_owner_search_idx ON tasks USING gin (owner_id, search_vector)",
+]
+
+POSTGRESQL_BACKWARDS = [
+    "DROP INDEX IF EXISTS tasks_owner_search_idx",
+    "ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector",
+]
+
+# owner_id is indexed too, so a search matches the owner inside FTS5 instead
+# of reading every owner's postings and discarding them in the join. SQLite
+# drops the triggers whenever Django rebuilds the tasks table, so a later
+# migration that does so has to run SQLITE_TRIGGERS again.
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts (rowid, owner_id, title, description) VALUES (new.id, new.owner_id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, owner_id, title, description) VALUES ('delete', old.id, old.owner_id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_fts_update AFTER UPDATE OF owner_id, title, description ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, owner_id, title, description) VALUES ('delete', old.id, old.owner_id, old.title, old.description);
+        INSERT INTO tasks_fts (rowid, owner_id, title, description) VALUES (new.id, new.owner_id, new.title, new.description);
+    END
+    """,
+]
+
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE tasks_fts USING fts5(
+        owner_id, title, description, content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 0'
+    )
+    """,
+    *SQLITE_TRIGGERS,
+    "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS tasks_fts_insert",
+    "DROP TRIGGER IF EXISTS tasks_fts_delete",
+    "DROP TRIGGER IF EXISTS tasks_fts_update",
+    "DROP TABLE IF EXISTS tasks_fts",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0006_task_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'postgresql': POSTGRESQL_FORWARDS, 'sqlite': SQLITE_FORWARDS}),
+            run_for_vendor({'postgresql': POSTGRESQL_BACKWARDS, 'sqlite': SQLITE_BACKWARDS}),
+        ),
+    ]
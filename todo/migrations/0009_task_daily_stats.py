@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_task_daily_stats(apps, schema_editor):
+    # Completion times were never stored, so done tasks are counted on the
+    # day they were last updated.
+    Task = apps.get_model('todo', 'Task')
+    TaskDailyStats = apps.get_model('todo', 'TaskDailyStats')
+
+    stats = {}
+    for field, tasks, column in [
+        ('created', Task.objects.all(), 'created_at'),
+        ('completed', Task.objects.filter(is_done=True), 'updated_at'),
+    ]:
+        rows = tasks.annotate(day=TruncDate(column)).values('owner_id', 'day').annotate(total=Count('id')).order_by()
+        for row in rows.iterator():
+            stats.setdefault((row['owner_id'], row['day']), TaskDailyStats(owner_id=row['owner_id'], day=row['day']))
+            setattr(stats[(row['owner_id'], row['day'])], field, row['total'])
+
+    TaskDailyStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0008_task_ordering_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('created', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('owner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'task_daily_stats',
+                'constraints': [models.UniqueConstraint(fields=('owner', 'day'), name='task_daily_stats_owner_day_key')],
+            },
+        ),
+        migrations.RunPython(backfill_task_daily_stats, migrations.RunPython.noop),
+    ]
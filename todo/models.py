@@ -1,17 +1,553 @@
-from django.db import models
+import re
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.expressions import RawSQL
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+
+COUNTED_FIELDS = {"owner", "owner_id", "is_done", "priority"}
+
+# Text search configuration of the tasks.search_vector column (migration
+# 0007). "simple" only lowercases, so it works the same for any language.
+SEARCH_CONFIG = "simple"
+
+
+def increment(manager, lookup: dict, **deltas: int):
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    if manager.filter(**lookup).update(**changes):
+        return
+
+    try:
+        with transaction.atomic():
+            manager.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another transaction created the row first.
+        manager.filter(**lookup).update(**changes)
+
+
+def record_task_writes(deltas: Counter, owner_ids=(), created: Counter | None = None, completed: Counter | None = None, deleted=()):
+    # Counter deltas are keyed by (owner_id, is_done, priority); created and
+    # completed count tasks per owner_id for today's stats, and deleted
+    # holds (owner_id, task_id) pairs for the sync tombstones. Must run in
+    # the transaction that wrote the tasks so nothing drifts on rollback.
+    TaskCounter.objects.apply_deltas(deltas)
+    TaskVersion.objects.bump({key[0] for key in deltas} | set(owner_ids))
+    TaskDailyStats.objects.record(created or Counter(), completed or Counter())
+    TaskTombstone.objects.record(deleted)
+
+
+def creation_stats(tasks) -> dict[str, Counter]:
+    return {
+        "created": Counter(task.owner_id for task in tasks),
+        "completed": Counter(task.owner_id for task in tasks if task.is_done),
+    }
+
+
+class TaskQuerySet(models.QuerySet):
+    # Bulk writes bypass Task.save/Task.delete, so they keep the per-owner
+    # counters and versions in step here. Model.save() and cascades use the base manager
+    # and are not counted twice.
+
+    def lock_counter_keys(self) -> list:
+        return list(self.select_for_update().order_by().values_list("pk", "owner_id", "is_done", "priority"))
+
+    def counter_totals(self) -> Counter:
+        return Counter({
+            (row["owner_id"], row["is_done"], row["priority"]): row["total"]
+            for row in self.order_by().values("owner_id", "is_done", "priority").annotate(total=Count("id"))
+        })
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(objs, *args, **kwargs)
+
+            for obj in objs:
+                obj._counter_key = obj.get_counter_key()
+            record_task_writes(Counter(obj._counter_key for obj in objs), **creation_stats(objs))
+        return objs
+
+    bulk_create.alters_data = True
+
+    def search(self, terms: str, owner_id=None):
+        # Ranked full-text match on title (weighted higher) and description,
+        # best match first. Every word has to match. Pass owner_id to search
+        # one owner's tasks; the indexes are built for that.
+        tasks = self if owner_id is None else self.filter(owner_id=owner_id)
+        if connections[self.db].vendor == "postgresql":
+            return tasks.search_postgresql(terms)
+        return tasks.search_sqlite(terms, owner_id)
+
+    def search_postgresql(self, terms: str):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+
+        # Generated column behind the (owner_id, search_vector) GIN index; it
+        # is not a model field so it never travels with the rows.
+        vector = RawSQL(f'"{self.model._meta.db_table}"."search_vector"', [], output_field=SearchVectorField())
+        query = SearchQuery(terms, config=SEARCH_CONFIG, search_type="websearch")
+
+        return (
+            self.alias(search_vector=vector)
+            .filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F("search_vector"), query))
+            .order_by("-search_rank", *self.model._meta.ordering)
+        )
+
+    def search_sqlite(self, terms: str, owner_id=None):
+        # Joins the tasks_fts FTS5 table. "+ 0" hides the rowid from FTS5 so
+        # SQLite never probes it once per owner row; the full-text match
+        # drives the join instead. Matching the owner_id column inside FTS5
+        # keeps other owners' postings out of the join; the words themselves
+        # are limited to the text columns. Words are quoted to keep FTS5
+        # operators out of user input.
+        words = re.findall(r"\w+", terms)
+        if not words:
+            return self.none()
+
+        phrases = [f'{{title description}}: "{word}"' for word in words]
+        if owner_id is not None:
+            phrases.insert(0, f'owner_id:"{int(owner_id)}"')
+
+        table = self.model._meta.db_table
+        return self.extra(
+            select={"search_rank": "-bm25(tasks_fts, 0.0, 10.0, 1.0)"},
+            tables=["tasks_fts"],
+            where=[f'"{table}"."id" = tasks_fts.rowid + 0', "tasks_fts MATCH %s"],
+            params=[" ".join(phrases)],
+        ).order_by("-search_rank", *self.model._meta.ordering)
+
+    def supports_copy(self) -> bool:
+        connection = connections[self.db]
+        if connection.vendor != "postgresql":
+            return False
+
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+        return is_psycopg3
+
+    def copy_create(self, objs: list):
+        # COPY ... FROM STDIN (PostgreSQL with psycopg 3) for large imports.
+        # Unlike bulk_create(), the primary keys of objs are not set.
+        connection = connections[self.db]
+        fields = [field for field in self.model._meta.concrete_fields if not field.primary_key]
+        columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+        sql = f"COPY {connection.ops.quote_name(self.model._meta.db_table)} ({columns}) FROM STDIN"
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            with connection.cursor() as cursor, cursor.copy(sql) as copy:
+                for obj in objs:
+                    copy.write_row([field.get_db_prep_save(field.pre_save(obj, add=True), connection) for field in fields])
+
+            record_task_writes(Counter(obj.get_counter_key() for obj in objs), **creation_stats(objs))
+        return objs
+
+    copy_create.alters_data = True
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        # The counters themselves are maintained by update(), which
+        # bulk_update() runs for each batch.
+        objs = list(objs)
+        tasks = self
+        if "owner" not in fields:
+            tasks = self.filter(owner_id__in={obj.owner_id for obj in objs})
+        result = super(TaskQuerySet, tasks).bulk_update(objs, fields, *args, **kwargs)
+        for obj in objs:
+            obj._counter_key = obj.get_counter_key()
+        return result
+
+    bulk_update.alters_data = True
+
+    def update(self, **kwargs):
+        if not COUNTED_FIELDS & kwargs.keys():
+            with transaction.atomic(using=self.db, savepoint=False):
+                owner_ids = set(self.order_by().values_list("owner_id", flat=True).distinct())
+                updated = super().update(**kwargs)
+                record_task_writes(Counter(), owner_ids)
+            return updated
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = self.lock_counter_keys()
+            pks = [row[0] for row in rows]
+
+            updated = super(TaskQuerySet, self.filter(pk__in=pks)).update(**kwargs)
+
+            written = self.model.objects.all()
+            if not {"owner", "owner_id"} & kwargs.keys():
+                written = written.filter(owner_id__in={row[1] for row in rows})
+
+            deltas = written.filter(pk__in=pks).counter_totals()
+            deltas.subtract(Counter(row[1:] for row in rows))
+
+            completed = Counter()
+            if "is_done" in kwargs:
+                open_pks = [row[0] for row in rows if not row[2]]
+                completed.update(written.filter(pk__in=open_pks, is_done=True).values_list("owner_id", flat=True))
+            record_task_writes(deltas, completed=completed)
+        return updated
+
+    update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = self.lock_counter_keys()
+
+            result = super(TaskQuerySet, self.filter(pk__in=[row[0] for row in rows])).delete()
+
+            deltas = Counter()
+            deltas.subtract(Counter(row[1:] for row in rows))
+            record_task_writes(deltas, deleted=[(row[1], row[0]) for row in rows])
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 
 class Task(models.Model):
     
-    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tasks")
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tasks", db_index=False)
     title = models.CharField(max_length=100)
     description = models.CharField(max_length=300, blank=True, null=True)
     priority = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(3)], default=1)
     is_done = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TaskQuerySet.as_manager()
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counter_key = instance.get_counter_key()
+        return instance
+
+    def get_counter_key(self):
+        if {"owner_id", "is_done", "priority"} & self.get_deferred_fields():
+            return None
+        return (self.owner_id, self.is_done, self.priority)
+
+    def lock_stored_counter_key(self, using=None):
+        # The counted columns as stored, with the row locked until the
+        # transaction ends, so the delta is taken against what is actually
+        # overwritten even when another copy of the task was saved since this
+        # one was loaded. Looked up by the owner the instance was loaded with
+        # first (one partition, see partition_tasks), then by id alone in case
+        # the task has changed owners since. None when the row is gone.
+        stored = (
+            Task._base_manager.db_manager(using).select_for_update()
+            .filter(pk=self.pk).values_list("owner_id", "is_done", "priority")
+        )
+        key = getattr(self, "_counter_key", None)
+        row = stored.filter(owner_id=key[0]).first() if key is not None else None
+        return row or stored.first()
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using")):
+            previous = None if self._state.adding else self.lock_stored_counter_key(kwargs.get("using"))
+            self._counter_key = previous
+
+            super().save(*args, **kwargs)
+
+            self._counter_key = (self.owner_id, self.is_done, self.priority)
+
+            deltas = Counter({self._counter_key: 1})
+            if previous is not None:
+                deltas[previous] -= 1
+                stats = {"completed": Counter({self.owner_id: int(self.is_done and not previous[1])})}
+            else:
+                stats = creation_stats([self])
+            record_task_writes(deltas, **stats)
+
+    def _do_update(self, base_qs, *args, **kwargs):
+        # Names the stored owner too, like every other task query, so the
+        # UPDATE is pruned to one partition (see partition_tasks).
+        key = getattr(self, "_counter_key", None)
+        if key is not None:
+            base_qs = base_qs.filter(owner_id=key[0])
+        return super()._do_update(base_qs, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get("using")
+        with transaction.atomic(using=using):
+            pk = self.pk
+            key = None if pk is None else self.lock_stored_counter_key(using)
+
+            if key is None:
+                return super().delete(*args, **kwargs)
+
+            # Deleted by owner and id, for the same reason as _do_update().
+            result = Task._base_manager.db_manager(using).filter(owner_id=key[0], pk=pk).delete()
+            self.pk = None
+
+            if result[1].get(Task._meta.label):
+                record_task_writes(Counter({key: -1}), deleted=[(key[0], pk)])
+            return result
+
     class Meta:
         db_table = "tasks"
-        ordering = ["-priority", "-created_at"]
\ No newline at end of file
+        ordering = ["-priority", "-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["owner", "-priority", "-created_at", "-id"], name="tasks_owner_prio_created_idx"),
+            models.Index(
+                fields=["owner", "-priority", "-created_at", "-id"],
+                name="tasks_owner_open_idx",
+                condition=models.Q(is_done=False),
+            ),
+            models.Index(
+                fields=["owner", "-priority", "-created_at", "-id"],
+                name="tasks_owner_done_idx",
+                condition=models.Q(is_done=True),
+            ),
+            # ?ordering= on the list; each one is read in either direction.
+            models.Index(fields=["owner", "-created_at", "-id"], name="tasks_owner_created_idx"),
+            models.Index(fields=["owner", "-updated_at", "-id"], name="tasks_owner_updated_idx"),
+            models.Index(fields=["owner", "title", "id"], name="tasks_owner_title_idx"),
+            # archive_tasks walks the oldest completed tasks.
+            models.Index(fields=["updated_at", "id"], name="tasks_done_updated_idx", condition=models.Q(is_done=True)),
+        ]
+
+
+class TaskCounterManager(models.Manager):
+
+    def apply_deltas(self, deltas: Counter):
+        for (owner_id, is_done, priority), delta in sorted(deltas.items()):
+            if delta:
+                increment(self, {"owner_id": owner_id, "is_done": is_done, "priority": priority}, count=delta)
+
+    def filter_for(self, owner_id, is_done=None, priority=None):
+        counters = self.filter(owner_id=owner_id)
+        if is_done is not None:
+            counters = counters.filter(is_done=is_done)
+        if priority is not None:
+            counters = counters.filter(priority=priority)
+        return counters
+
+    def count_for(self, owner_id, is_done=None, priority=None) -> int:
+        return self.filter_for(owner_id, is_done, priority).aggregate(total=Sum("count"))["total"] or 0
+
+    async def acount_for(self, owner_id, is_done=None, priority=None) -> int:
+        return (await self.filter_for(owner_id, is_done, priority).aaggregate(total=Sum("count")))["total"] or 0
+
+    def totals_for(self, owner_id) -> list[dict]:
+        # One entry per (is_done, priority), zero-filled for the priorities a
+        # task can have.
+        stored = {(row["is_done"], row["priority"]): row["count"] for row in self.filter(owner_id=owner_id).values("is_done", "priority", "count")}
+        priorities = sorted({1, 2, 3} | {priority for _, priority in stored})
+        return [
+            {"is_done": is_done, "priority": priority, "count": stored.get((is_done, priority), 0)}
+            for is_done in (False, True)
+            for priority in priorities
+        ]
+
+    def rebuild_for(self, owner_id) -> bool:
+        # Row locks on the owner's counters keep concurrent writers queued
+        # behind the recount; returns whether anything had drifted.
+        with transaction.atomic():
+            stored = {
+                (counter.is_done, counter.priority): counter
+                for counter in self.select_for_update().filter(owner_id=owner_id)
+            }
+            actual = {
+                (row["is_done"], row["priority"]): row["total"]
+                for row in Task.objects.filter(owner_id=owner_id)
+                .values("is_done", "priority").annotate(total=Count("id")).order_by()
+            }
+
+            drifted = False
+            for key in stored.keys() | actual.keys():
+                counter = stored.get(key)
+                total = actual.get(key, 0)
+
+                if counter is None:
+                    self.create(owner_id=owner_id, is_done=key[0], priority=key[1], count=total)
+                elif counter.count != total:
+                    counter.count = total
+                    counter.save(update_fields=["count"])
+                else:
+                    continue
+                drifted = True
+
+            return drifted
+
+    def drifted_owners(self, owner_ids) -> list:
+        stored = Counter({
+            (row["owner_id"], row["is_done"], row["priority"]): row["count"]
+            for row in self.filter(owner_id__in=owner_ids).values("owner_id", "is_done", "priority", "count")
+        })
+        actual = Counter({
+            (row["owner_id"], row["is_done"], row["priority"]): row["total"]
+            for row in Task.objects.filter(owner_id__in=owner_ids)
+            .values("owner_id", "is_done", "priority").annotate(total=Count("id")).order_by()
+        })
+        return sorted({key[0] for key in stored.keys() | actual.keys() if stored[key] != actual[key]})
+
+
+class TaskCounter(models.Model):
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="task_counters", db_index=False)
+    is_done = models.BooleanField()
+    priority = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    objects = TaskCounterManager()
+
+    class Meta:
+        db_table = "task_counters"
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "is_done", "priority"], name="task_counters_owner_key"),
+        ]
+
+
+
+class TaskVersionManager(models.Manager):
+
+    def bump(self, owner_ids):
+        # Sorted so concurrent multi-owner writes lock rows in the same order.
+        for owner_id in sorted(owner_ids):
+            increment(self, {"owner_id": owner_id}, version=1)
+
+    def current(self, owner_id, lock=False) -> int:
+        versions = self.filter(owner_id=owner_id)
+        if lock:
+            versions = versions.select_for_update()
+        return versions.values_list("version", flat=True).first() or 0
+
+    async def acurrent(self, owner_id) -> int:
+        return await self.filter(owner_id=owner_id).values_list("version", flat=True).afirst() or 0
+
+
+class TaskVersion(models.Model):
+    # Bumped by every write to an owner's tasks; conditional requests derive
+    # their ETags from it without reading the tasks table.
+
+    owner = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="task_version")
+    version = models.BigIntegerField(default=0)
+
+    objects = TaskVersionManager()
+
+    class Meta:
+        db_table = "task_versions"
+
+
+class TaskDailyStatsManager(models.Manager):
+
+    def record(self, created: Counter, completed: Counter):
+        day = timezone.localdate()
+        for owner_id in sorted(created.keys() | completed.keys()):
+            deltas = {field: counts[owner_id] for field, counts in (("created", created), ("completed", completed)) if counts[owner_id]}
+            if deltas:
+                increment(self, {"owner_id": owner_id, "day": day}, **deltas)
+
+    def series_for(self, owner_id, days: int) -> list[dict]:
+        # The last `days` days up to today, oldest first, zero-filled.
+        first = timezone.localdate() - timedelta(days=days - 1)
+        stored = {row["day"]: row for row in self.filter(owner_id=owner_id, day__gte=first).values("day", "created", "completed")}
+        return [
+            stored.get(day, {"day": day, "created": 0, "completed": 0})
+            for day in (first + timedelta(days=offset) for offset in range(days))
+        ]
+
+
+class TaskDailyStats(models.Model):
+    # Tasks created and marked done per owner and day. These are events, so
+    # deleting or reopening a task does not rewrite past days.
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="task_daily_stats", db_index=False)
+    day = models.DateField()
+    created = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+
+    objects = TaskDailyStatsManager()
+
+    class Meta:
+        db_table = "task_daily_stats"
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "day"], name="task_daily_stats_owner_day_key"),
+        ]
+
+
+class TaskTombstoneManager(models.Manager):
+
+    def record(self, deleted):
+        if deleted:
+            now = timezone.now()
+            self.bulk_create([self.model(owner_id=owner_id, task_id=task_id, deleted_at=now) for owner_id, task_id in deleted])
+
+    def prune(self, before) -> int:
+        return self.filter(deleted_at__lt=before).delete()[0]
+
+
+class TaskTombstone(models.Model):
+    # Ids of deleted tasks, kept so delta sync can tell clients what to drop.
+    # Rows older than TASKS_SYNC_RETENTION_DAYS are removed by
+    # prune_task_tombstones.
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="task_tombstones", db_index=False)
+    task_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField()
+
+    objects = TaskTombstoneManager()
+
+    class Meta:
+        db_table = "task_tombstones"
+        indexes = [
+            models.Index(fields=["owner", "deleted_at"], name="task_tombstones_owner_idx"),
+            models.Index(fields=["deleted_at"], name="task_tombstones_deleted_idx"),
+        ]
+
+
+class ArchivedTaskManager(models.Manager):
+
+    def archive_batch(self, before, batch_size: int) -> int:
+        # Moves up to batch_size completed tasks last written before `before`
+        # in one short transaction. They leave tasks through
+        # TaskQuerySet.delete(), so counters, versions and sync tombstones
+        # follow; rows another transaction holds are left for the next run.
+        fields = [field.attname for field in Task._meta.concrete_fields]
+
+        with transaction.atomic(using=self.db):
+            rows = list(
+                Task.objects.using(self.db)
+                .filter(is_done=True, updated_at__lt=before)
+                .order_by("updated_at", "id")
+                .select_for_update(skip_locked=True)
+                .values(*fields)[:batch_size]
+            )
+            if not rows:
+                return 0
+
+            archived_at = timezone.now()
+            self.bulk_create([self.model(archived_at=archived_at, **row) for row in rows])
+            Task.objects.using(self.db).filter(
+                owner_id__in={row["owner_id"] for row in rows},
+                pk__in=[row["id"] for row in rows],
+            ).delete()
+        return len(rows)
+
+
+class ArchivedTask(models.Model):
+    # Completed tasks moved out of the hot table by archive_tasks; read-only
+    # through ?archived=true on the task list. Keeps the task's id.
+
+    id = models.BigIntegerField(primary_key=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="archived_tasks", db_index=False)
+    title = models.CharField(max_length=100)
+    description = models.CharField(max_length=300, blank=True, null=True)
+    priority = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(3)], default=1)
+    is_done = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    objects = ArchivedTaskManager()
+
+    class Meta:
+        db_table = "tasks_archive"
+        # Most recently completed first; the archive list is keyset-paginated
+        # on it.
+        ordering = ["-updated_at", "-id"]
+        indexes = [
+            models.Index(fields=["owner", "-updated_at", "-id"], name="tasks_archive_owner_idx"),
+            models.Index(fields=["owner", "priority", "-updated_at", "-id"], name="tasks_archive_owner_prio_idx"),
+        ]
@@ -1,5 +1,60 @@
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.urls import Resolver404, resolve, reverse
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Task
+from .utils.date_utils import format_datetime_to_response_date
+
+
+class TaskBulkCreateListSerializer(serializers.ListSerializer):
+
+    def create(self, validated_data):
+        return Task.objects.bulk_create([Task(**attrs) for attrs in validated_data])
+
+
+class TaskBulkUpdateListSerializer(serializers.ListSerializer):
+    # ``instance`` is a {pk: Task} mapping of the owner's tasks; each item
+    # in the payload names the task it patches through its "id".
+
+    def run_validation(self, data=serializers.empty):
+        self.child_instances = []
+        self.seen_ids = set()
+        return super().run_validation(data)
+
+    def run_child_validation(self, data):
+        pk = data.get("id") if isinstance(data, dict) else None
+
+        if pk is None:
+            raise serializers.ValidationError({"id": ["This field is required."]})
+        if not isinstance(pk, int) or isinstance(pk, bool) or pk not in self.instance:
+            raise serializers.ValidationError({"id": ["Not found."]})
+        if pk in self.seen_ids:
+            raise serializers.ValidationError({"id": ["Duplicate id."]})
+        self.seen_ids.add(pk)
+
+        self.child.instance = self.instance[pk]
+        self.child.initial_data = data
+        validated = super().run_child_validation(data)
+
+        self.child_instances.append(self.instance[pk])
+        return validated
+
+    def update(self, instance, validated_data):
+        updated_at = timezone.now()
+        fields = {"updated_at"}
+
+        for task, attrs in zip(self.child_instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(task, attr, value)
+            fields.update(attrs)
+            # bulk_update() skips auto_now.
+            task.updated_at = updated_at
+
+        Task.objects.bulk_update(self.child_instances, sorted(fields))
+        return self.child_instances
+
 
 class TaskCreateSerializer(serializers.ModelSerializer):
     
@@ -7,16 +62,207 @@ class TaskCreateSerializer(serializers.ModelSerializer):
         model = Task
         fields = ["id", "title", "description", "priority"]
         read_only_fields = ["id"]
+        list_serializer_class = TaskBulkCreateListSerializer
         
+class TaskImportSerializer(TaskCreateSerializer):
+    # Create rules plus is_done, so an export can be imported back.
+
+    class Meta(TaskCreateSerializer.Meta):
+        fields = TaskCreateSerializer.Meta.fields + ["is_done"]
+
+class SparseFieldsMixin:
+    # Takes the fields picked with ?fields=/?exclude= as ``fields``.
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 class TaskListSerializer(serializers.ModelSerializer): 
     
     class Meta:
         model = Task
         fields = ["id", "title", "description", "priority", "is_done", "created_at"]
 
-class TaskDetailAndUpdateSerializer(serializers.ModelSerializer): 
+class TaskDetailAndUpdateSerializer(SparseFieldsMixin, serializers.ModelSerializer): 
     
     class Meta:
         model = Task
         fields = ["id", "title", "description", "priority", "is_done", "created_at", "updated_at"]
-        read_only_fields = ["id", "created_at", "updated_at"]
\ No newline at end of file
+        read_only_fields = ["id", "created_at", "updated_at"]
+        list_serializer_class = TaskBulkUpdateListSerializer
+
+class TaskFieldsQuerySerializer(serializers.Serializer):
+    # Validates to the response fields in their usual order, or None when
+    # neither parameter is given. The view passes the fields it can return
+    # as the "fields" context.
+
+    fields = serializers.CharField(required=False, help_text="Comma-separated fields to return, e.g. id,title.")
+    exclude = serializers.CharField(required=False, help_text="Comma-separated fields to leave out, e.g. description.")
+
+    def get_available_fields(self, attrs) -> list[str]:
+        return self.context["fields"]
+
+    def validate(self, attrs):
+        if "fields" not in attrs and "exclude" not in attrs:
+            attrs["fields"] = None
+            return attrs
+
+        available = self.get_available_fields(attrs)
+        names, errors = {}, {}
+        for param in ("fields", "exclude"):
+            names[param] = {name.strip() for name in attrs.get(param, "").split(",")} - {""}
+            if unknown := sorted(names[param] - set(available)):
+                errors[param] = [f"Unknown field(s): {', '.join(unknown)}."]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        attrs["fields"] = [
+            field for field in available
+            if (not names["fields"] or field in names["fields"]) and field not in names["exclude"]
+        ]
+        if not attrs["fields"]:
+            raise serializers.ValidationError({"exclude": ["At least one field must be returned."]})
+        return attrs
+
+
+class TaskListQuerySerializer(TaskFieldsQuerySerializer):
+
+    archived = serializers.BooleanField(default=False, help_text="List the archived tasks (completed tasks moved out by archive_tasks) instead, newest first.")
+
+    def get_available_fields(self, attrs) -> list[str]:
+        return ArchivedTaskValuesSerializer.fields if attrs["archived"] else TaskListValuesSerializer.fields
+
+
+class TaskBatchItemSerializer(serializers.Serializer):
+    # Validates to the sub-request plus its split "url" and the sync task
+    # view it resolves to ("match").
+
+    method = serializers.ChoiceField(choices=["GET", "POST", "PUT", "PATCH", "DELETE"])
+    path = serializers.CharField(help_text="A /api/tasks/ route, with its query string, e.g. /api/tasks/?size=5.")
+    body = serializers.JSONField(required=False, help_text="JSON request body.")
+    headers = serializers.DictField(child=serializers.CharField(), required=False, help_text="If-Match and If-None-Match only.")
+
+    def validate_headers(self, value):
+        if unknown := sorted(name for name in value if name.lower() not in ("if-match", "if-none-match")):
+            raise serializers.ValidationError(f"Unsupported header(s): {', '.join(unknown)}.")
+        return value
+
+    def validate(self, attrs):
+        url = urlsplit(attrs["path"])
+        path = unquote(url.path)
+        prefix = reverse("list create tasks")
+        if url.scheme or url.netloc or not path.startswith(prefix):
+            raise serializers.ValidationError({"path": [f"Must be a {prefix} route."]})
+
+        try:
+            match = resolve(path[len(prefix) - 1:], urlconf="todo.urls")
+        except Resolver404:
+            raise serializers.ValidationError({"path": ["Not found."]})
+        # Export streams and import takes NDJSON/CSV bodies.
+        if match.url_name in ("export tasks", "import tasks"):
+            raise serializers.ValidationError({"path": ["This route cannot be batched."]})
+
+        attrs["url"], attrs["match"] = url._replace(path=path), match
+        return attrs
+
+
+class TaskBatchSerializer(serializers.Serializer):
+
+    requests = TaskBatchItemSerializer(many=True, allow_empty=False)
+    atomic = serializers.BooleanField(default=False, help_text="Run every request in one transaction; the first one that fails rolls them all back.")
+
+    def validate_requests(self, value):
+        if len(value) > settings.TASKS_BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(f"Ensure this field has no more than {settings.TASKS_BATCH_MAX_REQUESTS} elements.")
+        return value
+
+
+class TaskBatchResponseSerializer(serializers.Serializer):
+
+    status = serializers.IntegerField()
+    headers = serializers.DictField(child=serializers.CharField())
+    body = serializers.JSONField(allow_null=True)
+
+
+class TaskStatsQuerySerializer(serializers.Serializer):
+
+    days = serializers.IntegerField(min_value=1, default=30)
+
+    def validate_days(self, value):
+        if value > settings.TASKS_STATS_MAX_DAYS:
+            raise serializers.ValidationError(f"Ensure this value is less than or equal to {settings.TASKS_STATS_MAX_DAYS}.")
+        return value
+
+
+class TaskTotalSerializer(serializers.Serializer):
+
+    is_done = serializers.BooleanField()
+    priority = serializers.IntegerField()
+    count = serializers.IntegerField()
+
+
+class TaskDayStatsSerializer(serializers.Serializer):
+
+    day = serializers.DateField()
+    created = serializers.IntegerField()
+    completed = serializers.IntegerField()
+
+
+class TaskStatsSerializer(serializers.Serializer):
+
+    count = serializers.IntegerField()
+    totals = TaskTotalSerializer(many=True)
+    days = TaskDayStatsSerializer(many=True)
+
+
+class TaskValuesSerializer:
+    # Read-only fast path over .values() rows of ``fields`` (or of the ones
+    # picked with ?fields=/?exclude=): only the columns
+    # whose JSON form differs from the database value are converted, instead
+    # of building Task instances and running per-field to_representation.
+    # Rows are converted in place.
+
+    fields: list[str] = []
+    converters: list = []
+
+    def __init__(self, rows, fields=None):
+        self.rows = rows
+        if fields is not None:
+            self.converters = [(field, convert) for field, convert in self.converters if field in fields]
+
+    def to_representation(self, row: dict) -> dict:
+        for field, convert in self.converters:
+            row[field] = convert(row[field])
+        return row
+
+    def iter_data(self):
+        return map(self.to_representation, self.rows)
+
+    @property
+    def data(self) -> list[dict]:
+        return list(self.iter_data())
+
+
+class TaskListValuesSerializer(TaskValuesSerializer):
+
+    fields = TaskListSerializer.Meta.fields
+    converters = [("created_at", format_datetime_to_response_date)]
+
+
+class TaskExportValuesSerializer(TaskValuesSerializer):
+
+    fields = TaskDetailAndUpdateSerializer.Meta.fields
+    converters = [("created_at", format_datetime_to_response_date), ("updated_at", format_datetime_to_response_date)]
+
+
+class ArchivedTaskValuesSerializer(TaskValuesSerializer):
+
+    fields = TaskDetailAndUpdateSerializer.Meta.fields + ["archived_at"]
+    converters = [
+        ("created_at", format_datetime_to_response_date),
+        ("updated_at", format_datetime_to_response_date),
+        ("archived_at", format_datetime_to_response_date),
+    ]
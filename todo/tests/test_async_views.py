@@ -0,0 +1,268 @@
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..models import ArchivedTask, Task
+from ..utils.date_utils import format_datetime_to_response_date
+
+
+@override_settings(ROOT_URLCONF="todo.async_urls")
+class AsyncTaskListCreateAPITest(APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user",password="test-pwd")
+        self.outher_user = User.objects.create_user(username="test-outher-user",password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        self.tasks = [
+            Task.objects.create(owner=self.user, title=f"Task Test {task_id}", priority=task_id % 3 + 1, is_done=task_id % 2 == 0)
+            for task_id in range(12)
+        ]
+        Task.objects.create(owner=self.outher_user, title="Outher Task")
+
+        self.url = reverse('list create tasks')
+
+    def test_get_tasks_matches_sync_view(self):
+
+        response = self.client.get(self.url, data={"size": 5, "page": 2}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        expected = [
+            {
+                "id": task.pk,
+                "title": task.title,
+                "description": task.description,
+                "priority": task.priority,
+                "is_done": task.is_done,
+                "created_at": format_datetime_to_response_date(task.created_at),
+            }
+            for task in Task.objects.filter(owner=self.user)[5:10]
+        ]
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"count": 12, "results": expected})
+        self.assertIn("ETag", response)
+
+    def test_get_tasks_cursor_matches_sync_view(self):
+
+        data = {"cursor": "", "ordering": "title", "size": 5}
+        response = self.client.get(self.url, data=data, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+        with override_settings(ROOT_URLCONF="api.urls"):
+            expected = self.client.get("/api/tasks/", data=data, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(set(response.json()), {"next", "previous", "results"})
+        self.assertEqual(response.json()["results"], expected.json()["results"])
+
+        response = self.client.get(response.json()["next"], HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual([task["title"] for task in response.json()["results"]], sorted(task.title for task in self.tasks)[5:10])
+
+    def test_get_tasks_filter(self):
+
+        response = self.client.get(self.url, data={"is_done": "true", "priority": 1}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 2)
+        self.assertTrue(all(task["is_done"] and task["priority"] == 1 for task in response.json()["results"]))
+
+    def test_get_tasks_search(self):
+
+        Task.objects.create(owner=self.user, title="Buy milk")
+        Task.objects.create(owner=self.outher_user, title="Buy milk")
+
+        response = self.client.get(self.url, data={"search": "milk"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 1)
+        self.assertEqual(response.json()["results"][0]["title"], "Buy milk")
+
+    def test_get_archived_tasks_served_by_sync_view(self):
+
+        Task.objects.filter(owner=self.user, is_done=True).update(updated_at=timezone.now() - timedelta(days=100))
+        ArchivedTask.objects.archive_batch(timezone.now() - timedelta(days=90), 100)
+
+        response = self.client.get(self.url, data={"archived": "true"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["results"]), 6)
+        self.assertIn("archived_at", response.json()["results"][0])
+
+    def test_get_tasks_throttled(self):
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            THROTTLE_ENABLED=True,
+            THROTTLE_STORE_PATH=str(Path(directory) / "throttle"),
+            THROTTLE_RATES={"user": "1/min", "ip": ""},
+        ):
+            response = self.client.get(self.url, data={"archived": "true"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+            self.assertTrue(response.status_code == status.HTTP_200_OK)
+
+            response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "60")
+        self.assertIn("detail", response.json())
+
+    def test_get_tasks_fields_match_sync_view(self):
+
+        params = {"fields": "title,created_at", "exclude": "created_at", "size": 3}
+
+        response = self.client.get(self.url, data=params, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+        with override_settings(ROOT_URLCONF="api.urls"):
+            expected = self.client.get("/api/tasks/", data=params, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(set(response.json()["results"][0]), {"title"})
+
+    def test_get_tasks_invalid_filter(self):
+
+        response = self.client.get(self.url, data={"priority": "high"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertIn("priority", response.json())
+
+    def test_get_tasks_invalid_page(self):
+
+        response = self.client.get(self.url, data={"page": 99}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {"detail": "Invalid page."})
+
+    def test_get_tasks_not_modified(self):
+
+        etag = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")["ETag"]
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertTrue(response.status_code == status.HTTP_304_NOT_MODIFIED)
+
+    def test_get_tasks_unauthorized(self):
+
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.status_code == status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", response)
+
+    def test_create_task_success(self):
+
+        response = self.client.post(self.url, {"title": "new test task", "priority": 3}, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["title"], "new test task")
+        self.assertTrue(Task.objects.filter(owner=self.user, title="new test task", priority=3).exists())
+
+    def test_create_task_form_data(self):
+
+        response = self.client.post(self.url, {"title": "new test task"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_201_CREATED)
+
+    def test_create_invalid_task(self):
+
+        response = self.client.post(self.url, {"priority": 5}, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertIn("title", response.json())
+        self.assertIn("priority", response.json())
+
+
+@override_settings(ROOT_URLCONF="todo.async_urls")
+class AsyncTaskRetriveUpdateDeleteAPITest(APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user",password="test-pwd")
+        self.outher_user = User.objects.create_user(username="test-outher-user",password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        self.task = Task.objects.create(owner=self.user, title="Task Test", priority=2)
+        self.outher_task = Task.objects.create(owner=self.outher_user, title="Outher Task")
+
+        self.url = reverse('detail update delete tasks', kwargs={"pk": self.task.pk})
+
+    def test_retrive_task_success(self):
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json()["id"], self.task.pk)
+
+    def test_retrive_task_fields(self):
+
+        response = self.client.get(self.url, data={"fields": "id,title"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"id": self.task.pk, "title": "Task Test"})
+
+        response = self.client.get(self.url, data={"exclude": "owner"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertIn("exclude", response.json())
+
+    def test_retrive_task_etag_depends_on_fields(self):
+
+        etag = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")["ETag"]
+
+        response = self.client.get(self.url, data={"fields": "id,title"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = self.client.patch(self.url, {"title": "new title"}, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_MATCH=response["ETag"])
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+
+    def test_retrive_outher_user_task_not_found(self):
+
+        url = reverse('detail update delete tasks', kwargs={"pk": self.outher_task.pk})
+
+        response = self.client.get(url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_404_NOT_FOUND)
+
+    def test_update_task_success(self):
+
+        response = self.client.put(self.url, {"title": "new title", "description": "", "priority": 3, "is_done": True}, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.title, self.task.priority, self.task.is_done), ("new title", 3, True))
+
+    def test_partial_update_form_data(self):
+
+        response = self.client.patch(self.url, {"title": "new title"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, "new title")
+
+    def test_update_if_match_stale(self):
+
+        response = self.client.patch(self.url, {"title": "new title"}, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_MATCH='W/"0-0000000000000000"')
+
+        self.assertTrue(response.status_code == status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_delete_task_success(self):
+
+        response = self.client.delete(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+
+    def test_bulk_route_still_served(self):
+
+        response = self.client.post(reverse('bulk tasks'), [{"title": "bulk task"}], format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_201_CREATED)
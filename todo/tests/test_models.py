@@ -0,0 +1,379 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from ..models import ArchivedTask, Task, TaskCounter, TaskDailyStats, TaskTombstone, TaskVersion
+from ..utils.partitioning import is_partitioned, partition_tasks
+
+
+class TaskCounterUnitTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+
+    def counts(self):
+        return {
+            (counter.is_done, counter.priority): counter.count
+            for counter in TaskCounter.objects.filter(owner=self.user)
+        }
+
+    def test_create_increments_counter(self):
+        Task.objects.create(owner=self.user, title="Task 1", priority=2)
+        Task.objects.create(owner=self.user, title="Task 2", priority=2)
+        Task.objects.create(owner=self.user, title="Task 3", priority=3, is_done=True)
+
+        self.assertEqual(self.counts(), {(False, 2): 2, (True, 3): 1})
+
+    def test_update_moves_counter(self):
+        task = Task.objects.create(owner=self.user, title="Task 1", priority=2)
+
+        task = Task.objects.get(pk=task.pk)
+        task.is_done = True
+        task.priority = 1
+        task.save()
+
+        self.assertEqual(self.counts(), {(False, 2): 0, (True, 1): 1})
+
+    def test_update_of_deferred_instance_moves_counter(self):
+        task = Task.objects.create(owner=self.user, title="Task 1", priority=2)
+
+        task = Task.objects.only("id", "title").get(pk=task.pk)
+        task.title = "Renamed"
+        task.save()
+
+        self.assertEqual(self.counts(), {(False, 2): 1})
+
+    def test_delete_decrements_counter(self):
+        task = Task.objects.create(owner=self.user, title="Task 1", priority=2)
+
+        Task.objects.get(pk=task.pk).delete()
+
+        self.assertEqual(self.counts(), {(False, 2): 0})
+
+    def test_stale_copies_move_counter_once(self):
+        task = Task.objects.create(owner=self.user, title="Task 1", priority=2)
+        first, second = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+
+        first.is_done = True
+        first.save()
+        second.is_done = True
+        second.priority = 3
+        second.save()
+
+        self.assertEqual(self.counts(), {(False, 2): 0, (True, 2): 0, (True, 3): 1})
+
+    def test_delete_of_stale_copies_counts_once(self):
+        task = Task.objects.create(owner=self.user, title="Task 1", priority=2)
+        first, second = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+
+        first.delete()
+        second.delete()
+
+        self.assertEqual(self.counts(), {(False, 2): 0})
+        self.assertEqual(TaskTombstone.objects.filter(task_id=task.pk).count(), 1)
+
+    def test_bulk_create_increments_counter(self):
+        Task.objects.bulk_create([
+            Task(owner=self.user, title="Task 1", priority=1),
+            Task(owner=self.user, title="Task 2", priority=1),
+            Task(owner=self.user, title="Task 3", priority=3, is_done=True),
+        ])
+
+        self.assertEqual(self.counts(), {(False, 1): 2, (True, 3): 1})
+
+    def test_bulk_update_moves_counter(self):
+        tasks = Task.objects.bulk_create([
+            Task(owner=self.user, title="Task 1", priority=1),
+            Task(owner=self.user, title="Task 2", priority=1),
+        ])
+
+        tasks[0].is_done = True
+        Task.objects.bulk_update(tasks, ["is_done"])
+
+        self.assertEqual(self.counts(), {(False, 1): 1, (True, 1): 1})
+
+    def test_queryset_update_and_delete_move_counter(self):
+        Task.objects.create(owner=self.user, title="Task 1", priority=1)
+        Task.objects.create(owner=self.user, title="Task 2", priority=2)
+
+        Task.objects.filter(owner=self.user, priority=1).update(priority=3, is_done=True)
+
+        self.assertEqual(self.counts(), {(False, 1): 0, (False, 2): 1, (True, 3): 1})
+
+        self.user.tasks.filter(is_done=True).delete()
+
+        self.assertEqual(self.counts(), {(False, 1): 0, (False, 2): 1, (True, 3): 0})
+
+    def test_count_for(self):
+        Task.objects.create(owner=self.user, title="Task 1", priority=1)
+        Task.objects.create(owner=self.user, title="Task 2", priority=2, is_done=True)
+        Task.objects.create(owner=self.user, title="Task 3", priority=2)
+
+        self.assertEqual(TaskCounter.objects.count_for(self.user.pk), 3)
+        self.assertEqual(TaskCounter.objects.count_for(self.user.pk, is_done=False), 2)
+        self.assertEqual(TaskCounter.objects.count_for(self.user.pk, priority=2), 2)
+        self.assertEqual(TaskCounter.objects.count_for(self.user.pk, is_done=True, priority=1), 0)
+
+
+class TaskDailyStatsUnitTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+
+    def today(self):
+        return TaskDailyStats.objects.series_for(self.user.pk, 1)[0]
+
+    def test_create_counts_created_and_completed(self):
+        Task.objects.create(owner=self.user, title="Task 1")
+        Task.objects.create(owner=self.user, title="Task 2", is_done=True)
+        Task.objects.bulk_create([Task(owner=self.user, title="Task 3"), Task(owner=self.user, title="Task 4", is_done=True)])
+
+        self.assertEqual(self.today(), {"day": timezone.localdate(), "created": 4, "completed": 2})
+
+    def test_only_marking_done_counts_as_completed(self):
+        task = Task.objects.create(owner=self.user, title="Task 1")
+
+        task.title = "Renamed"
+        task.save()
+        task.is_done = True
+        task.save()
+        task.save()
+        task.is_done = False
+        task.save()
+
+        self.assertEqual(self.today()["completed"], 1)
+
+    def test_queryset_updates_count_completed(self):
+        tasks = Task.objects.bulk_create([Task(owner=self.user, title="Task 1"), Task(owner=self.user, title="Task 2", is_done=True)])
+
+        Task.objects.filter(owner=self.user).update(is_done=True)
+
+        tasks[0].is_done = False
+        Task.objects.bulk_update(tasks[:1], ["is_done"])
+        tasks[0].is_done = True
+        Task.objects.bulk_update(tasks[:1], ["is_done"])
+
+        self.assertEqual(self.today()["completed"], 3)
+
+    def test_delete_keeps_history(self):
+        Task.objects.create(owner=self.user, title="Task 1", is_done=True)
+
+        Task.objects.filter(owner=self.user).delete()
+
+        self.assertEqual(self.today(), {"day": timezone.localdate(), "created": 1, "completed": 1})
+
+    def test_series_is_zero_filled(self):
+        today = timezone.localdate()
+        TaskDailyStats.objects.create(owner=self.user, day=today - timedelta(days=2), created=5, completed=1)
+        TaskDailyStats.objects.create(owner=self.user, day=today - timedelta(days=9), created=7)
+
+        self.assertEqual(TaskDailyStats.objects.series_for(self.user.pk, 3), [
+            {"day": today - timedelta(days=2), "created": 5, "completed": 1},
+            {"day": today - timedelta(days=1), "created": 0, "completed": 0},
+            {"day": today, "created": 0, "completed": 0},
+        ])
+
+
+class TaskVersionUnitTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+
+    def test_every_write_bumps_version(self):
+        self.assertEqual(TaskVersion.objects.current(self.user.pk), 0)
+
+        task = Task.objects.create(owner=self.user, title="Task 1")
+        task.save()
+        Task.objects.bulk_create([Task(owner=self.user, title="Task 2")])
+        Task.objects.filter(owner=self.user).update(title="Renamed")
+        Task.objects.filter(owner=self.user).delete()
+
+        self.assertEqual(TaskVersion.objects.current(self.user.pk), 5)
+
+    def test_empty_delete_keeps_version(self):
+        Task.objects.filter(owner=self.user).delete()
+
+        self.assertEqual(TaskVersion.objects.current(self.user.pk), 0)
+
+
+class RebuildTaskCountersCommandTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+
+        Task.objects.create(owner=self.user, title="Task 1", priority=1)
+        Task.objects.create(owner=self.user, title="Task 2", priority=2, is_done=True)
+
+    def test_check_consistent(self):
+        out = StringIO()
+
+        call_command("rebuild_task_counters", "--check", stdout=out)
+
+        self.assertIn("consistent", out.getvalue())
+
+    def test_check_and_rebuild_drift(self):
+        # Raw SQL and lost writes are not seen by the counters.
+        TaskCounter.objects.filter(owner=self.user).update(count=0)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_task_counters", "--check", stdout=StringIO())
+
+        call_command("rebuild_task_counters", stdout=StringIO())
+
+        self.assertEqual(TaskCounter.objects.count_for(self.user.pk), 2)
+        self.assertEqual(TaskCounter.objects.count_for(self.user.pk, is_done=True, priority=2), 1)
+        call_command("rebuild_task_counters", "--check", stdout=StringIO())
+
+
+class PruneTaskTombstonesCommandTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+
+    def test_prune_after_retention(self):
+        ids = [Task.objects.create(owner=self.user, title=f"Task {index}").pk for index in range(3)]
+        Task.objects.filter(owner=self.user).delete()
+        TaskTombstone.objects.filter(task_id=ids[0]).update(deleted_at=timezone.now() - timedelta(days=31))
+
+        call_command("prune_task_tombstones", stdout=StringIO())
+
+        self.assertCountEqual(TaskTombstone.objects.values_list("task_id", flat=True), ids[1:])
+
+    def test_prune_never_shortens_retention(self):
+        Task.objects.create(owner=self.user, title="Task 1").delete()
+        TaskTombstone.objects.update(deleted_at=timezone.now() - timedelta(days=2))
+
+        call_command("prune_task_tombstones", "--days", "1", stdout=StringIO())
+
+        self.assertEqual(TaskTombstone.objects.count(), 1)
+
+
+class ArchiveTasksCommandTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.old_done = [Task.objects.create(owner=self.user, title=f"Task {index}", is_done=True) for index in range(5)]
+        self.recent_done = Task.objects.create(owner=self.user, title="Recent", is_done=True)
+        self.open = Task.objects.create(owner=self.user, title="Open")
+        Task.objects.filter(pk__in=[task.pk for task in self.old_done + [self.open]]).update(updated_at=timezone.now() - timedelta(days=100))
+
+    def test_archive_moves_old_completed_tasks(self):
+        version = TaskVersion.objects.current(self.user.pk)
+
+        call_command("archive_tasks", "--days", "90", "--batch-size", "2", stdout=StringIO())
+
+        self.assertCountEqual(Task.objects.values_list("pk", flat=True), [self.recent_done.pk, self.open.pk])
+        self.assertCountEqual(ArchivedTask.objects.values_list("pk", flat=True), [task.pk for task in self.old_done])
+        archived = ArchivedTask.objects.get(pk=self.old_done[0].pk)
+        self.assertEqual((archived.owner_id, archived.title, archived.created_at), (self.user.pk, "Task 0", self.old_done[0].created_at))
+
+        self.assertEqual(TaskCounter.objects.count_for(self.user.pk), 2)
+        self.assertCountEqual(TaskTombstone.objects.values_list("task_id", flat=True), [task.pk for task in self.old_done])
+        self.assertTrue(TaskVersion.objects.current(self.user.pk) > version)
+
+    def test_archive_nothing_to_do(self):
+        out = StringIO()
+        call_command("archive_tasks", "--days", "200", stdout=out)
+
+        self.assertIn("Archived 0 task(s)", out.getvalue())
+        self.assertEqual(Task.objects.count(), 7)
+
+    def test_archive_invalid_days(self):
+        with self.assertRaises(CommandError):
+            call_command("archive_tasks", "--days", "0", stdout=StringIO())
+
+
+class TaskOwnerScopedWritesUnitTest(TestCase):
+    # Task.save() and Task.delete() name the owner in their WHERE clause (see
+    # partition_tasks); a copy loaded before the task changed owners has to
+    # find the row all the same.
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.outher_user = User.objects.create_user(username="test-outher-user", password="test-pwd")
+        self.task = Task.objects.create(owner=self.user, title="Task 1", priority=2)
+        self.stale = Task.objects.get(pk=self.task.pk)
+
+        moved = Task.objects.get(pk=self.task.pk)
+        moved.owner = self.outher_user
+        moved.save()
+
+    def assertCountersMatch(self):
+        for user in (self.user, self.outher_user):
+            self.assertEqual(TaskCounter.objects.count_for(user.pk), Task.objects.filter(owner=user).count())
+
+    def test_save_of_stale_owner_updates_the_row(self):
+        self.stale.title = "Renamed"
+        self.stale.save()
+
+        self.assertEqual(list(Task.objects.values_list("pk", "owner_id", "title")), [(self.task.pk, self.user.pk, "Renamed")])
+        self.assertCountersMatch()
+
+    def test_delete_of_stale_owner_deletes_the_row(self):
+        self.stale.delete()
+
+        self.assertFalse(Task.objects.exists())
+        self.assertCountersMatch()
+        self.assertEqual(list(TaskTombstone.objects.values_list("owner_id", "task_id")), [(self.outher_user.pk, self.task.pk)])
+
+
+class PartitionTasksCommandTest(TransactionTestCase):
+    # Committed rows, as in a real run: the swap alters tables, which
+    # PostgreSQL refuses while this transaction has foreign key checks
+    # pending on them.
+
+    def setUp(self):
+        self.outher_user = User.objects.create_user(username="test-outher-user", password="test-pwd")
+        self.outher_task = Task.objects.create(owner=self.outher_user, title="Outher task")
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.tasks = [Task.objects.create(owner=self.user, title=f"Task {index}") for index in range(5)]
+
+    @skipUnless(connection.vendor != "postgresql", "Only fails without PostgreSQL")
+    def test_needs_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command("partition_tasks", stdout=StringIO())
+
+    @skipUnless(connection.vendor == "postgresql", "Partitioning needs PostgreSQL")
+    def test_partition_keeps_rows(self):
+        self.tasks[0].delete()
+        created = []
+
+        def write_during_copy(message):
+            # After the first batch: the outher task and tasks[1] are copied.
+            if created or not message.startswith("Copied"):
+                return
+            Task.objects.filter(pk=self.tasks[1].pk).update(title="raw update")
+            self.tasks[2].delete()
+            self.outher_user.delete()
+            created.append(Task.objects.create(owner=self.user, title="Task created during the copy"))
+
+        partition_tasks(4, 2, log=write_during_copy)
+
+        self.assertTrue(is_partitioned())
+        self.assertEqual(
+            dict(Task.objects.values_list("pk", "title")),
+            {task.pk: task.title for task in [*self.tasks[3:], *created]} | {self.tasks[1].pk: "raw update"},
+        )
+
+        task = Task.objects.create(owner=self.user, title="Task 5")
+        self.assertTrue(task.pk > created[0].pk)
+
+        task.title = "renamed"
+        task.save()
+        self.tasks[3].delete()
+        self.assertEqual(list(Task.objects.filter(owner=self.user, pk=task.pk).values_list("title", flat=True)), ["renamed"])
+        self.assertEqual(TaskCounter.objects.count_for(self.user.pk), 4)
+
+        # Neither the old table nor the moved foreign key holds users back.
+        self.user.delete()
+        self.assertFalse(Task.objects.exists())
+
+        with self.assertRaises(CommandError):
+            call_command("partition_tasks", stdout=StringIO())
@@ -0,0 +1,244 @@
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..filters import TASK_ORDERINGS
+from ..models import ArchivedTask, Task
+
+LIST_FILTERS = [
+    {},
+    {"is_done": True},
+    {"is_done": False},
+    {"priority": 1},
+    {"priority": 3},
+    {"priority": 2, "is_done": True},
+    {"priority": 2, "is_done": False},
+    {"page": 2},
+]
+
+PG_SORT_NODE = re.compile(r"^(->\s+)?(Incremental )?Sort\b")
+
+
+class QueryPlanAssertionsMixin:
+
+    def explain(self, sql: str) -> list[str]:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # Tiny test tables always favour a seq scan, so ask the planner
+                # whether an index *can* serve the query instead.
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("SET LOCAL enable_sort = off")
+                cursor.execute(f"EXPLAIN {sql}")
+                return [row[0].strip() for row in cursor.fetchall()]
+            if connection.vendor == "sqlite":
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                return [row[-1].strip() for row in cursor.fetchall()]
+        self.skipTest(f"No query plan assertions for {connection.vendor}")  # type: ignore
+
+    def assertPlanUsesIndexWithoutSort(self, sql: str):
+        plan = self.explain(sql)
+        for line in plan:
+            if connection.vendor == "postgresql":
+                self.assertNotIn("Seq Scan on tasks", line, plan)  # type: ignore
+                self.assertIsNone(PG_SORT_NODE.match(line), plan)  # type: ignore
+            else:
+                self.assertFalse(line.startswith("SCAN tasks"), plan)  # type: ignore
+                self.assertNotIn("TEMP B-TREE", line, plan)  # type: ignore
+
+    def capture_task_queries(self, url: str, data: dict, token: str) -> list[str]:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, data=data, HTTP_AUTHORIZATION=f"Bearer {token}")  # type: ignore
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)  # type: ignore
+
+        return [query["sql"] for query in queries.captured_queries if '"tasks"' in query["sql"]]
+
+
+class TaskListQueryPlanTest(QueryPlanAssertionsMixin, APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        for task_id in range(30):
+            Task.objects.create(
+                owner=self.user,
+                title=f"Task Test {task_id}",
+                priority=task_id % 3 + 1,
+                is_done=task_id % 2 == 0
+            )
+
+        self.url = reverse('list create tasks')
+
+    def test_list_queries_use_indexes_without_sort(self):
+
+        for filters in LIST_FILTERS:
+            with self.subTest(filters=filters):
+                sqls = self.capture_task_queries(self.url, filters, self.user_token)
+
+                self.assertTrue(len(sqls) > 0)
+                for sql in sqls:
+                    self.assertPlanUsesIndexWithoutSort(sql)
+
+    def test_orderings_use_indexes_without_sort(self):
+
+        for ordering in TASK_ORDERINGS:
+            for filters in [{}, {"is_done": True}, {"priority": 2}, {"page": 2}, {"cursor": ""}]:
+                with self.subTest(ordering=ordering, filters=filters):
+                    sqls = self.capture_task_queries(self.url, {"ordering": ordering, **filters}, self.user_token)
+
+                    self.assertTrue(len(sqls) > 0)
+                    for sql in sqls:
+                        self.assertPlanUsesIndexWithoutSort(sql)
+
+    def test_ordered_cursor_queries_seek_on_index(self):
+
+        for ordering in TASK_ORDERINGS:
+            with self.subTest(ordering=ordering):
+                first_page = self.client.get(self.url, data={"cursor": "", "ordering": ordering}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()
+                sqls = self.capture_task_queries(first_page["next"], {}, self.user_token)
+
+                self.assertTrue(len(sqls) > 0)
+                for sql in sqls:
+                    self.assertPlanUsesIndexWithoutSort(sql)
+
+    def test_changes_queries_use_indexes_without_sort(self):
+
+        token = self.client.get(reverse('task changes'), HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()["sync_token"]
+
+        for data in [{}, {"since": token}]:
+            with self.subTest(data=data):
+                sqls = self.capture_task_queries(reverse('task changes'), data, self.user_token)
+
+                self.assertTrue(len(sqls) > 0)
+                for sql in sqls:
+                    self.assertPlanUsesIndexWithoutSort(sql)
+
+    def test_cursor_queries_seek_on_index(self):
+
+        first_page = self.client.get(self.url, data={"cursor": ""}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()
+
+        for link in [first_page["next"], self.client.get(first_page["next"], HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()["previous"]]:
+            with self.subTest(link=link):
+                sqls = self.capture_task_queries(link, {}, self.user_token)
+
+                self.assertTrue(len(sqls) > 0)
+                for sql in sqls:
+                    self.assertPlanUsesIndexWithoutSort(sql)
+
+
+class TaskSearchQueryPlanTest(QueryPlanAssertionsMixin, APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        for task_id in range(30):
+            Task.objects.create(owner=self.user, title=f"Task Test {task_id}", description="milk" if task_id % 5 == 0 else None)
+
+        self.url = reverse('list create tasks')
+
+    def test_search_reads_full_text_index(self):
+
+        sqls = self.capture_task_queries(self.url, {"search": "milk"}, self.user_token)
+
+        self.assertTrue(len(sqls) > 0)
+        for sql in sqls:
+            plan = self.explain(sql)
+            if connection.vendor == "postgresql":
+                self.assertTrue(any("tasks_owner_search_idx" in line for line in plan), plan)
+                self.assertFalse(any("Seq Scan on tasks" in line for line in plan), plan)
+            else:
+                self.assertTrue(any(line.startswith("SCAN tasks_fts VIRTUAL TABLE") for line in plan), plan)
+                self.assertFalse(any(line.startswith("SCAN tasks ") or line == "SCAN tasks" for line in plan), plan)
+
+
+class TaskArchiveQueryPlanTest(QueryPlanAssertionsMixin, APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        for task_id in range(30):
+            Task.objects.create(owner=self.user, title=f"Task Test {task_id}", priority=task_id % 3 + 1, is_done=True)
+        ArchivedTask.objects.archive_batch(timezone.now(), 100)
+
+        self.url = reverse('list create tasks')
+
+    def test_archived_list_uses_indexes_without_sort(self):
+
+        first_page = self.client.get(self.url, data={"archived": "true"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()
+
+        for data in [{"archived": "true"}, {"archived": "true", "priority": 2}, {"archived": "true", "cursor": first_page["next"].split("cursor=")[1]}]:
+            with self.subTest(data=data):
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(self.url, data=data, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+                sqls = [query["sql"] for query in queries.captured_queries if '"tasks_archive"' in query["sql"]]
+                self.assertTrue(len(sqls) > 0)
+                for sql in sqls:
+                    self.assertPlanUsesIndexWithoutSort(sql)
+
+
+class TaskPartitionPruningTest(APITestCase):
+    # Every query the views run against tasks names the owner, so a tasks
+    # table hash-partitioned on owner_id (partition_tasks) is pruned to one
+    # partition.
+
+    OWNER_CONDITION = re.compile(r'"tasks"\."owner_id" (= |IN \()')
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+        self.tasks = [Task.objects.create(owner=self.user, title=f"Task Test {task_id}", description="milk") for task_id in range(6)]
+
+    def assertQueriesNameOwner(self, method: str, url: str, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data=data, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+            if response.streaming:
+                b"".join(response.streaming_content)
+
+        self.assertTrue(response.status_code < 300, response.content if not response.streaming else None)
+
+        sqls = [query["sql"] for query in queries.captured_queries if '"tasks"' in query["sql"] and not query["sql"].startswith("INSERT")]
+        self.assertTrue(len(sqls) > 0)
+        for sql in sqls:
+            self.assertRegex(sql, self.OWNER_CONDITION)
+
+    def test_reads_name_owner(self):
+        requests = [
+            (reverse('list create tasks'), {}),
+            (reverse('list create tasks'), {"is_done": False, "priority": 1}),
+            (reverse('list create tasks'), {"search": "milk"}),
+            (reverse('list create tasks'), {"ordering": "title", "cursor": ""}),
+            (reverse('detail update delete tasks', kwargs={"pk": self.tasks[0].pk}), {}),
+            (reverse('export tasks'), {}),
+            (reverse('task changes'), {}),
+        ]
+        for url, data in requests:
+            with self.subTest(url=url, data=data):
+                self.assertQueriesNameOwner("get", url, data)
+
+    def test_writes_name_owner(self):
+        detail = lambda task: reverse('detail update delete tasks', kwargs={"pk": task.pk})
+        requests = [
+            ("put", detail(self.tasks[0]), {"title": "renamed", "is_done": True}),
+            ("patch", detail(self.tasks[1]), {"priority": 3}),
+            ("delete", detail(self.tasks[2]), None),
+            ("patch", reverse('bulk tasks'), [{"id": self.tasks[3].pk, "is_done": True}, {"id": self.tasks[4].pk, "priority": 2}]),
+            ("delete", reverse('bulk tasks'), [self.tasks[4].pk, self.tasks[5].pk]),
+        ]
+        for method, url, data in requests:
+            with self.subTest(method=method, url=url):
+                self.assertQueriesNameOwner(method, url, data)
@@ -1,9 +1,10 @@
+from datetime import datetime, timezone
 from typing import cast
 
 from django.test import TestCase
 from ..utils.date_utils import format_datetime_to_response_date
 
-from ..serializers import  TaskCreateSerializer, TaskListSerializer, TaskDetailAndUpdateSerializer
+from ..serializers import  TaskCreateSerializer, TaskListSerializer, TaskListValuesSerializer, TaskDetailAndUpdateSerializer
 from ..models import Task
 from django.contrib.auth.models import User
 
@@ -142,4 +143,30 @@ class TaskListSerializerUnitTest(TestCase):
         serialize = TaskListSerializer([], many=True)
         data = cast(list, serialize.data)
         self.assertEqual(data, [])
-        
\ No newline at end of file
+        
+
+
+class TaskListValuesSerializerUnitTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="test-user",password="test-pwd")
+
+        for task_id in range(3):
+            Task.objects.create(owner=self.user, title=f"Task Test {task_id}", priority=task_id + 1, is_done=task_id == 1)
+
+    def test_serialize_values_like_model_serializer(self):
+        tasks = Task.objects.filter(owner=self.user)
+
+        data = TaskListValuesSerializer(list(tasks.values(*TaskListValuesSerializer.fields))).data
+
+        self.assertEqual(data, [
+            {**task, "created_at": format_datetime_to_response_date(instance.created_at)}
+            for task, instance in zip(cast(list, TaskListSerializer(tasks, many=True).data), tasks)
+        ])
+
+    def test_serialize_keeps_microseconds(self):
+        Task.objects.filter(owner=self.user).update(created_at=datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+
+        data = TaskListValuesSerializer(list(Task.objects.filter(owner=self.user).values(*TaskListValuesSerializer.fields))).data
+
+        self.assertEqual(data[0]["created_at"], "2025-01-02T03:04:05.000000Z")
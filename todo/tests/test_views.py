@@ -1,11 +1,21 @@
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 from ..utils.date_utils import format_datetime_to_response_date
 from datetime import datetime, timedelta, timezone
+import base64
+import csv
+import io
+import json
 import random
+import tempfile
+from pathlib import Path
 
 from django.contrib.auth.models import User
-from ..models import Task
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from ..models import ArchivedTask, Task, TaskCounter, TaskTombstone
+from ..utils.sync_tokens import encode_sync_token
 
 from django.urls import reverse
 from rest_framework import status
@@ -105,6 +115,137 @@ class TaskListAPITest(APITestCase):
         self.assertTrue(response.status_code == status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.json(), expected)
    
+    def test_get_tasks_count_from_counters(self):
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, data={"is_done": True}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertTrue(response.json()["count"] == len([task for task in self.tasks if task["is_done"]]))
+        self.assertFalse(any('COUNT(*)' in query["sql"] and 'FROM "tasks"' in query["sql"] for query in queries.captured_queries))
+
+    def test_get_tasks_cursor_first_page(self):
+
+        response = self.client.get(self.url, data={"cursor": ""}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertListEqual(response.json()["results"], self.tasks[:DEFAULT_PAGE_SIZE])
+        self.assertIsNotNone(response.json()["next"])
+        self.assertIsNone(response.json()["previous"])
+        self.assertNotIn("count", response.json())
+
+    def test_get_tasks_cursor_walk_forward_and_back(self):
+
+        first_page = self.client.get(self.url, data={"cursor": "", "size": 4}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()
+
+        pages = [first_page]
+        while pages[-1]["next"]:
+            pages.append(self.client.get(pages[-1]["next"], HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json())
+
+        self.assertEqual(len(pages), 4)
+        self.assertListEqual([task for page in pages for task in page["results"]], self.tasks)
+
+        previous = self.client.get(pages[-1]["previous"], HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()
+
+        self.assertListEqual(previous["results"], pages[-2]["results"])
+        self.assertIsNotNone(previous["next"])
+
+    def test_get_tasks_cursor_stable_after_insert(self):
+
+        first_page = self.client.get(self.url, data={"cursor": "", "size": 4}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()
+
+        Task.objects.create(owner=self.user, title="Inserted task", priority=3)
+
+        second_page = self.client.get(first_page["next"], HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()
+
+        self.assertListEqual(second_page["results"], self.tasks[4:8])
+
+    def test_get_tasks_cursor_with_filter(self):
+
+        done_tasks = [task for task in self.tasks if task["is_done"]]
+
+        response = self.client.get(self.url, data={"cursor": "", "is_done": True, "size": 50}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertListEqual(response.json()["results"], done_tasks)
+        self.assertIsNone(response.json()["next"])
+
+    def test_get_tasks_invalid_cursor(self):
+
+        response = self.client.get(self.url, data={"cursor": "not-a-cursor"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {"detail": "Invalid cursor"})
+
+        created_at = self.tasks[0]["created_at"]
+        for payload in [
+            {"p": [1, None, 3]},
+            {"p": [1, created_at, [3]]},
+            {"p": [1, {"a": 1}, 3]},
+            {"p": ["1", created_at, 3]},
+            {"p": [True, created_at, 3]},
+            {"p": "abc"},
+            [1, 2, 3],
+        ]:
+            with self.subTest(payload=payload):
+                cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+                response = self.client.get(self.url, data={"cursor": cursor}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+                self.assertTrue(response.status_code == status.HTTP_404_NOT_FOUND)
+
+    def test_get_tasks_ordering(self):
+
+        orderings = {
+            "priority": lambda task: (task["priority"], task["created_at"], task["id"]),
+            "created_at": lambda task: (task["created_at"], task["id"]),
+            "title": lambda task: (task["title"], task["id"]),
+        }
+
+        for ordering, key in orderings.items():
+            for direction in ["", "-"]:
+                with self.subTest(ordering=direction + ordering):
+                    response = self.client.get(self.url, data={"ordering": direction + ordering, "size": 50}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+                    self.assertTrue(response.status_code == status.HTTP_200_OK)
+                    self.assertListEqual(response.json()["results"], sorted(self.tasks, key=key, reverse=direction == "-"))
+
+    def test_get_tasks_ordering_updated_at(self):
+
+        task = Task.objects.get(pk=self.tasks[-1]["id"])
+        task.title = "Updated task"
+        task.save()
+
+        response = self.client.get(self.url, data={"ordering": "-updated_at"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"][0]["id"], task.pk)
+        self.assertNotIn("updated_at", response.json()["results"][0])
+
+    def test_get_tasks_cursor_with_ordering(self):
+
+        for ordering in ["-updated_at", "title"]:
+            with self.subTest(ordering=ordering):
+                expected = self.client.get(self.url, data={"ordering": ordering, "size": 50}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()["results"]
+
+                pages = [self.client.get(self.url, data={"cursor": "", "ordering": ordering, "size": 4}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()]
+                while pages[-1]["next"]:
+                    pages.append(self.client.get(pages[-1]["next"], HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json())
+
+                self.assertListEqual([task for page in pages for task in page["results"]], expected)
+
+                previous = self.client.get(pages[-1]["previous"], HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()
+
+                self.assertListEqual(previous["results"], pages[-2]["results"])
+
+    def test_get_tasks_invalid_ordering(self):
+
+        for ordering in ["description", "-id", "owner__username"]:
+            with self.subTest(ordering=ordering):
+                response = self.client.get(self.url, data={"ordering": ordering}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+                self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+                self.assertIn("ordering", response.json())
+
     def test_get_tasks_filter_by_priority(self):
         
         for priority in [1,2,3]:
@@ -199,8 +340,263 @@ class TaskListAPITest(APITestCase):
         response = self.client.post(self.url, task,)
         
         self.assertTrue(response.status_code == status.HTTP_401_UNAUTHORIZED)
+
+
+class TaskDeletedOwnerAPITest(APITransactionTestCase):
+    # A transaction test: SQLite checks foreign keys when the outermost
+    # transaction commits.
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+        self.user.delete()
+
+    def test_create_task_of_deleted_user(self):
+
+        response = self.client.post(reverse('list create tasks'), {"title": "new test task"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json()["code"], "user_not_found")
+        self.assertIn("WWW-Authenticate", response)
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(ROOT_URLCONF="todo.async_urls")
+    def test_create_task_of_deleted_user_async(self):
+
+        response = self.client.post(reverse('list create tasks'), {"title": "new test task"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(Task.objects.exists())
         
         
+class TaskSearchAPITest(APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.outher_user = User.objects.create_user(username="test-outher-user", password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        self.in_title = Task.objects.create(owner=self.user, title="Buy milk", description="At the corner store", priority=1)
+        self.in_description = Task.objects.create(owner=self.user, title="Groceries", description="Milk, eggs and bread", priority=3)
+        self.both_words = Task.objects.create(owner=self.user, title="Milk the cow", description="Fresh milk for breakfast", priority=2, is_done=True)
+        for task_id in range(6):
+            Task.objects.create(owner=self.user, title=f"Call the bank {task_id}", priority=3)
+        Task.objects.create(owner=self.outher_user, title="Buy milk", priority=3)
+
+        self.url = reverse('list create tasks')
+
+    def search(self, **data):
+        return self.client.get(self.url, data=data, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+    def test_search_ranks_title_matches_first(self):
+
+        response = self.search(search="milk")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        ids = [task["id"] for task in response.json()["results"]]
+        self.assertEqual(response.json()["count"], 3)
+        self.assertCountEqual(ids[:2], [self.both_words.pk, self.in_title.pk])
+        self.assertEqual(ids[2], self.in_description.pk)
+
+    def test_search_requires_every_word(self):
+
+        response = self.search(search="milk bread")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual([task["id"] for task in response.json()["results"]], [self.in_description.pk])
+
+    def test_search_is_case_insensitive(self):
+
+        response = self.search(search="MILK")
+
+        self.assertEqual(response.json()["count"], 3)
+
+    def test_search_with_filters(self):
+
+        response = self.search(search="milk", is_done=False)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 2)
+        self.assertTrue(all(not task["is_done"] for task in response.json()["results"]))
+
+    def test_search_is_paginated(self):
+
+        first_page = self.search(search="milk", size=2).json()
+        second_page = self.search(search="milk", size=2, page=2).json()
+
+        self.assertEqual(first_page["count"], 3)
+        self.assertEqual(len(first_page["results"]), 2)
+        self.assertEqual(
+            [task["id"] for task in first_page["results"] + second_page["results"]],
+            [task["id"] for task in self.search(search="milk").json()["results"]],
+        )
+
+    def test_search_with_ordering(self):
+
+        response = self.search(search="milk", ordering="title")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual([task["title"] for task in response.json()["results"]], ["Buy milk", "Groceries", "Milk the cow"])
+
+    def test_search_ignores_cursor(self):
+
+        response = self.search(search="milk", cursor="")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 3)
+
+    def test_search_follows_writes(self):
+
+        self.in_title.title = "Buy oat drink"
+        self.in_title.save()
+        Task.objects.filter(pk=self.in_description.pk).delete()
+        Task.objects.bulk_create([Task(owner=self.user, title="Pour milk")])
+
+        response = self.search(search="milk")
+
+        self.assertCountEqual([task["title"] for task in response.json()["results"]], ["Milk the cow", "Pour milk"])
+
+    def test_search_ignores_owner(self):
+
+        Task.objects.filter(owner=self.user, title__startswith="Call the bank").delete()
+
+        response = self.search(search=str(self.user.pk))
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 0)
+
+        task = Task.objects.create(owner=self.user, title=f"Room {self.user.pk}")
+        response = self.search(search=str(self.user.pk))
+
+        self.assertEqual([result["id"] for result in response.json()["results"]], [task.pk])
+
+    def test_search_without_words(self):
+
+        for term in ["!!!", '"', "milk\" OR x"]:
+            with self.subTest(term=term):
+                response = self.search(search=term)
+
+                self.assertTrue(response.status_code == status.HTTP_200_OK)
+                self.assertEqual(response.json()["count"], 0)
+
+    def test_search_too_long(self):
+
+        response = self.search(search="milk " * 50)
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+
+
+class TaskSparseFieldsAPITest(APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user",password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        self.tasks = [
+            Task.objects.create(owner=self.user, title=f"Task Test {task_id}", description="Task test description", priority=task_id % 3 + 1)
+            for task_id in range(4)
+        ]
+
+        self.url = reverse('list create tasks')
+        self.detail_url = reverse('detail update delete tasks', kwargs={"pk": self.tasks[0].pk})
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, data=params, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+        selects = [query["sql"] for query in queries if '"tasks"."title"' in query["sql"] or '"tasks"."priority"' in query["sql"]]
+        return response, " ".join(selects)
+
+    def test_get_tasks_fields(self):
+
+        response, sql = self.get(self.url, fields="id,title")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 4)
+        self.assertEqual(set(response.json()["results"][0]), {"id", "title"})
+        self.assertNotIn('"tasks"."description"', sql)
+
+    def test_get_tasks_exclude(self):
+
+        response, sql = self.get(self.url, exclude="description")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(set(response.json()["results"][0]), {"id", "title", "priority", "is_done", "created_at"})
+        self.assertNotIn('"tasks"."description"', sql)
+
+    def test_get_tasks_fields_with_cursor(self):
+
+        response, _ = self.get(self.url, fields="title", cursor="", size=2)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], [{"title": "Task Test 2"}, {"title": "Task Test 1"}])
+
+        response = self.client.get(response.json()["next"], HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertEqual(response.json()["results"], [{"title": "Task Test 3"}, {"title": "Task Test 0"}])
+
+    def test_get_archived_tasks_fields(self):
+
+        Task.objects.filter(pk=self.tasks[0].pk).update(is_done=True, updated_at=datetime.now(timezone.utc) - timedelta(days=100))
+        ArchivedTask.objects.archive_batch(datetime.now(timezone.utc) - timedelta(days=90), 100)
+
+        response, _ = self.get(self.url, archived="true", fields="id,archived_at")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(set(response.json()["results"][0]), {"id", "archived_at"})
+
+    def test_get_tasks_unknown_field(self):
+
+        response, _ = self.get(self.url, fields="id,owner", exclude="secret")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"fields": ["Unknown field(s): owner."], "exclude": ["Unknown field(s): secret."]})
+
+        response, _ = self.get(self.url, fields="updated_at")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+
+    def test_get_tasks_no_field_left(self):
+
+        response, _ = self.get(self.url, fields="id", exclude="id")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertIn("exclude", response.json())
+
+    def test_get_task_fields(self):
+
+        response, sql = self.get(self.detail_url, fields="title,updated_at")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"title": "Task Test 0", "updated_at": format_datetime_to_response_date(self.tasks[0].updated_at)})
+        self.assertNotIn('"tasks"."description"', sql)
+
+    def test_get_task_exclude(self):
+
+        response, sql = self.get(self.detail_url, exclude="description,created_at")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(set(response.json()), {"id", "title", "priority", "is_done", "updated_at"})
+        self.assertNotIn('"tasks"."description"', sql)
+
+    def test_get_task_unknown_field(self):
+
+        response, _ = self.get(self.detail_url, fields="owner")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", response.json())
+
+    def test_patch_task_ignores_fields(self):
+
+        response = self.client.patch(f"{self.detail_url}?fields=id", data={"title": "Renamed"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json()["title"], "Renamed")
+        self.assertIn("description", response.json())
+
+
 class TaskRetriveUpdateDeleteAPITest(APITestCase):
     
     def setUp(self):
@@ -337,3 +733,798 @@ class TaskRetriveUpdateDeleteAPITest(APITestCase):
         response = self.client.patch(self.url)
 
         self.assertTrue(response.status_code == status.HTTP_401_UNAUTHORIZED)
+
+
+class TaskBulkAPITest(APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user",password="test-pwd")
+        self.outher_user = User.objects.create_user(username="test-outher-user",password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+        self.outher_user_token = str(RefreshToken.for_user(self.outher_user).access_token)
+
+        self.user_tasks = [
+            Task.objects.create(owner=self.user, title=f"Task Test {task_id}", priority=1)
+            for task_id in range(3)
+        ]
+        self.outher_user_task = Task.objects.create(owner=self.outher_user, title="Outher Task", priority=1)
+
+        self.url = reverse('bulk tasks')
+
+    def test_bulk_create_success(self):
+
+        tasks = [
+            {"title": "new test task 1", "description": "description", "priority": 1},
+            {"title": "new test task 2", "priority": 3},
+        ]
+
+        response = self.client.post(self.url, tasks, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_201_CREATED)
+        self.assertEqual([task["title"] for task in response.json()], ["new test task 1", "new test task 2"])
+        self.assertTrue(all(Task.objects.filter(pk=task["id"], owner=self.user).exists() for task in response.json()))
+        self.assertEqual(self.client.get(reverse('list create tasks'), HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()["count"], 5)
+
+    def test_bulk_create_reports_errors_per_item(self):
+
+        tasks = [
+            {"title": "valid task", "priority": 1},
+            {"description": "no title"},
+            {"title": "invalid priority", "priority": 4},
+        ]
+
+        response = self.client.post(self.url, tasks, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()[0], {})
+        self.assertIn("title", response.json()[1])
+        self.assertIn("priority", response.json()[2])
+        self.assertEqual(Task.objects.filter(owner=self.user).count(), 3)
+
+    def test_bulk_create_batch_too_large(self):
+
+        tasks = [{"title": f"task {index}"} for index in range(201)]
+
+        response = self.client.post(self.url, tasks, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.json())
+
+    def test_bulk_update_success(self):
+
+        tasks = [
+            {"id": self.user_tasks[0].pk, "is_done": True},
+            {"id": self.user_tasks[1].pk, "title": "renamed", "priority": 3},
+        ]
+
+        response = self.client.patch(self.url, tasks, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertTrue(response.json()[0]["is_done"])
+        self.assertEqual(response.json()[1]["title"], "renamed")
+
+        self.user_tasks[1].refresh_from_db()
+        self.assertEqual(self.user_tasks[1].priority, 3)
+        self.assertTrue(self.user_tasks[1].updated_at > self.user_tasks[2].updated_at)
+
+    def test_bulk_update_reports_errors_per_item(self):
+
+        tasks = [
+            {"id": self.user_tasks[0].pk, "is_done": True},
+            {"id": self.outher_user_task.pk, "title": "not mine"},
+            {"id": self.user_tasks[1].pk, "priority": 4},
+            {"title": "no id"},
+        ]
+
+        response = self.client.patch(self.url, tasks, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()[0], {})
+        self.assertEqual(response.json()[1], {"id": ["Not found."]})
+        self.assertIn("priority", response.json()[2])
+        self.assertEqual(response.json()[3], {"id": ["This field is required."]})
+
+        self.user_tasks[0].refresh_from_db()
+        self.assertFalse(self.user_tasks[0].is_done)
+
+    def test_bulk_delete_success(self):
+
+        ids = [task.pk for task in self.user_tasks[:2]]
+
+        response = self.client.delete(self.url, ids, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_204_NO_CONTENT)
+        self.assertListEqual(list(Task.objects.filter(owner=self.user).values_list("pk", flat=True)), [self.user_tasks[2].pk])
+        self.assertEqual(self.client.get(reverse('list create tasks'), HTTP_AUTHORIZATION=f"Bearer {self.user_token}").json()["count"], 1)
+
+    def test_bulk_delete_reports_missing_ids(self):
+
+        ids = [self.user_tasks[0].pk, self.outher_user_task.pk]
+
+        response = self.client.delete(self.url, ids, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"1": ["Not found."]})
+        self.assertEqual(Task.objects.count(), 4)
+
+    def test_bulk_unauthorized(self):
+
+        response = self.client.post(self.url, [{"title": "task"}], format="json")
+
+        self.assertTrue(response.status_code == status.HTTP_401_UNAUTHORIZED)
+
+
+class TaskConditionalRequestAPITest(APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user",password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        self.task = Task.objects.create(owner=self.user, title="Task Test 1", priority=2)
+        self.outher_task = Task.objects.create(owner=self.user, title="Task Test 2", priority=1)
+
+        self.list_url = reverse('list create tasks')
+        self.url = reverse('detail update delete tasks', kwargs={"pk": self.task.pk})
+
+    def test_list_not_modified(self):
+
+        etag = self.client.get(self.list_url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertTrue(response.status_code == status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(any('"tasks"' in query["sql"] for query in queries.captured_queries))
+
+    def test_list_etag_depends_on_query_string(self):
+
+        first_page = self.client.get(self.list_url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+        second_page = self.client.get(self.list_url, data={"size": 1, "page": 2}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertNotEqual(first_page["ETag"], second_page["ETag"])
+        self.assertIn("Authorization", first_page["Vary"])
+
+    def test_list_modified_after_write(self):
+
+        etag = self.client.get(self.list_url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")["ETag"]
+
+        self.client.post(self.list_url, {"title": "new test task"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        response = self.client.get(self.list_url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_detail_not_modified(self):
+
+        etag = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")["ETag"]
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertTrue(response.status_code == status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_etag_depends_on_fields(self):
+
+        etag = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")["ETag"]
+
+        response = self.client.get(self.url, data={"fields": "id,title"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"id": self.task.pk, "title": "Task Test 1"})
+        self.assertNotEqual(response["ETag"], etag)
+
+        # The same selection, however it is spelled, shares the tag.
+        response = self.client.get(self.url, data={"fields": " title,id,"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertTrue(response.status_code == status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.patch(self.url, {"title": "new title"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_MATCH=response["ETag"])
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+
+    def test_update_if_match_success(self):
+
+        etag = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")["ETag"]
+
+        response = self.client.patch(self.url, {"title": "new title"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_MATCH=etag)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")["ETag"], response["ETag"])
+
+    def test_update_if_match_stale(self):
+
+        etag = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")["ETag"]
+
+        self.outher_task.is_done = True
+        self.outher_task.save()
+
+        response = self.client.patch(self.url, {"title": "new title"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_MATCH=etag)
+
+        self.assertTrue(response.status_code == status.HTTP_412_PRECONDITION_FAILED)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, "Task Test 1")
+
+    def test_delete_if_match_stale(self):
+
+        response = self.client.delete(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_MATCH='W/"0-0000000000000000"')
+
+        self.assertTrue(response.status_code == status.HTTP_412_PRECONDITION_FAILED)
+        self.assertTrue(Task.objects.filter(pk=self.task.pk).exists())
+
+
+class TaskStatsAPITest(APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.outher_user = User.objects.create_user(username="test-outher-user", password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        Task.objects.create(owner=self.user, title="Task 1", priority=1)
+        Task.objects.create(owner=self.user, title="Task 2", priority=1)
+        Task.objects.create(owner=self.user, title="Task 3", priority=3, is_done=True)
+        Task.objects.create(owner=self.outher_user, title="Outher Task", priority=2)
+
+        self.url = reverse('task stats')
+
+    def test_stats_success(self):
+
+        today = datetime.now(timezone.utc).date()
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, data={"days": 3}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json(), {
+            "count": 3,
+            "totals": [
+                {"is_done": False, "priority": 1, "count": 2},
+                {"is_done": False, "priority": 2, "count": 0},
+                {"is_done": False, "priority": 3, "count": 0},
+                {"is_done": True, "priority": 1, "count": 0},
+                {"is_done": True, "priority": 2, "count": 0},
+                {"is_done": True, "priority": 3, "count": 1},
+            ],
+            "days": [
+                {"day": (today - timedelta(days=2)).isoformat(), "created": 0, "completed": 0},
+                {"day": (today - timedelta(days=1)).isoformat(), "created": 0, "completed": 0},
+                {"day": today.isoformat(), "created": 3, "completed": 1},
+            ],
+        })
+
+    def test_stats_default_days(self):
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["days"]), 30)
+
+    def test_stats_follow_writes(self):
+
+        task = Task.objects.filter(owner=self.user, priority=1).first()
+        task.is_done = True
+        task.save()
+
+        response = self.client.get(self.url, data={"days": 1}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertIn({"is_done": True, "priority": 1, "count": 1}, response.json()["totals"])
+        self.assertEqual(response.json()["days"][0]["completed"], 2)
+
+    def test_stats_not_modified(self):
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertTrue(response.status_code == status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(TASKS_STATS_MAX_DAYS=7)
+    def test_stats_invalid_days(self):
+
+        for days in [0, 8, "week"]:
+            with self.subTest(days=days):
+                response = self.client.get(self.url, data={"days": days}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+                self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+                self.assertIn("days", response.json())
+
+    def test_stats_unauthorized(self):
+
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.status_code == status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(TASKS_SYNC_OVERLAP_SECONDS=0)
+class TaskChangesAPITest(APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.outher_user = User.objects.create_user(username="test-outher-user", password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        self.tasks = [Task.objects.create(owner=self.user, title=f"Task Test {task_id}") for task_id in range(5)]
+        Task.objects.create(owner=self.outher_user, title="Outher Task")
+
+        self.url = reverse('task changes')
+
+    def sync(self, since=None):
+        data = {"since": since} if since is not None else {}
+        return self.client.get(self.url, data=data, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+    def test_full_sync(self):
+
+        response = self.sync()
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual([task["id"] for task in response.json()["changes"]], [task.pk for task in self.tasks])
+        self.assertEqual(response.json()["deleted"], [])
+        self.assertFalse(response.json()["has_more"])
+        self.assertIn("updated_at", response.json()["changes"][0])
+
+    def test_delta_sync(self):
+
+        token = self.sync().json()["sync_token"]
+
+        self.client.patch(reverse('detail update delete tasks', kwargs={"pk": self.tasks[1].pk}), data={"is_done": True}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+        self.client.delete(reverse('detail update delete tasks', kwargs={"pk": self.tasks[2].pk}), HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+        created = Task.objects.create(owner=self.user, title="New task")
+        Task.objects.create(owner=self.outher_user, title="Outher new task")
+
+        response = self.sync(token)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual([task["id"] for task in response.json()["changes"]], [self.tasks[1].pk, created.pk])
+        self.assertTrue(response.json()["changes"][0]["is_done"])
+        self.assertEqual(response.json()["deleted"], [self.tasks[2].pk])
+
+        response = self.sync(response.json()["sync_token"])
+
+        self.assertEqual(response.json()["changes"], [])
+        self.assertEqual(response.json()["deleted"], [])
+
+    def test_bulk_delete_leaves_tombstones(self):
+
+        token = self.sync().json()["sync_token"]
+
+        self.client.delete(reverse('bulk tasks'), data=[self.tasks[0].pk, self.tasks[3].pk], format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        response = self.sync(token)
+
+        self.assertCountEqual(response.json()["deleted"], [self.tasks[0].pk, self.tasks[3].pk])
+
+    @override_settings(TASKS_SYNC_MAX_CHANGES=2)
+    def test_sync_in_pages(self):
+
+        pages = [self.sync().json()]
+        while pages[-1]["has_more"]:
+            pages.append(self.sync(pages[-1]["sync_token"]).json())
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual([task["id"] for page in pages for task in page["changes"]], [task.pk for task in self.tasks])
+
+    @override_settings(TASKS_SYNC_MAX_CHANGES=2, TASKS_SYNC_MAX_DELETED=2)
+    def test_sync_deleted_in_pages(self):
+
+        token = self.sync().json()["sync_token"]
+
+        self.client.delete(reverse('bulk tasks'), data=[task.pk for task in self.tasks[:4]], format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+        self.client.patch(reverse('detail update delete tasks', kwargs={"pk": self.tasks[4].pk}), data={"is_done": True}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        pages = [self.sync(token).json()]
+        while pages[-1]["has_more"]:
+            pages.append(self.sync(pages[-1]["sync_token"]).json())
+
+        self.assertEqual(len(pages), 2)
+        self.assertTrue(all(len(page["deleted"]) <= 2 for page in pages))
+        self.assertEqual([task_id for page in pages for task_id in page["deleted"]], [task.pk for task in self.tasks[:4]])
+        self.assertEqual([task["id"] for page in pages for task in page["changes"]], [self.tasks[4].pk])
+
+    def test_invalid_token(self):
+
+        for token in ["not-a-token", encode_sync_token(datetime(2025, 1, 1)), encode_sync_token(datetime.now(timezone.utc) + timedelta(minutes=1))]:
+            with self.subTest(token=token):
+                response = self.sync(token)
+
+                self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+                self.assertIn("since", response.json())
+
+    def test_expired_token(self):
+
+        response = self.sync(encode_sync_token(datetime.now(timezone.utc) - timedelta(days=31)))
+
+        self.assertTrue(response.status_code == status.HTTP_410_GONE)
+
+    def test_changes_unauthorized(self):
+
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.status_code == status.HTTP_401_UNAUTHORIZED)
+
+
+class TaskArchiveAPITest(APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user", password="test-pwd")
+        self.outher_user = User.objects.create_user(username="test-outher-user", password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        self.tasks = [
+            Task.objects.create(owner=self.user, title=f"Task {index}", priority=index % 3 + 1, is_done=index < 5)
+            for index in range(7)
+        ]
+        Task.objects.create(owner=self.outher_user, title="Outher Task", is_done=True)
+        Task.objects.filter(is_done=True).update(updated_at=datetime.now(timezone.utc) - timedelta(days=100))
+        ArchivedTask.objects.archive_batch(datetime.now(timezone.utc) - timedelta(days=90), 100)
+
+        self.url = reverse('list create tasks')
+
+    def get(self, url=None, **data):
+        return self.client.get(url or self.url, data=data, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+    def test_archived_list_success(self):
+
+        response = self.get(archived="true", size=3)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertNotIn("count", response.json())
+        self.assertEqual([task["id"] for task in response.json()["results"]], [task.pk for task in self.tasks[4:1:-1]])
+        self.assertIn("archived_at", response.json()["results"][0])
+        self.assertIsNone(response.json()["previous"])
+
+        response = self.get(response.json()["next"])
+
+        self.assertEqual([task["id"] for task in response.json()["results"]], [task.pk for task in self.tasks[1::-1]])
+        self.assertIsNone(response.json()["next"])
+
+    def test_archived_tasks_leave_task_list(self):
+
+        response = self.get()
+
+        self.assertEqual(response.json()["count"], 2)
+        self.assertEqual({task["id"] for task in response.json()["results"]}, {self.tasks[5].pk, self.tasks[6].pk})
+
+    def test_archived_list_filter(self):
+
+        response = self.get(archived="true", priority=1)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual([task["id"] for task in response.json()["results"]], [self.tasks[3].pk, self.tasks[0].pk])
+
+    def test_archived_list_invalid_value(self):
+
+        response = self.get(archived="maybe")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertIn("archived", response.json())
+
+    def test_archived_list_etag_changes_when_archiving(self):
+
+        etag = self.get(archived="true")["ETag"]
+        self.assertTrue(self.client.get(self.url, data={"archived": "true"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED)
+
+        Task.objects.filter(pk=self.tasks[5].pk).update(is_done=True, updated_at=datetime.now(timezone.utc) - timedelta(days=100))
+        ArchivedTask.objects.archive_batch(datetime.now(timezone.utc) - timedelta(days=90), 100)
+
+        response = self.client.get(self.url, data={"archived": "true"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"][0]["id"], self.tasks[5].pk)
+
+
+class TaskExportAPITest(APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user",password="test-pwd")
+        self.outher_user = User.objects.create_user(username="test-outher-user",password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        self.tasks = [
+            Task.objects.create(owner=self.user, title=f"Task Test {task_id}", description="Task, \"quoted\"", priority=task_id % 3 + 1, is_done=task_id % 2 == 0)
+            for task_id in range(7)
+        ]
+        Task.objects.create(owner=self.outher_user, title="Outher Task")
+
+        self.url = reverse('export tasks')
+
+    def read(self, response) -> str:
+        return b"".join(response.streaming_content).decode()
+
+    @override_settings(TASKS_EXPORT_CHUNK_SIZE=2)
+    def test_export_ndjson_success(self):
+
+        response = self.client.get(self.url, data={"format": "ndjson"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [json.loads(line) for line in self.read(response).splitlines()],
+            [
+                {
+                    "id": task.pk,
+                    "title": task.title,
+                    "description": task.description,
+                    "priority": task.priority,
+                    "is_done": task.is_done,
+                    "created_at": format_datetime_to_response_date(task.created_at),
+                    "updated_at": format_datetime_to_response_date(task.updated_at),
+                }
+                for task in Task.objects.filter(owner=self.user)
+            ],
+        )
+
+    def test_export_csv_success(self):
+
+        response = self.client.get(self.url, data={"format": "csv"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="tasks.csv"')
+        self.assertEqual(len(rows), len(self.tasks))
+        self.assertEqual(rows[0]["description"], "Task, \"quoted\"")
+        self.assertEqual(list(rows[0]), ["id", "title", "description", "priority", "is_done", "created_at", "updated_at"])
+
+    def test_export_with_filter(self):
+
+        response = self.client.get(self.url, data={"is_done": "true", "priority": 1}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        lines = [json.loads(line) for line in self.read(response).splitlines()]
+
+        self.assertEqual({line["id"] for line in lines}, {task.pk for task in self.tasks if task.is_done and task.priority == 1})
+
+    def test_export_invalid_filter(self):
+
+        response = self.client.get(self.url, data={"format": "csv", "priority": "high"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertIn("priority", response.content.decode())
+
+    def test_export_unknown_format(self):
+
+        response = self.client.get(self.url, data={"format": "xml"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_404_NOT_FOUND)
+
+    def test_export_unauthorized(self):
+
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.status_code == status.HTTP_401_UNAUTHORIZED)
+
+
+class TaskImportAPITest(APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user",password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        self.url = reverse('import tasks')
+
+    def post(self, body: str, content_type: str):
+        return self.client.generic("POST", self.url, body.encode(), content_type=content_type, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+    @override_settings(TASKS_IMPORT_BATCH_SIZE=2)
+    def test_import_ndjson_success(self):
+
+        body = "\n".join(json.dumps({"title": f"Task {index}", "priority": index % 3 + 1, "is_done": index == 0}) for index in range(5))
+
+        response = self.post(body, "application/x-ndjson")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"accepted": 5, "rejected": 0, "errors": []})
+        self.assertEqual(Task.objects.filter(owner=self.user).count(), 5)
+        self.assertEqual(TaskCounter.objects.count_for(self.user.pk), 5)
+        self.assertEqual(TaskCounter.objects.count_for(self.user.pk, is_done=True), 1)
+
+    def test_import_ndjson_reports_rejected_lines(self):
+
+        body = '{"title": "Task 1"}\n{"title": \n\n{"priority": 9}\n[1, 2]\n{"title": "Task 2"}\n'
+
+        response = self.post(body, "application/x-ndjson")
+
+        data = response.json()
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual((data["accepted"], data["rejected"]), (2, 3))
+        self.assertEqual([error["line"] for error in data["errors"]], [2, 4, 5])
+        self.assertIn("title", data["errors"][1]["errors"])
+        self.assertIn("priority", data["errors"][1]["errors"])
+
+    def test_import_csv_success(self):
+
+        body = 'title,description,priority,is_done\r\nTask 1,,2,true\r\n"Task, 2","multi\nline",3,false\r\n,no title,1,false\r\n'
+
+        response = self.post(body, "text/csv")
+
+        data = response.json()
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual((data["accepted"], data["rejected"]), (2, 1))
+        self.assertEqual(data["errors"][0]["line"], 5)
+        self.assertEqual(Task.objects.get(owner=self.user, title="Task, 2").description, "multi\nline")
+        self.assertIsNone(Task.objects.get(owner=self.user, title="Task 1").description)
+
+    def test_import_csv_with_byte_order_mark(self):
+
+        response = self.post("\ufefftitle,priority\r\nTask 1,2\r\n", "text/csv")
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"accepted": 1, "rejected": 0, "errors": []})
+        self.assertTrue(Task.objects.filter(owner=self.user, title="Task 1", priority=2).exists())
+
+    def test_import_export_round_trip(self):
+
+        Task.objects.create(owner=self.user, title="Task 1", priority=3, is_done=True)
+
+        exported = b"".join(self.client.get(reverse('export tasks'), data={"format": "csv"}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}").streaming_content)
+        response = self.post(exported.decode(), "text/csv")
+
+        self.assertEqual(response.json()["accepted"], 1)
+        self.assertEqual(Task.objects.filter(owner=self.user, title="Task 1", priority=3, is_done=True).count(), 2)
+
+    @override_settings(TASKS_IMPORT_MAX_REPORTED_ERRORS=1)
+    def test_import_caps_reported_errors(self):
+
+        response = self.post("{}\n{}\n{}\n", "application/x-ndjson")
+
+        self.assertEqual(response.json()["rejected"], 3)
+        self.assertEqual(len(response.json()["errors"]), 1)
+
+    def test_import_unsupported_media_type(self):
+
+        response = self.client.post(self.url, [{"title": "Task 1"}], format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        self.assertTrue(response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_import_unauthorized(self):
+
+        response = self.client.generic("POST", self.url, b'{"title": "Task 1"}', content_type="application/x-ndjson")
+
+        self.assertTrue(response.status_code == status.HTTP_401_UNAUTHORIZED)
+
+
+class TaskBatchAPITest(APITestCase):
+
+    def setUp(self):
+
+        self.user = User.objects.create_user(username="test-user",password="test-pwd")
+        self.outher_user = User.objects.create_user(username="test-outher-user",password="test-pwd")
+        self.user_token = str(RefreshToken.for_user(self.user).access_token)
+
+        self.task = Task.objects.create(owner=self.user, title="Task 1", description="Task test description", priority=2)
+        self.outher_task = Task.objects.create(owner=self.outher_user, title="Outher Task")
+
+        self.url = reverse('batch')
+
+    def post(self, requests, **data):
+        return self.client.post(self.url, {"requests": requests, **data}, format="json", HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+    def test_batch_success(self):
+
+        response = self.post([
+            {"method": "GET", "path": "/api/tasks/?fields=id,title"},
+            {"method": "GET", "path": "/api/tasks/stats/?days=7"},
+            {"method": "GET", "path": f"/api/tasks/{self.task.pk}/"},
+            {"method": "POST", "path": "/api/tasks/", "body": {"title": "Task 2", "priority": 3}},
+        ])
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        responses = response.json()["responses"]
+        self.assertEqual([item["status"] for item in responses], [200, 200, 200, 201])
+        self.assertEqual(responses[0]["body"], {"count": 1, "results": [{"id": self.task.pk, "title": "Task 1"}]})
+        self.assertEqual(responses[1]["body"]["count"], 1)
+        self.assertEqual(responses[2]["body"]["description"], "Task test description")
+        self.assertIn("ETag", responses[2]["headers"])
+        self.assertEqual(responses[3]["body"]["title"], "Task 2")
+        self.assertTrue(Task.objects.filter(owner=self.user, title="Task 2").exists())
+
+    def test_batch_matches_direct_requests(self):
+
+        direct = self.client.get(reverse('list create tasks'), data={"size": 5}, HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
+
+        response = self.post([{"method": "GET", "path": "/api/tasks/?size=5"}])
+
+        self.assertEqual(response.json()["responses"][0], {"status": 200, "headers": {"ETag": direct["ETag"]}, "body": direct.json()})
+
+    def test_batch_conditional_headers(self):
+
+        etag = self.client.get(reverse('detail update delete tasks', kwargs={"pk": self.task.pk}), HTTP_AUTHORIZATION=f"Bearer {self.user_token}")["ETag"]
+
+        response = self.post([
+            {"method": "GET", "path": f"/api/tasks/{self.task.pk}/", "headers": {"If-None-Match": etag}},
+            {"method": "PATCH", "path": f"/api/tasks/{self.task.pk}/", "body": {"title": "Renamed"}, "headers": {"If-Match": '"stale"'}},
+        ])
+
+        self.assertEqual([item["status"] for item in response.json()["responses"]], [304, 412])
+        self.assertIsNone(response.json()["responses"][0]["body"])
+
+    def test_batch_sub_request_errors(self):
+
+        response = self.post([
+            {"method": "GET", "path": f"/api/tasks/{self.outher_task.pk}/"},
+            {"method": "POST", "path": "/api/tasks/", "body": {"priority": 5}},
+            {"method": "DELETE", "path": f"/api/tasks/{self.task.pk}/"},
+        ])
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        responses = response.json()["responses"]
+        self.assertEqual([item["status"] for item in responses], [404, 400, 204])
+        self.assertIn("title", responses[1]["body"])
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+
+    def test_batch_atomic_rolls_back(self):
+
+        response = self.post([
+            {"method": "PATCH", "path": f"/api/tasks/{self.task.pk}/", "body": {"title": "Renamed"}},
+            {"method": "POST", "path": "/api/tasks/", "body": {"title": ""}},
+            {"method": "DELETE", "path": f"/api/tasks/{self.task.pk}/"},
+        ], atomic=True)
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([item["status"] for item in response.json()["responses"]], [200, 400, 424])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, "Task 1")
+        self.assertEqual(TaskCounter.objects.count_for(self.user.pk), 1)
+
+    def test_batch_atomic_success(self):
+
+        response = self.post([
+            {"method": "POST", "path": "/api/tasks/bulk/", "body": [{"title": "Task 2"}, {"title": "Task 3"}]},
+            {"method": "DELETE", "path": f"/api/tasks/{self.task.pk}/"},
+        ], atomic=True)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual(sorted(Task.objects.filter(owner=self.user).values_list("title", flat=True)), ["Task 2", "Task 3"])
+
+    def test_batch_invalid_requests(self):
+
+        response = self.post([
+            {"method": "GET", "path": "/api/auth/register/"},
+            {"method": "GET", "path": "/api/tasks/export/"},
+            {"method": "GET", "path": "/api/tasks/missing/"},
+            {"method": "TRACE", "path": "/api/tasks/"},
+            {"method": "GET", "path": "/api/tasks/", "headers": {"Authorization": "Bearer x"}},
+        ])
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        errors = response.json()["requests"]
+        self.assertIn("path", errors[0])
+        self.assertIn("path", errors[1])
+        self.assertIn("path", errors[2])
+        self.assertIn("method", errors[3])
+        self.assertIn("headers", errors[4])
+
+    @override_settings(TASKS_BATCH_MAX_REQUESTS=2)
+    def test_batch_too_many_requests(self):
+
+        response = self.post([{"method": "GET", "path": "/api/tasks/"}] * 3)
+
+        self.assertTrue(response.status_code == status.HTTP_400_BAD_REQUEST)
+        self.assertIn("requests", response.json())
+
+    def test_batch_sub_requests_are_throttled(self):
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            THROTTLE_ENABLED=True,
+            THROTTLE_STORE_PATH=str(Path(directory) / "throttle"),
+            THROTTLE_RATES={"user": "2/min", "ip": ""},
+        ):
+            response = self.post([{"method": "GET", "path": "/api/tasks/"}] * 2)
+
+        self.assertTrue(response.status_code == status.HTTP_200_OK)
+        self.assertEqual([item["status"] for item in response.json()["responses"]], [200, 429])
+        self.assertIn("Retry-After", response.json()["responses"][1]["headers"])
+
+    def test_batch_unauthorized(self):
+
+        response = self.client.post(self.url, {"requests": [{"method": "GET", "path": "/api/tasks/"}]}, format="json")
+
+        self.assertTrue(response.status_code == status.HTTP_401_UNAUTHORIZED)
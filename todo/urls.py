@@ -4,5 +4,10 @@ from . import views
 
 urlpatterns = [
     path('', views.TaskListCreateApiView.as_view(), name="list create tasks"),
+    path('bulk/', views.TaskBulkApiView.as_view(), name="bulk tasks"),
+    path('export/', views.TaskExportApiView.as_view(), name="export tasks"),
+    path('import/', views.TaskImportApiView.as_view(), name="import tasks"),
+    path('stats/', views.TaskStatsApiView.as_view(), name="task stats"),
+    path('changes/', views.TaskChangesApiView.as_view(), name="task changes"),
     path('<int:pk>/', views.TaskDetailUpdateDeleteView.as_view(), name="detail update delete tasks"),
 ]
\ No newline at end of file
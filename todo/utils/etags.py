@@ -0,0 +1,42 @@
+import hashlib
+import re
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The tasks were modified since this representation was fetched.'
+    default_code = 'precondition_failed'
+
+
+# The ".<digest>" a variant adds to a tag.
+VARIANT = re.compile(r'\.[0-9a-f]+"$')
+
+
+def make_task_etag(version: int, resource: str, variant: str = '') -> str:
+    # A variant (the fields a detail GET returns) gets a tag of its own, so
+    # a cache never answers one selection with another.
+    digest = hashlib.sha1(resource.encode()).hexdigest()[:16]
+    if variant:
+        digest += '.' + hashlib.sha1(variant.encode()).hexdigest()[:8]
+    return f'W/"{version}-{digest}"'
+
+
+def etag_matches(header: str | None, etag: str, any_variant: bool = False) -> bool:
+    # Weak comparison: W/ prefixes are ignored on both sides. With
+    # any_variant (If-Match), the tag of any variant of the resource counts.
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+
+    opaque_tag = etag.removeprefix('W/')
+    for candidate in header.split(','):
+        candidate = candidate.strip().removeprefix('W/')
+        if any_variant:
+            candidate = VARIANT.sub('"', candidate)
+        if candidate == opaque_tag:
+            return True
+    return False
@@ -0,0 +1,236 @@
+import re
+
+from django.db import connection, transaction
+
+from todo.models import Task
+
+# Converts the tasks table (PostgreSQL) into one hash-partitioned on
+# owner_id. Every task query names its owner, so each one is pruned to a
+# single partition. Rows are copied in batches while the API keeps running;
+# only the final catch-up and the swap hold a lock that makes writes wait.
+# The old table is kept as tasks_unpartitioned, without its foreign keys.
+
+TABLE = Task._meta.db_table
+NEW_TABLE = f"{TABLE}_partitioned"
+OLD_TABLE = f"{TABLE}_unpartitioned"
+
+# (owner_id, id) of every row written while the copy runs, filled by a
+# trigger on the tasks table.
+CHANGE_LOG = f"{TABLE}_partition_log"
+CHANGE_LOG_FUNCTION = f"{CHANGE_LOG}_write"
+
+INDEX_DEFINITION = re.compile(r"^CREATE INDEX (\S+) ON (?:ONLY )?\S+ USING ")
+
+
+class PartitioningError(Exception):
+    pass
+
+
+def is_partitioned(table: str = TABLE) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [table])
+        return cursor.fetchone() is not None
+
+
+def quote(name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def task_columns() -> str:
+    # The generated search_vector column is not a model field and is
+    # computed again by the new table.
+    return ", ".join(quote(field.column) for field in Task._meta.concrete_fields)
+
+
+def check_table():
+    if connection.vendor != "postgresql":
+        raise PartitioningError("Partitioning the tasks table needs PostgreSQL.")
+    if is_partitioned():
+        raise PartitioningError(f"{TABLE} is already partitioned.")
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s), to_regclass(%s), to_regclass(%s)", [NEW_TABLE, OLD_TABLE, CHANGE_LOG])
+        if any(cursor.fetchone()):
+            raise PartitioningError(f"{NEW_TABLE}, {OLD_TABLE} or {CHANGE_LOG} exists; drop it after checking it is not needed.")
+
+        # A foreign key to tasks would have to include owner_id.
+        cursor.execute("SELECT conrelid::regclass::text FROM pg_constraint WHERE confrelid = %s::regclass AND contype = 'f'", [TABLE])
+        if referencing := [row[0] for row in cursor.fetchall()]:
+            raise PartitioningError(f"Tables reference {TABLE}: {', '.join(referencing)}.")
+
+
+def table_indexes() -> list[tuple[str, str]]:
+    # (name, definition) of the secondary indexes, rewritten to build the
+    # same index on the new table under a temporary name.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT relation.relname, pg_get_indexdef(relation.oid)
+            FROM pg_index JOIN pg_class relation ON relation.oid = pg_index.indexrelid
+            WHERE pg_index.indrelid = %s::regclass AND NOT pg_index.indisprimary
+            """,
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+
+    indexes = []
+    for name, definition in rows:
+        if not INDEX_DEFINITION.match(definition):
+            raise PartitioningError(f"Index {name} cannot be moved to a table partitioned by owner_id: {definition}")
+        indexes.append((name, INDEX_DEFINITION.sub(f"CREATE INDEX {quote(name + '_p')} ON {quote(NEW_TABLE)} USING ", definition)))
+    return indexes
+
+
+def create_partitioned_table(partitions: int):
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {quote(NEW_TABLE)} (LIKE {quote(TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+            f"INCLUDING GENERATED INCLUDING IDENTITY) PARTITION BY HASH (owner_id)"
+        )
+        # Unique constraints on a partitioned table have to include the
+        # partition key.
+        cursor.execute(f"ALTER TABLE {quote(NEW_TABLE)} ADD PRIMARY KEY (owner_id, id)")
+        for remainder in range(partitions):
+            cursor.execute(
+                f"CREATE TABLE {quote(f'{TABLE}_p{remainder}')} PARTITION OF {quote(NEW_TABLE)} "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            )
+
+
+def create_change_log():
+    # CREATE TRIGGER waits for the transactions writing to tasks; the ones
+    # that commit after it are logged, the earlier ones are seen by the copy.
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {quote(CHANGE_LOG)} (owner_id bigint NOT NULL, id bigint NOT NULL)")
+        cursor.execute(
+            f"""
+            CREATE FUNCTION {quote(CHANGE_LOG_FUNCTION)}() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    INSERT INTO {quote(CHANGE_LOG)} VALUES (OLD.owner_id, OLD.id);
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    INSERT INTO {quote(CHANGE_LOG)} VALUES (NEW.owner_id, NEW.id);
+                END IF;
+                RETURN NULL;
+            END
+            $$
+            """
+        )
+        cursor.execute(
+            f"CREATE TRIGGER {quote(CHANGE_LOG)} AFTER INSERT OR UPDATE OR DELETE ON {quote(TABLE)} "
+            f"FOR EACH ROW EXECUTE FUNCTION {quote(CHANGE_LOG_FUNCTION)}()"
+        )
+
+
+def drop_change_log(cursor):
+    cursor.execute(f"DROP TRIGGER IF EXISTS {quote(CHANGE_LOG)} ON {quote(TABLE)}")
+    cursor.execute(f"DROP FUNCTION IF EXISTS {quote(CHANGE_LOG_FUNCTION)}()")
+    cursor.execute(f"DROP TABLE IF EXISTS {quote(CHANGE_LOG)}")
+
+
+def copy_batches(batch_size: int, log) -> int:
+    # Copies in id order, one transaction per batch; returns the number of
+    # rows copied.
+    columns = task_columns()
+    last_id, copied = 0, 0
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    INSERT INTO {quote(NEW_TABLE)} ({columns})
+                    SELECT {columns} FROM {quote(TABLE)} WHERE id > %s ORDER BY id LIMIT %s
+                    RETURNING id
+                )
+                SELECT max(id), count(*) FROM moved
+                """,
+                [last_id, batch_size],
+            )
+            batch_last_id, count = cursor.fetchone()
+        if not count:
+            return copied
+        last_id, copied = batch_last_id, copied + count
+        log(f"Copied {copied} task(s).")
+
+
+def build_indexes(indexes: list[tuple[str, str]]):
+    # Built once the rows are in, before the new table takes any traffic.
+    with connection.cursor() as cursor:
+        for _, definition in indexes:
+            cursor.execute(definition)
+
+
+def catch_up_and_swap(indexes: list[tuple[str, str]]):
+    # Under an EXCLUSIVE lock reads go on and writes wait. Every row in the
+    # change log is copied again (or left out, if it is gone), then the
+    # tables trade names. The foreign keys move to the new table only now:
+    # before the swap, deleting a user would have failed on its copied rows.
+    columns = task_columns()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {quote(TABLE)} IN EXCLUSIVE MODE")
+
+        cursor.execute(
+            f"DELETE FROM {quote(NEW_TABLE)} copied USING {quote(CHANGE_LOG)} changed "
+            f"WHERE copied.owner_id = changed.owner_id AND copied.id = changed.id"
+        )
+        cursor.execute(
+            f"INSERT INTO {quote(NEW_TABLE)} ({columns}) SELECT {columns} FROM {quote(TABLE)} "
+            f"WHERE (owner_id, id) IN (SELECT owner_id, id FROM {quote(CHANGE_LOG)})"
+        )
+        drop_change_log(cursor)
+
+        cursor.execute("SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'", [TABLE])
+        identity = bool(cursor.fetchone()[0])
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+        sequence = cursor.fetchone()[0]
+        cursor.execute("SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'", [TABLE])
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(f"ALTER TABLE {quote(TABLE)} RENAME TO {quote(OLD_TABLE)}")
+        cursor.execute(f"ALTER TABLE {quote(OLD_TABLE)} RENAME CONSTRAINT {quote(TABLE + '_pkey')} TO {quote(OLD_TABLE + '_pkey')}")
+        for name, _ in foreign_keys:
+            cursor.execute(f"ALTER TABLE {quote(OLD_TABLE)} DROP CONSTRAINT {quote(name)}")
+        for name, _ in indexes:
+            cursor.execute(f"ALTER INDEX {quote(name)} RENAME TO {quote(name + '_old')}")
+
+        cursor.execute(f"ALTER TABLE {quote(NEW_TABLE)} RENAME TO {quote(TABLE)}")
+        cursor.execute(f"ALTER TABLE {quote(TABLE)} RENAME CONSTRAINT {quote(NEW_TABLE + '_pkey')} TO {quote(TABLE + '_pkey')}")
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(name)} {definition}")
+        for name, _ in indexes:
+            cursor.execute(f"ALTER INDEX {quote(name + '_p')} RENAME TO {quote(name)}")
+
+        if identity:
+            # The new table has its own identity sequence.
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), coalesce(max(id), 0) + 1, false) FROM {quote(TABLE)}",
+                [TABLE],
+            )
+        elif sequence:
+            # A serial column: the copied default uses the old sequence, which
+            # must not go away with the old table.
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {quote(TABLE)}.id")
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {quote(TABLE)}")
+
+
+def partition_tasks(partitions: int, batch_size: int, log=print):
+    check_table()
+    indexes = table_indexes()
+
+    create_partitioned_table(partitions)
+    create_change_log()
+    try:
+        copy_batches(batch_size, log)
+        log("Building indexes.")
+        build_indexes(indexes)
+        log("Catching up and swapping tables.")
+        catch_up_and_swap(indexes)
+    except BaseException:
+        # Left in place, the trigger would keep logging every write.
+        with connection.cursor() as cursor:
+            drop_change_log(cursor)
+        raise
@@ -0,0 +1,33 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SyncTokenExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'The sync token is older than the deletion log; fetch the full list again.'
+    default_code = 'sync_token_expired'
+
+
+def encode_sync_token(timestamp: datetime, pk: int = 0) -> str:
+    # Opaque position in (updated_at, id) order: everything after it is
+    # returned by the next sync.
+    payload = json.dumps({'t': timestamp.isoformat(), 'i': pk}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_sync_token(token: str) -> tuple[datetime, int]:
+    # Raises ValueError for anything encode_sync_token() did not produce.
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        timestamp, pk = datetime.fromisoformat(payload['t']), int(payload['i'])
+    except (TypeError, KeyError, AttributeError, binascii.Error) as exc:
+        raise ValueError(str(exc)) from exc
+
+    if timestamp.tzinfo is None:
+        raise ValueError('Sync token without a time zone')
+    return timestamp, pk
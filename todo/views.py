@@ -1,36 +1,530 @@
-from .models import Task
-from .serializers import TaskListSerializer, TaskCreateSerializer, TaskDetailAndUpdateSerializer
-from rest_framework import generics
+from .filters import TASK_ORDERINGS, ArchivedTaskFilterSet, TaskFilterBackend, TaskFilterSet
+from .models import ArchivedTask, Task, TaskCounter, TaskDailyStats, TaskTombstone, TaskVersion
+from .serializers import ArchivedTaskValuesSerializer, TaskBatchResponseSerializer, TaskBatchSerializer, TaskListSerializer, TaskListValuesSerializer, TaskExportValuesSerializer, TaskImportSerializer, TaskCreateSerializer, TaskDetailAndUpdateSerializer, TaskFieldsQuerySerializer, TaskListQuerySerializer, TaskStatsQuerySerializer, TaskStatsSerializer
+from .utils.etags import PreconditionFailed, etag_matches, make_task_etag
+from .utils.sync_tokens import SyncTokenExpired, decode_sync_token, encode_sync_token
+from datetime import timedelta
+from io import BytesIO
+import orjson
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.lookups import GreaterThan
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import cached_property
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view, inline_serializer
+from rest_framework import generics, serializers, status
+from rest_framework.exceptions import ParseError
 from rest_framework.permissions import IsAuthenticated
-from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.response import Response
+from api.pagination import RowValue
+from api.parsers import CSVParser, NDJSONParser
+from api.renderers import CSVRenderer, NDJSONRenderer
 
-class TaskListCreateApiView(generics.ListCreateAPIView):
+class TaskVersionETagMixin:
+    # ETags come from the owner's TaskVersion, so a matching If-None-Match is
+    # answered with 304 before the tasks table is read.
+
+    etag_includes_query = False
+
+    def get_etag(self, lock=False) -> str:
+        version = TaskVersion.objects.current(self.request.user.pk, lock=lock)
+        return make_task_etag(version, self.get_etag_resource(), self.get_etag_variant())
+
+    def get_etag_resource(self) -> str:
+        return self.request.get_full_path() if self.etag_includes_query else self.request.path
+
+    def get_etag_variant(self) -> str:
+        return ""
+
+    def check_if_match(self):
+        header = self.request.headers.get("If-Match")
+        if header is not None and not etag_matches(header, self.get_etag(lock=True), any_variant=True):
+            raise PreconditionFailed()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag()
+
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        response = super().get(request, *args, **kwargs) # type: ignore
+        if response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+        return response
+
+
+@extend_schema_view(get=extend_schema(parameters=[TaskListQuerySerializer]))
+class TaskListCreateApiView(TaskVersionETagMixin, generics.ListCreateAPIView):
     
     permission_classes = [IsAuthenticated]
     
-    filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['is_done', 'priority']
+    filter_backends = [TaskFilterBackend]
+
+    etag_includes_query = True
+
+    @cached_property
+    def query(self) -> dict:
+        query = TaskListQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        return query.validated_data
+
+    @property
+    def archived(self) -> bool:
+        # ?archived=true lists tasks_archive instead: its own filters, fixed
+        # order and keyset pagination only (no count).
+        return self.request.method == "GET" and self.query["archived"]
+
+    @property
+    def filterset_class(self):
+        return ArchivedTaskFilterSet if self.archived else TaskFilterSet
+
+    @property
+    def cursor_only(self) -> bool:
+        return self.archived
 
     def get_queryset(self): # type: ignore
         owner = self.request.user        
-        return Task.objects.filter(owner=owner)
+        if self.archived:
+            return ArchivedTask.objects.filter(owner_id=owner.pk)
+        return Task.objects.filter(owner_id=owner.pk)
+
+    def get_filters(self) -> dict:
+        filterset = getattr(self, "filterset", None)
+        return filterset.form.cleaned_data if filterset is not None else {}
+
+    @property
+    def cursor_ordering(self):
+        # Search results are ordered by rank unless ?ordering= is given, and
+        # ranked results are only paginated by page number.
+        if self.archived:
+            return ArchivedTask._meta.ordering
+        filters = self.get_filters()
+        if filters.get("ordering"):
+            return TASK_ORDERINGS[filters["ordering"]]
+        if filters.get("search"):
+            return None
+        return Task._meta.ordering
     
+    def get_paginated_count(self):
+        filters = self.get_filters()
+        if filters.get("search"):
+            return None
+        return TaskCounter.objects.count_for(
+            self.request.user.pk,
+            is_done=filters.get("is_done"),
+            priority=filters.get("priority"),
+        )
+
     def get_serializer_class(self): # type: ignore
         if self.request.method == "POST":
             return TaskCreateSerializer
         return TaskListSerializer
+
+    def get_values_serializer_class(self):
+        return ArchivedTaskValuesSerializer if self.archived else TaskListValuesSerializer
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer_class = self.get_values_serializer_class()
+
+        # Only the columns of the fields picked with ?fields=/?exclude= are
+        # read. Cursor positions are read from the rows, so ordering columns
+        # the list does not show (updated_at) are selected and dropped again.
+        fields = self.query["fields"] or serializer_class.fields
+        hidden = [field.lstrip("-") for field in self.cursor_ordering or [] if field.lstrip("-") not in fields]
+        queryset = queryset.values(*fields, *hidden)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            for row in page:
+                for field in hidden:
+                    del row[field]
+            return self.get_paginated_response(serializer_class(page, fields).data)
+
+        return Response(serializer_class(list(queryset), fields).data)
         
     def perform_create(self, serializer: TaskCreateSerializer):
-        if serializer.is_valid():
-            serializer.save(owner=self.request.user)
-        else:
-            print(serializer.errors)
+        serializer.save(owner_id=self.request.user.pk)
 
-class TaskDetailUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
+@extend_schema_view(get=extend_schema(parameters=[TaskFieldsQuerySerializer]))
+class TaskDetailUpdateDeleteView(TaskVersionETagMixin, generics.RetrieveUpdateDestroyAPIView):
     
     serializer_class = TaskDetailAndUpdateSerializer
     permission_classes = [IsAuthenticated]
+
+    @cached_property
+    def response_fields(self) -> list[str] | None:
+        # ?fields=/?exclude= on GET; the columns left out are not read.
+        if self.request.method != "GET":
+            return None
+        query = TaskFieldsQuerySerializer(data=self.request.query_params, context={"fields": TaskDetailAndUpdateSerializer.Meta.fields})
+        query.is_valid(raise_exception=True)
+        return query.validated_data["fields"]
+
+    def get_etag_variant(self) -> str:
+        return ",".join(self.response_fields or [])
     
     def get_queryset(self): # type: ignore
         owner = self.request.user        
-        return Task.objects.filter(owner=owner)
\ No newline at end of file
+        queryset = Task.objects.filter(owner_id=owner.pk)
+        if self.response_fields is not None:
+            queryset = queryset.only(*self.response_fields)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.response_fields is not None:
+            kwargs["fields"] = self.response_fields
+        return super().get_serializer(*args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        # The version row stays locked until commit, so no other write can
+        # slip in between the If-Match check and this one.
+        with transaction.atomic():
+            self.check_if_match()
+            response = super().update(request, *args, **kwargs)
+            response["ETag"] = self.get_etag()
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            self.check_if_match()
+            return super().destroy(request, *args, **kwargs)
+
+@extend_schema_view(get=extend_schema(parameters=[TaskStatsQuerySerializer]))
+class TaskStatsApiView(TaskVersionETagMixin, generics.RetrieveAPIView):
+    # Read from the per-owner counters and daily summary rows that task
+    # writes maintain, never from the tasks table, so the cost does not grow
+    # with the number of tasks.
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = TaskStatsSerializer
+
+    etag_includes_query = True
+
+    def get_etag_resource(self) -> str:
+        # The window of days moves at midnight even without writes.
+        return f"{super().get_etag_resource()}@{timezone.localdate().isoformat()}"
+
+    def get_object(self):
+        query = TaskStatsQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+
+        owner_id = self.request.user.pk
+        totals = TaskCounter.objects.totals_for(owner_id)
+
+        return {
+            "count": sum(total["count"] for total in totals),
+            "totals": totals,
+            "days": TaskDailyStats.objects.series_for(owner_id, query.validated_data["days"]),
+        }
+
+class TaskChangesApiView(generics.GenericAPIView):
+    # Delta sync: tasks written after the token in (updated_at, id) order,
+    # read through the owner/updated_at index, plus the ids deleted since in
+    # (deleted_at, task_id) order. A page ends at the first position either
+    # list runs out of room, so the next token loses nothing from the other.
+    # The last page's token trails the clock by TASKS_SYNC_OVERLAP_SECONDS;
+    # clients apply changes by id, so seeing a task twice is harmless.
+
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self): # type: ignore
+        owner = self.request.user
+        return Task.objects.filter(owner_id=owner.pk)
+
+    def get_since(self, now):
+        token = self.request.query_params.get("since")
+        if not token:
+            return None
+
+        try:
+            since = decode_sync_token(token)
+        except ValueError:
+            raise serializers.ValidationError({"since": ["Invalid sync token."]})
+
+        if since[0] > now + timedelta(seconds=settings.TASKS_SYNC_OVERLAP_SECONDS):
+            raise serializers.ValidationError({"since": ["Invalid sync token."]})
+        if since[0] < now - timedelta(days=settings.TASKS_SYNC_RETENTION_DAYS):
+            raise SyncTokenExpired()
+        return since
+
+    @extend_schema(
+        parameters=[OpenApiParameter("since", str, description="sync_token from the previous response; omit for a full sync.")],
+        responses=inline_serializer("TaskChanges", {
+            "changes": TaskDetailAndUpdateSerializer(many=True),
+            "deleted": serializers.ListField(child=serializers.IntegerField()),
+            "sync_token": serializers.CharField(),
+            "has_more": serializers.BooleanField(),
+        }),
+    )
+    def get(self, request, *args, **kwargs):
+        now = timezone.now()
+        since = self.get_since(now)
+
+        changes = self.get_queryset().order_by("updated_at", "id")
+        deleted = TaskTombstone.objects.none()
+        if since is not None:
+            changes = changes.filter(GreaterThan(RowValue(F("updated_at"), F("id")), RowValue(Value(since[0]), Value(since[1]))))
+            deleted = (
+                TaskTombstone.objects.filter(owner_id=request.user.pk)
+                .filter(GreaterThan(RowValue(F("deleted_at"), F("task_id")), RowValue(Value(since[0]), Value(since[1]))))
+                .order_by("deleted_at", "task_id")
+            )
+
+        changes_limit = settings.TASKS_SYNC_MAX_CHANGES
+        deleted_limit = settings.TASKS_SYNC_MAX_DELETED
+        rows = list(changes.values(*TaskExportValuesSerializer.fields)[:changes_limit + 1])
+        tombstones = list(deleted.values_list("deleted_at", "task_id")[:deleted_limit + 1])
+
+        ends = []
+        if len(rows) > changes_limit:
+            ends.append((rows[changes_limit - 1]["updated_at"], rows[changes_limit - 1]["id"]))
+        if len(tombstones) > deleted_limit:
+            ends.append(tombstones[deleted_limit - 1])
+
+        has_more = bool(ends)
+        if has_more:
+            end = min(ends)
+            rows = [row for row in rows if (row["updated_at"], row["id"]) <= end]
+            tombstones = [tombstone for tombstone in tombstones if tombstone <= end]
+            token = encode_sync_token(*end)
+        else:
+            token = encode_sync_token(now - timedelta(seconds=settings.TASKS_SYNC_OVERLAP_SECONDS))
+
+        return Response({
+            "changes": TaskExportValuesSerializer(rows).data,
+            "deleted": [task_id for _, task_id in tombstones],
+            "sync_token": token,
+            "has_more": has_more,
+        })
+
+@extend_schema_view(
+    post=extend_schema(request=TaskCreateSerializer(many=True), responses=TaskCreateSerializer(many=True)),
+    patch=extend_schema(request=TaskDetailAndUpdateSerializer(many=True), responses=TaskDetailAndUpdateSerializer(many=True)),
+    delete=extend_schema(request=serializers.ListField(child=serializers.IntegerField()), responses={204: None}),
+)
+class TaskBulkApiView(generics.GenericAPIView):
+
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self): # type: ignore
+        owner = self.request.user
+        return Task.objects.filter(owner_id=owner.pk)
+
+    def get_serializer_class(self): # type: ignore
+        if self.request.method == "POST":
+            return TaskCreateSerializer
+        return TaskDetailAndUpdateSerializer
+
+    def get_batch_ids(self) -> list:
+        data = self.request.data
+        if not isinstance(data, list) or len(data) > settings.TASKS_BULK_MAX_BATCH_SIZE:
+            return []
+        return [item.get("id") for item in data if isinstance(item, dict) and isinstance(item.get("id"), int)]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True, allow_empty=False, max_length=settings.TASKS_BULK_MAX_BATCH_SIZE)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            serializer.save(owner_id=request.user.pk)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        with transaction.atomic():
+            tasks = self.get_queryset().select_for_update().in_bulk(self.get_batch_ids())
+
+            serializer = self.get_serializer(tasks, data=request.data, many=True, partial=True, allow_empty=False, max_length=settings.TASKS_BULK_MAX_BATCH_SIZE)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def delete(self, request, *args, **kwargs):
+        field = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=settings.TASKS_BULK_MAX_BATCH_SIZE)
+        ids = field.run_validation(request.data)
+
+        with transaction.atomic():
+            tasks = self.get_queryset().filter(pk__in=ids)
+
+            found = set(tasks.select_for_update().values_list("pk", flat=True))
+            errors = {index: ["Not found."] for index, pk in enumerate(ids) if pk not in found}
+            if errors:
+                raise serializers.ValidationError(errors)
+
+            tasks.delete()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TaskExportApiView(generics.GenericAPIView):
+    # Streams every task matching the list filters. Rows are read through
+    # a server-side cursor in chunks and written as they arrive, so memory
+    # does not grow with the number of tasks.
+
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    filter_backends = [TaskFilterBackend]
+    filterset_class = TaskFilterSet
+
+    def get_queryset(self): # type: ignore
+        owner = self.request.user
+        return Task.objects.filter(owner_id=owner.pk)
+
+    @extend_schema(
+        parameters=[OpenApiParameter("format", str, enum=["ndjson", "csv"], description="Export format (default: ndjson).")],
+        responses={(200, NDJSONRenderer.media_type): OpenApiTypes.STR, (200, CSVRenderer.media_type): OpenApiTypes.STR},
+    )
+    def get(self, request, *args, **kwargs):
+        fields = TaskExportValuesSerializer.fields
+        queryset = self.filter_queryset(self.get_queryset()).values(*fields)
+        rows = TaskExportValuesSerializer(queryset.iterator(chunk_size=settings.TASKS_EXPORT_CHUNK_SIZE)).iter_data()
+
+        renderer = request.accepted_renderer
+        content_type = f"{renderer.media_type}; charset={renderer.charset}" if renderer.charset else renderer.media_type
+        response = StreamingHttpResponse(renderer.stream(rows, fields), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="tasks.{renderer.format}"'
+        return response
+
+
+class TaskImportApiView(generics.GenericAPIView):
+    # Reads the upload as a stream of rows and inserts the valid ones in
+    # batches of TASKS_IMPORT_BATCH_SIZE, each committed on its own, so
+    # memory stays bounded by the batch size.
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [NDJSONParser, CSVParser]
+    serializer_class = TaskImportSerializer
+
+    def get_queryset(self): # type: ignore
+        owner = self.request.user
+        return Task.objects.filter(owner_id=owner.pk)
+
+    def insert(self, tasks: list):
+        if settings.TASKS_IMPORT_USE_COPY and Task.objects.supports_copy():
+            Task.objects.copy_create(tasks)
+        else:
+            Task.objects.bulk_create(tasks)
+
+    @extend_schema(
+        request={NDJSONParser.media_type: OpenApiTypes.STR, CSVParser.media_type: OpenApiTypes.STR},
+        responses=inline_serializer("TaskImportResult", {
+            "accepted": serializers.IntegerField(),
+            "rejected": serializers.IntegerField(),
+            "errors": serializers.ListField(child=serializers.DictField()),
+        }),
+    )
+    def post(self, request, *args, **kwargs):
+        validator = self.get_serializer()
+        owner_id = request.user.pk
+
+        accepted, rejected, errors, batch = 0, 0, [], []
+
+        for line, row in request.data:
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                if not isinstance(row, dict):
+                    raise serializers.ValidationError({"non_field_errors": ["Expected an object."]})
+                batch.append(Task(owner_id=owner_id, **validator.run_validation(row)))
+            except (serializers.ValidationError, ParseError) as exc:
+                rejected += 1
+                if len(errors) < settings.TASKS_IMPORT_MAX_REPORTED_ERRORS:
+                    errors.append({"line": line, "errors": exc.detail if isinstance(exc.detail, dict) else {"non_field_errors": [exc.detail]}})
+                continue
+
+            if len(batch) == settings.TASKS_IMPORT_BATCH_SIZE:
+                self.insert(batch)
+                accepted += len(batch)
+                batch = []
+
+        if batch:
+            self.insert(batch)
+            accepted += len(batch)
+
+        return Response({"accepted": accepted, "rejected": rejected, "errors": errors}, status=status.HTTP_200_OK)
+
+
+class TaskBatchApiView(generics.GenericAPIView):
+    # Runs several /api/tasks/ requests in one round trip. The batch is
+    # authenticated once and each sub-request goes straight to its sync task
+    # view as the same user, skipping the middleware. Sub-requests are still
+    # throttled one by one.
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = TaskBatchSerializer
+
+    # Passed on from the batch request, so hosts, links and client IPs
+    # (throttling) come out the same as for a direct request.
+    forwarded_meta = ("REMOTE_ADDR", "SERVER_NAME", "SERVER_PORT", "SERVER_PROTOCOL", "HTTP_HOST", "HTTP_X_FORWARDED_FOR", "HTTP_X_FORWARDED_PROTO")
+
+    response_headers = ("ETag", "Retry-After")
+
+    def build_request(self, item: dict) -> WSGIRequest:
+        body = orjson.dumps(item["body"]) if "body" in item else b""
+        environ = {name: self.request.META[name] for name in self.forwarded_meta if name in self.request.META}
+        environ.update({
+            "REQUEST_METHOD": item["method"],
+            "SCRIPT_NAME": "",
+            # WSGI carries the path as latin-1 decoded bytes.
+            "PATH_INFO": item["url"].path.encode().decode("iso-8859-1"),
+            "QUERY_STRING": item["url"].query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(body)),
+            "HTTP_ACCEPT": "application/json",
+            "wsgi.input": BytesIO(body),
+            "wsgi.url_scheme": self.request.scheme,
+        })
+        for name, value in item.get("headers", {}).items():
+            environ[f"HTTP_{name.upper().replace('-', '_')}"] = value
+
+        request = WSGIRequest(environ)
+        request.resolver_match = item["match"]
+        # DRF's forced authentication: the views take the batch's user as is.
+        request._force_auth_user, request._force_auth_token = self.request.user, self.request.auth
+        return request
+
+    def run(self, item: dict) -> dict:
+        match = item["match"]
+        response = match.func(self.build_request(item), *match.args, **match.kwargs)
+        return {
+            "status": response.status_code,
+            "headers": {name: response[name] for name in self.response_headers if name in response},
+            "body": getattr(response, "data", None),
+        }
+
+    @extend_schema(responses=inline_serializer("TaskBatchResult", {"responses": TaskBatchResponseSerializer(many=True)}))
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data["requests"]
+
+        if not serializer.validated_data["atomic"]:
+            return Response({"responses": [self.run(item) for item in items]}, status=status.HTTP_200_OK)
+
+        # One transaction; the first failure rolls back what ran before it
+        # and the requests after it are not run.
+        responses, failed = [], False
+        with transaction.atomic():
+            for item in items:
+                if failed:
+                    responses.append({"status": status.HTTP_424_FAILED_DEPENDENCY, "headers": {}, "body": {"detail": "Not run: an earlier request of the atomic batch failed."}})
+                    continue
+                responses.append(self.run(item))
+                if responses[-1]["status"] >= status.HTTP_400_BAD_REQUEST:
+                    failed = True
+                    transaction.set_rollback(True)
+
+        return Response({"responses": responses}, status=status.HTTP_400_BAD_REQUEST if failed else status.HTTP_200_OK)